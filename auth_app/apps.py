@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class AuthConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "auth_app"
+
+    def ready(self):
+        import auth_app.signals
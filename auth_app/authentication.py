@@ -1,8 +1,8 @@
 from rest_framework.authentication import BaseAuthentication
 from rest_framework.exceptions import AuthenticationFailed
-from firebase_admin import auth as firebase_auth
 from django.contrib.auth import get_user_model
 from rest_framework import exceptions
+from utils.sdk import firebase_auth
 
 User = get_user_model()
 
@@ -15,7 +15,7 @@ class FirebaseAuthentication(BaseAuthentication):
 
         try:
             id_token = auth_header.split(" ")[1]
-            decoded_token = firebase_auth.verify_id_token(id_token)
+            decoded_token = firebase_auth().verify_id_token(id_token)
             try:
                 user = User.objects.get(email=decoded_token["email"])
             except User.DoesNotExist:
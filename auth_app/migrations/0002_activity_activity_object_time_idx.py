@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 20:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth_app", "0001_initial"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="activity",
+            index=models.Index(
+                fields=["content_type", "object_id", "-timestamp"],
+                name="activity_object_time_idx",
+            ),
+        ),
+    ]
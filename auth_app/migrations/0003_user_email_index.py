@@ -0,0 +1,20 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    FirebaseAuthentication looks users up by email on every request, and
+    auth_user.email has no index of its own.
+    """
+
+    dependencies = [
+        ("auth_app", "0002_activity_activity_object_time_idx"),
+        ("auth", "0012_alter_user_first_name_max_length"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX IF NOT EXISTS auth_user_email_idx ON auth_user (email);",
+            "DROP INDEX IF EXISTS auth_user_email_idx;",
+        ),
+    ]
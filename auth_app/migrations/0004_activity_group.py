@@ -0,0 +1,61 @@
+# Generated by Django 5.2 on 2026-10-18 21:08
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_activity_group(apps, schema_editor):
+    Activity = apps.get_model("auth_app", "Activity")
+    ContentType = apps.get_model("contenttypes", "ContentType")
+    ExpenseGroup = apps.get_model("groups", "ExpenseGroup")
+    Expense = apps.get_model("expenses", "Expense")
+    Transaction = apps.get_model("transactions", "Transaction")
+
+    for model in (ExpenseGroup, Expense, Transaction):
+        content_type = ContentType.objects.filter(
+            app_label=model._meta.app_label, model=model._meta.model_name
+        ).first()
+        if content_type is None:
+            continue
+        # Activities of deleted objects have no group to show up in
+        related = model.objects.filter(id=OuterRef("object_id"))
+        group_id = "id" if model is ExpenseGroup else "group_id"
+        Activity.objects.filter(content_type=content_type).update(
+            group_id=Subquery(related.values(group_id)[:1])
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("auth_app", "0003_user_email_index"),
+        ("contenttypes", "0002_remove_content_type_name"),
+        ("expenses", "0008_userexpensefeed"),
+        ("groups", "0007_expensegroup_simplify_engine"),
+        ("transactions", "0004_transaction_transaction_group_users_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="activity",
+            name="group",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="activities",
+                to="groups.expensegroup",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="activity",
+            index=models.Index(
+                fields=["group", "-timestamp", "-id"], name="activity_group_time_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_activity_group, migrations.RunPython.noop),
+    ]
@@ -26,6 +26,28 @@ class Activity(models.Model):
     content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
     object_id = models.PositiveIntegerField()
     related_object = GenericForeignKey("content_type", "object_id")
+    group = models.ForeignKey(
+        "groups.ExpenseGroup",
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="activities",
+        db_index=False,  # Covered by activity_group_time_idx
+    )  # Group the related object belongs to, set by log_activity()
+
+    class Meta:
+        indexes = [
+            # Activity feed of a group, newest first
+            models.Index(
+                fields=["group", "-timestamp", "-id"],
+                name="activity_group_time_idx",
+            ),
+            # Activity feed of an object, newest first
+            models.Index(
+                fields=["content_type", "object_id", "-timestamp"],
+                name="activity_object_time_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} by {self.user} on {self.timestamp}"
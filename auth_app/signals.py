@@ -0,0 +1,27 @@
+from django.contrib.auth import get_user_model
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from auth_app.serializers import UserSerializer
+from auth_app.utils import user_payload_cache, user_payload_cache_key
+from groups.utils import bump_summary_version
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, update_fields=None, **kwargs):
+    # Saves that only touch other columns (e.g. last_login) keep the payload
+    if update_fields is not None and not set(update_fields) & set(
+        UserSerializer.Meta.fields
+    ):
+        return
+    cache = user_payload_cache()
+    if cache is not None:
+        cache.delete(user_payload_cache_key(instance.id))
+    if kwargs.get("created"):
+        return
+    # Cached summaries embed the user's payload
+    for group_id in instance.expense_groups.values_list("id", flat=True):
+        bump_summary_version(group_id)
@@ -1,5 +1,15 @@
+from django.contrib.auth import get_user_model
 from django.contrib.contenttypes.models import ContentType
+from django.conf import settings
+from django.core.cache import caches
+
+from groups.models import ExpenseGroup
 from .models import Activity
+from .serializers import UserSerializer
+
+User = get_user_model()
+
+USER_PAYLOAD_CACHE_TIMEOUT = 60 * 60 * 24
 
 
 def log_activity(user, name, description, related_object):
@@ -19,4 +29,69 @@ def log_activity(user, name, description, related_object):
         description=description,
         content_type=content_type,
         object_id=related_object.id,
+        group_id=activity_group_id(related_object),
     )
+
+
+def activity_group_id(related_object):
+    """
+    Id of the group an activity about `related_object` shows up in: the
+    group itself, or the group of an expense or transaction.
+    """
+    if isinstance(related_object, ExpenseGroup):
+        return related_object.id
+    return getattr(related_object, "group_id", None)
+
+
+def user_payload_cache_key(user_id):
+    return f"user-payload:{user_id}"
+
+
+def user_payload_cache():
+    """
+    The cache holding user payloads, or None when there is no cache every
+    worker shares. A per-process cache could not be invalidated when a user
+    is saved in another process.
+    """
+    alias = getattr(settings, "USER_PAYLOAD_CACHE", None)
+    return caches[alias] if alias else None
+
+
+def get_user_payloads(user_ids):
+    """
+    Serialized user payloads (id, username, email, first_name) for many users.
+
+    Payloads are read from the shared cache (USER_PAYLOAD_CACHE) in one round
+    trip; the misses are loaded with a single in_bulk query and cached until
+    the user is saved again. Without a shared cache every call runs the query.
+
+    Args:
+        user_ids (iterable): The ids to resolve.
+
+    Returns:
+        dict: Maps user id to its UserSerializer payload. Unknown ids are left out.
+    """
+    keys = {user_payload_cache_key(user_id): user_id for user_id in set(user_ids)}
+    if not keys:
+        return {}
+    cache = user_payload_cache()
+    payloads = {}
+    if cache is not None:
+        payloads = {keys[key]: payload for key, payload in cache.get_many(keys).items()}
+
+    missing = [user_id for user_id in keys.values() if user_id not in payloads]
+    if missing:
+        users = User.objects.only(*UserSerializer.Meta.fields).in_bulk(missing)
+        fresh = {
+            user_id: dict(UserSerializer(user).data) for user_id, user in users.items()
+        }
+        if cache is not None:
+            cache.set_many(
+                {
+                    user_payload_cache_key(user_id): data
+                    for user_id, data in fresh.items()
+                },
+                USER_PAYLOAD_CACHE_TIMEOUT,
+            )
+        payloads.update(fresh)
+    return payloads
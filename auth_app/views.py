@@ -1,7 +1,4 @@
-import base64
-import json
 from .serializers import UserSerializer
-from firebase_admin import auth as firebase_auth, credentials, initialize_app
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny
@@ -10,20 +7,7 @@ from rest_framework.authtoken.models import Token
 from rest_framework.authentication import TokenAuthentication
 from rest_framework.permissions import IsAuthenticated
 from django.http import JsonResponse
-
-import os
-
-firebase_cred = os.getenv("FIREBASE_CREDENTIALS")
-firebase_b64 = os.getenv("FIREBASE_CREDENTIALS_B64")
-if firebase_b64 or firebase_cred:
-    if firebase_b64:
-        decoded = base64.b64decode(firebase_b64)
-        FIREBASE_CREDENTIALS = json.loads(decoded)
-    else:
-        FIREBASE_CREDENTIALS = firebase_cred
-
-    cred = credentials.Certificate(FIREBASE_CREDENTIALS)
-    initialize_app(cred)
+from utils.sdk import firebase_auth
 
 User = get_user_model()
 
@@ -49,7 +33,7 @@ class GoogleLoginView(APIView):
             return Response({"error": "ID token required"}, status=400)
 
         try:
-            decoded = firebase_auth.verify_id_token(id_token)
+            decoded = firebase_auth().verify_id_token(id_token)
             email = decoded.get("email")
             name = decoded.get("name")
 
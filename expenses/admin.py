@@ -1,6 +1,92 @@
 from django.contrib import admin
-from .models import Expense, Split
+from django.db import transaction
+
+from .feed import rebuild_expense_feed
+from .ledger import rebuild_group_balances
+from .models import BalanceCheckpoint, Expense, GroupBalance, PairwiseDebt, Split
+from groups.models import ExpenseGroup
+from groups.utils import bump_summary_version
+
+
+class LedgerRebuildAdmin(admin.ModelAdmin):
+    """
+    Admin for rows the group ledger is computed from. Admin edits skip
+    record_expense()/record_transaction() and write_expense_feed(), so every
+    save or delete rebuilds the ledger and the expense feed of the groups it
+    touched instead.
+    """
+
+    @staticmethod
+    def ledger_group_id(obj):
+        return obj.group_id
+
+    def rebuild_ledgers(self, group_ids):
+        for group in ExpenseGroup.objects.filter(id__in=set(group_ids)):
+            # Bumped first: the row lock keeps replays from saving checkpoints
+            bump_summary_version(group.id)
+            rebuild_group_balances(group)
+            BalanceCheckpoint.objects.filter(group=group).delete()
+            rebuild_expense_feed(Expense.objects.filter(group=group))
+
+    def save_model(self, request, obj, form, change):
+        # The row may have been moved to another group
+        obj._old_ledger_group_ids = []
+        if change:
+            stored = type(obj).objects.get(pk=obj.pk)
+            obj._old_ledger_group_ids.append(self.ledger_group_id(stored))
+        super().save_model(request, obj, form, change)
+
+    def save_related(self, request, form, formsets, change):
+        # Runs after save_model() and the m2m fields, e.g. split_between
+        super().save_related(request, form, formsets, change)
+        with transaction.atomic():
+            self.rebuild_ledgers(
+                [
+                    *form.instance._old_ledger_group_ids,
+                    self.ledger_group_id(form.instance),
+                ]
+            )
+
+    def delete_model(self, request, obj):
+        group_id = self.ledger_group_id(obj)
+        with transaction.atomic():
+            super().delete_model(request, obj)
+            self.rebuild_ledgers([group_id])
+
+    def delete_queryset(self, request, queryset):
+        group_ids = [self.ledger_group_id(obj) for obj in queryset]
+        with transaction.atomic():
+            super().delete_queryset(request, queryset)
+            self.rebuild_ledgers(group_ids)
+
+
+class SplitAdmin(LedgerRebuildAdmin):
+    list_select_related = ("expense",)
+
+    @staticmethod
+    def ledger_group_id(obj):
+        return obj.expense.group_id
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    """
+    Derived ledger rows: written by expenses/ledger.py and rebuild_balances
+    only, never by hand.
+    """
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
 
 # Register your models here.
-admin.site.register(Expense)
-admin.site.register(Split)
+admin.site.register(Expense, LedgerRebuildAdmin)
+admin.site.register(Split, SplitAdmin)
+admin.site.register(GroupBalance, ReadOnlyAdmin)
+admin.site.register(PairwiseDebt, ReadOnlyAdmin)
+admin.site.register(BalanceCheckpoint, ReadOnlyAdmin)
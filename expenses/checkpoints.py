@@ -0,0 +1,160 @@
+from collections import Counter
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from groups.models import ExpenseGroup
+from .ledger_core import LedgerCore, to_decimal
+from .models import BalanceCheckpoint
+
+# Replaying more rows than this for a past date saves a checkpoint there
+CHECKPOINT_REPLAY_LIMIT = getattr(settings, "BALANCE_CHECKPOINT_REPLAY_LIMIT", 500)
+
+
+class LedgerState:
+    """
+    Net balances, gross pairwise debts and total spend of a group at a point
+    in time, all in integer paise.
+    """
+
+    def __init__(self, balances=None, pair_debts=None, total_spend=0):
+        self.balances = Counter(balances or {})
+        self.pair_debts = Counter(pair_debts or {})
+        self.total_spend = total_spend
+
+    @classmethod
+    def from_checkpoint(cls, checkpoint):
+        return cls(
+            {int(user_id): paise for user_id, paise in checkpoint.balances.items()},
+            {
+                tuple(int(user_id) for user_id in pair.split(":")): paise
+                for pair, paise in checkpoint.pair_debts.items()
+            },
+            checkpoint.total_spend,
+        )
+
+    def add(self, core):
+        """
+        Add the rows aggregated by a LedgerCore.
+        """
+        net = core.net
+        for index, user_id in enumerate(core.user_ids):
+            self.balances[int(user_id)] += int(net[index])
+        debtors, creditors = core.debts.nonzero()
+        for i, j in zip(debtors, creditors):
+            pair = (int(core.user_ids[i]), int(core.user_ids[j]))
+            self.pair_debts[pair] += int(core.debts[i, j])
+        self.total_spend += int(core.paid.sum())
+
+    def to_checkpoint(self, group, as_of):
+        return BalanceCheckpoint(
+            group=group,
+            as_of=as_of,
+            total_spend=self.total_spend,
+            balances={
+                str(user_id): paise for user_id, paise in self.balances.items() if paise
+            },
+            pair_debts={
+                f"{debtor_id}:{creditor_id}": paise
+                for (debtor_id, creditor_id), paise in self.pair_debts.items()
+                if paise
+            },
+        )
+
+    def decimal_balances(self):
+        return {user_id: to_decimal(paise) for user_id, paise in self.balances.items()}
+
+    def decimal_pair_debts(self):
+        return [
+            (debtor_id, creditor_id, to_decimal(paise))
+            for (debtor_id, creditor_id), paise in self.pair_debts.items()
+            if paise
+        ]
+
+
+def get_ledger_as_of(group, as_of, save_checkpoint=True):
+    """
+    Rebuild a group's ledger as it stood at `as_of`, starting from the nearest
+    earlier checkpoint and replaying only the rows dated after it.
+
+    Args:
+        group (ExpenseGroup): The group.
+        as_of (datetime): Include expenses and settle-ups dated up to this moment.
+        save_checkpoint (bool): Store a checkpoint at `as_of` when the replay
+            was long, `as_of` lies in the past and the group's summary_version
+            is still the one it was loaded with.
+
+    Returns:
+        LedgerState: The state in paise.
+    """
+    checkpoint = (
+        BalanceCheckpoint.objects.filter(group=group, as_of__lte=as_of)
+        .order_by("-as_of")
+        .first()
+    )
+    if checkpoint is not None and checkpoint.as_of == as_of:
+        return LedgerState.from_checkpoint(checkpoint)
+
+    state = LedgerState.from_checkpoint(checkpoint) if checkpoint else LedgerState()
+    core = LedgerCore.from_group(
+        group,
+        after=checkpoint.as_of if checkpoint else None,
+        until=as_of,
+        include_members=False,
+    )
+    state.add(core)
+
+    if (
+        save_checkpoint
+        and core.row_count > CHECKPOINT_REPLAY_LIMIT
+        and as_of < timezone.now()
+    ):
+        save_replayed_checkpoint(group, as_of, state)
+    return state
+
+
+def save_replayed_checkpoint(group, as_of, state):
+    """
+    Store a replayed state unless a write changed the group since it was
+    loaded: the write may have invalidated checkpoints the replay did not see.
+
+    The group row is locked like invalidate_checkpoints() locks it, so a
+    write in progress either commits first and its version bump is seen, or
+    waits for the checkpoint and drops it.
+    """
+    with transaction.atomic():
+        version = (
+            ExpenseGroup.objects.select_for_update()
+            .filter(id=group.id)
+            .values_list("summary_version", flat=True)
+            .first()
+        )
+        if version != group.summary_version:
+            return
+        # A concurrent request may have saved the same checkpoint meanwhile
+        BalanceCheckpoint.objects.bulk_create(
+            [state.to_checkpoint(group, as_of)], ignore_conflicts=True
+        )
+
+
+def create_checkpoint(group, as_of):
+    """
+    Store (or refresh) the checkpoint of a group at `as_of`.
+    """
+    BalanceCheckpoint.objects.filter(group=group, as_of=as_of).delete()
+    state = get_ledger_as_of(group, as_of, save_checkpoint=False)
+    checkpoint = state.to_checkpoint(group, as_of)
+    checkpoint.save()
+    return checkpoint
+
+
+def invalidate_checkpoints(group_id, changed_at):
+    """
+    Drop the checkpoints a write dated `changed_at` makes stale. Call inside
+    the write's transaction: the group row stays locked until it commits.
+    """
+    # Holds off save_replayed_checkpoint() until the write's version bump
+    # is visible, so a checkpoint replayed before the write is not saved
+    list(ExpenseGroup.objects.select_for_update().filter(id=group_id).values("id"))
+    BalanceCheckpoint.objects.filter(group_id=group_id, as_of__gte=changed_at).delete()
@@ -0,0 +1,90 @@
+"""
+Per-user expense feed (UserExpenseFeed).
+
+Every write that touches an expense's split_between users, splits or date
+rewrites the expense's feed rows. The rows are built from data the write
+already holds, so keeping the feed current costs one or two queries.
+"""
+
+from django.conf import settings
+
+from .models import Expense, Split, UserExpenseFeed
+
+FEED_BATCH_SIZE = getattr(settings, "EXPENSE_FEED_BATCH_SIZE", 1000)
+
+
+def feed_entries(expense, user_ids, splits):
+    """
+    Unsaved feed rows of an expense.
+
+    Args:
+        expense (Expense): A saved expense.
+        user_ids (iterable): Ids of the split_between users.
+        splits (iterable): The expense's splits; users without one get a
+            share of 0.
+    """
+    shares = {split.user_id: split.amount for split in splits}
+    return [
+        UserExpenseFeed(
+            user_id=user_id,
+            expense_id=expense.id,
+            group_id=expense.group_id,
+            expense_date=expense.expense_date,
+            share_amount=shares.get(user_id, 0),
+        )
+        for user_id in dict.fromkeys(user_ids)
+    ]
+
+
+def write_expense_feed(expense, user_ids, splits, replace=False):
+    """
+    Store the feed rows of an expense; replace=True drops its old rows first.
+    """
+    if replace:
+        UserExpenseFeed.objects.filter(expense_id=expense.id).delete()
+    UserExpenseFeed.objects.bulk_create(feed_entries(expense, user_ids, splits))
+
+
+def rebuild_expense_feed(expenses):
+    """
+    Rebuild the feed rows of the expenses in a queryset from split_between
+    and the splits, e.g. after rows were bulk created without the feed.
+
+    Returns:
+        int: Number of feed rows written.
+    """
+    expense_ids = expenses.values("id")
+    UserExpenseFeed.objects.filter(expense_id__in=expense_ids).delete()
+    shares = {
+        (expense_id, user_id): amount
+        for expense_id, user_id, amount in Split.objects.filter(
+            expense_id__in=expense_ids
+        ).values_list("expense_id", "user_id", "amount")
+    }
+    members = (
+        Expense.split_between.through.objects.filter(expense_id__in=expense_ids)
+        .values_list(
+            "expense_id", "user_id", "expense__group_id", "expense__expense_date"
+        )
+        .order_by("expense_id", "user_id")
+    )
+    count = 0
+    batch = []
+    for expense_id, user_id, group_id, expense_date in members.iterator(
+        chunk_size=FEED_BATCH_SIZE
+    ):
+        batch.append(
+            UserExpenseFeed(
+                user_id=user_id,
+                expense_id=expense_id,
+                group_id=group_id,
+                expense_date=expense_date,
+                share_amount=shares.get((expense_id, user_id), 0),
+            )
+        )
+        if len(batch) >= FEED_BATCH_SIZE:
+            UserExpenseFeed.objects.bulk_create(batch)
+            count += len(batch)
+            batch = []
+    UserExpenseFeed.objects.bulk_create(batch)
+    return count + len(batch)
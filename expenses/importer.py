@@ -0,0 +1,318 @@
+"""
+Bulk expense import.
+
+Rows are read from a CSV or NDJSON stream one at a time, validated against
+the group's members (loaded once), and written with bulk_create in chunks.
+The ledger deltas of the whole import are applied once at the end, and the
+LLM icon jobs the save signal would queue are queued per chunk, since
+bulk_create skips the model signals.
+"""
+
+import csv
+import json
+from collections import defaultdict
+from datetime import datetime, time
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from groups.utils import bump_summary_version
+from jobs.queue import enqueue_jobs
+from .checkpoints import invalidate_checkpoints
+from .feed import feed_entries
+from .ledger import apply_balance_deltas, apply_pair_deltas, expense_deltas
+from .ledger_core import split_evenly, to_decimal, to_paise
+from .models import Expense, Split, UserExpenseFeed
+from .utils import DEFAULT_EXPENSE_ICON, match_expense_icon
+
+IMPORT_CHUNK_SIZE = getattr(settings, "EXPENSE_IMPORT_CHUNK_SIZE", 1000)
+IMPORT_MAX_ROWS = getattr(settings, "EXPENSE_IMPORT_MAX_ROWS", 50000)
+MAX_REPORTED_ERRORS = 100
+MAX_AMOUNT = Decimal("99999999.99")  # Expense.amount has 10 digits
+
+
+class RowError(Exception):
+    pass
+
+
+def read_csv_rows(lines):
+    """
+    Rows of a CSV with a header line. split_between holds user ids separated
+    by ";", splits holds "user id:amount" pairs separated by ";".
+    """
+    for row in csv.DictReader(lines):
+        yield row
+
+
+def read_ndjson_rows(lines):
+    """
+    One JSON object per line; blank lines are skipped. A line that is not a
+    JSON object is yielded as a RowError.
+    """
+    for line in lines:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as error:
+            yield RowError(f"Invalid JSON: {error}")
+            continue
+        yield row if isinstance(row, dict) else RowError("Expected a JSON object.")
+
+
+ROW_READERS = {
+    "text/csv": read_csv_rows,
+    "application/x-ndjson": read_ndjson_rows,
+    "application/ndjson": read_ndjson_rows,
+    "application/jsonl": read_ndjson_rows,
+}
+
+
+def parse_amount(value, field="amount"):
+    try:
+        amount = Decimal(str(value).strip())
+    except (InvalidOperation, ValueError):
+        raise RowError(f"{field} must be a number.")
+    if not amount.is_finite() or amount <= 0 or amount > MAX_AMOUNT:
+        raise RowError(f"{field} must be between 0.01 and {MAX_AMOUNT}.")
+    if amount != amount.quantize(Decimal("0.01")):
+        raise RowError(f"{field} has more than 2 decimal places.")
+    return amount.quantize(Decimal("0.01"))
+
+
+def parse_user_id(value, field):
+    try:
+        return int(str(value).strip())
+    except ValueError:
+        raise RowError(f"{field} must be a user id.")
+
+
+def parse_expense_date(value):
+    if value in (None, ""):
+        return timezone.now()
+    value = str(value).strip()
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            raise RowError("expense_date must be an ISO 8601 date or datetime.")
+        moment = datetime.combine(day, time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def parse_split_between(value):
+    if value in (None, ""):
+        return []
+    if isinstance(value, str):
+        value = [part for part in value.split(";") if part.strip()]
+    if not isinstance(value, list):
+        raise RowError("split_between must be a list of user ids.")
+    return [parse_user_id(user_id, "split_between") for user_id in value]
+
+
+def parse_splits(value):
+    """
+    Returns a {user id: amount} dict, or None when the row has no splits.
+    """
+    if value in (None, ""):
+        return None
+    if isinstance(value, str):
+        pairs = []
+        for part in value.split(";"):
+            if not part.strip():
+                continue
+            user_id, separator, amount = part.partition(":")
+            if not separator:
+                raise RowError('splits must look like "user id:amount;...".')
+            pairs.append((user_id, amount))
+    elif isinstance(value, dict):
+        pairs = list(value.items())
+    elif isinstance(value, list):
+        try:
+            pairs = [(split["user"], split["amount"]) for split in value]
+        except (KeyError, TypeError):
+            raise RowError('splits must be a list of {"user", "amount"} objects.')
+    else:
+        raise RowError("splits must be a list of user amounts.")
+
+    splits = {}
+    for user_id, amount in pairs:
+        user_id = parse_user_id(user_id, "splits")
+        if user_id in splits:
+            raise RowError(f"User {user_id} appears twice in splits.")
+        splits[user_id] = parse_amount(amount, "splits amount")
+    return splits
+
+
+class ExpenseImporter:
+    """
+    Import rows into one group. Run it inside a transaction: rows are written
+    as they are read, and finish() brings the ledger up to date.
+    """
+
+    def __init__(self, group, user, chunk_size=IMPORT_CHUNK_SIZE):
+        self.group = group
+        self.user = user
+        self.chunk_size = chunk_size
+        self.member_ids = set(group.members.values_list("id", flat=True))
+        self.imported = 0
+        self.error_count = 0
+        self.errors = []
+        self._pending = []
+        self._icons = {}
+        self._earliest_date = None
+        self._balance_deltas = defaultdict(lambda: defaultdict(Decimal))
+        self._pair_deltas = defaultdict(Decimal)
+
+    def run(self, rows):
+        for number, row in enumerate(rows, start=1):
+            if number > IMPORT_MAX_ROWS:
+                self.add_error(
+                    number, f"Imports are limited to {IMPORT_MAX_ROWS} rows."
+                )
+                break
+            try:
+                if isinstance(row, RowError):
+                    raise row
+                self._pending.append(self.build(row))
+            except RowError as error:
+                self.add_error(number, str(error))
+                continue
+            if len(self._pending) >= self.chunk_size:
+                self.flush()
+        self.flush()
+        self.finish()
+
+    def add_error(self, row_number, message):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row_number, "error": message})
+
+    def icon(self, title, notes):
+        # Keyword matching only: an import must not call the LLM per row.
+        # Unmatched expenses get an icon job once saved, see flush().
+        key = (title, notes)
+        if key not in self._icons:
+            self._icons[key] = match_expense_icon(title, notes) or DEFAULT_EXPENSE_ICON
+        return self._icons[key]
+
+    def build(self, row):
+        """
+        Validate one row.
+
+        Returns:
+            tuple: The unsaved Expense and its {user id: amount} splits.
+        """
+        title = str(row.get("title") or "").strip()
+        if not title:
+            raise RowError("title is required.")
+        if len(title) > Expense._meta.get_field("title").max_length:
+            raise RowError("title is too long.")
+        if row.get("amount") in (None, ""):
+            raise RowError("amount is required.")
+        amount = parse_amount(row["amount"])
+        paid_by_id = (
+            parse_user_id(row["paid_by"], "paid_by")
+            if row.get("paid_by") not in (None, "")
+            else self.user.id
+        )
+        if paid_by_id not in self.member_ids:
+            raise RowError("Payer must be a member of the group.")
+
+        split_between = parse_split_between(row.get("split_between"))
+        splits = parse_splits(row.get("splits"))
+        if splits is not None:
+            if split_between and set(split_between) != set(splits):
+                raise RowError("Mismatch between split_between users and splits data.")
+            if sum(splits.values()) != amount:
+                raise RowError("Split amounts must add up to total expense.")
+        else:
+            # Default to an even split, the remainder going to the first users
+            user_ids = list(dict.fromkeys(split_between)) or sorted(self.member_ids)
+            shares = split_evenly(to_paise(amount), len(user_ids))
+            splits = {
+                user_id: to_decimal(share) for user_id, share in zip(user_ids, shares)
+            }
+
+        outsiders = sorted(set(splits) - self.member_ids)
+        if outsiders:
+            raise RowError(
+                "The following users are not in the group: "
+                + ", ".join(str(user_id) for user_id in outsiders)
+            )
+
+        notes = str(row.get("notes") or "").strip() or None
+        expense_date = parse_expense_date(row.get("expense_date"))
+        expense = Expense(
+            group=self.group,
+            title=title,
+            amount=amount,
+            paid_by_id=paid_by_id,
+            expense_date=expense_date,
+            notes=notes,
+            expense_icon=self.icon(title, notes),
+        )
+        return expense, splits
+
+    def flush(self):
+        if not self._pending:
+            return
+        expenses = Expense.objects.bulk_create(
+            [expense for expense, _ in self._pending]
+        )
+        enqueue_jobs(
+            "expense_icon",
+            {
+                f"expense_icon:{expense.id}": {
+                    "expense_id": expense.id,
+                    "title": expense.title,
+                    "notes": expense.notes,
+                }
+                for expense in expenses
+                if expense.expense_icon == DEFAULT_EXPENSE_ICON
+            },
+        )
+        split_rows = []
+        through_rows = []
+        feed_rows = []
+        for expense, (_, splits) in zip(expenses, self._pending):
+            expense_splits = [
+                Split(expense=expense, user_id=user_id, amount=amount)
+                for user_id, amount in splits.items()
+            ]
+            split_rows += expense_splits
+            through_rows += [
+                Expense.split_between.through(expense_id=expense.id, user_id=user_id)
+                for user_id in splits
+            ]
+            feed_rows += feed_entries(expense, splits, expense_splits)
+
+            balance_deltas, pair_deltas = expense_deltas(expense, expense_splits)
+            for user_id, fields in balance_deltas.items():
+                for field, amount in fields.items():
+                    self._balance_deltas[user_id][field] += amount
+            for pair, amount in pair_deltas.items():
+                self._pair_deltas[pair] += amount
+            if (
+                self._earliest_date is None
+                or expense.expense_date < self._earliest_date
+            ):
+                self._earliest_date = expense.expense_date
+
+        Split.objects.bulk_create(split_rows)
+        Expense.split_between.through.objects.bulk_create(through_rows)
+        UserExpenseFeed.objects.bulk_create(feed_rows)
+        self.imported += len(expenses)
+        self._pending = []
+
+    def finish(self):
+        if not self.imported:
+            return
+        apply_balance_deltas(self.group.id, self._balance_deltas)
+        apply_pair_deltas(self.group.id, self._pair_deltas)
+        invalidate_checkpoints(self.group.id, self._earliest_date)
+        bump_summary_version(self.group.id)
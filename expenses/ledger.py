@@ -0,0 +1,235 @@
+import operator
+from collections import defaultdict
+from decimal import Decimal
+from functools import reduce
+
+from django.conf import settings
+from django.db import models, transaction
+
+from .checkpoints import invalidate_checkpoints
+from .ledger_core import LedgerCore
+from .models import GroupBalance, PairwiseDebt
+
+BALANCE_FIELDS = ("paid", "owed", "sent", "received")
+# Rows moved by one delta UPDATE. Every row adds a WHEN to the CASE and a
+# term to the OR filter, and SQLite rejects expressions nested over 1000 deep.
+LEDGER_UPDATE_CHUNK_SIZE = getattr(settings, "LEDGER_UPDATE_CHUNK_SIZE", 200)
+
+
+def _chunks(items):
+    items = list(items)
+    for start in range(0, len(items), LEDGER_UPDATE_CHUNK_SIZE):
+        yield items[start : start + LEDGER_UPDATE_CHUNK_SIZE]
+
+
+def net_balance(totals):
+    """
+    Net position of a user: positive when the group owes them money.
+    """
+    return totals["paid"] - totals["owed"] + totals["sent"] - totals["received"]
+
+
+def _delta_case(deltas):
+    """
+    CASE expression picking the delta of the row matching each condition.
+
+    Args:
+        deltas (iterable): (Q condition, amount) pairs.
+    """
+    return models.Case(
+        *[
+            models.When(condition, then=models.Value(Decimal(amount)))
+            for condition, amount in deltas
+        ],
+        default=models.Value(Decimal(0)),
+        output_field=models.DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def apply_balance_deltas(group_id, deltas):
+    """
+    Add per-user deltas to the group's balance rows.
+
+    Args:
+        group_id (int): The group the deltas belong to.
+        deltas (dict): Maps user id to a dict of {field: amount}, where field is
+            one of "paid", "owed", "sent" or "received".
+    """
+    deltas = {user_id: fields for user_id, fields in deltas.items() if fields}
+    if not deltas:
+        return
+    # Make sure every row exists, then move the totals with F() so concurrent
+    # writers never overwrite each other.
+    GroupBalance.objects.bulk_create(
+        [GroupBalance(group_id=group_id, user_id=user_id) for user_id in deltas],
+        ignore_conflicts=True,
+    )
+    # One UPDATE per chunk of users: each field adds the user's delta, or
+    # nothing
+    for chunk in _chunks(deltas.items()):
+        changed_fields = {field for _, fields in chunk for field in fields}
+        GroupBalance.objects.filter(
+            group_id=group_id, user_id__in=[user_id for user_id, _ in chunk]
+        ).update(
+            **{
+                field: models.F(field)
+                + _delta_case(
+                    (models.Q(user_id=user_id), fields[field])
+                    for user_id, fields in chunk
+                    if field in fields
+                )
+                for field in changed_fields
+            }
+        )
+
+
+def apply_pair_deltas(group_id, deltas):
+    """
+    Add deltas to the group's pairwise debt rows.
+
+    Args:
+        group_id (int): The group the deltas belong to.
+        deltas (dict): Maps (debtor id, creditor id) to an amount.
+    """
+    deltas = {pair: amount for pair, amount in deltas.items() if amount}
+    if not deltas:
+        return
+    PairwiseDebt.objects.bulk_create(
+        [
+            PairwiseDebt(
+                group_id=group_id, debtor_id=debtor_id, creditor_id=creditor_id
+            )
+            for debtor_id, creditor_id in deltas
+        ],
+        ignore_conflicts=True,
+    )
+    pairs = [
+        (models.Q(debtor_id=debtor_id, creditor_id=creditor_id), amount)
+        for (debtor_id, creditor_id), amount in deltas.items()
+    ]
+    for chunk in _chunks(pairs):
+        PairwiseDebt.objects.filter(group_id=group_id).filter(
+            reduce(operator.or_, (condition for condition, _ in chunk))
+        ).update(amount=models.F("amount") + _delta_case(chunk))
+
+
+def expense_deltas(expense, splits, sign=1):
+    """
+    Balance and pairwise debt deltas contributed by an expense and its splits.
+    """
+    balance_deltas = defaultdict(lambda: defaultdict(Decimal))
+    pair_deltas = defaultdict(Decimal)
+    balance_deltas[expense.paid_by_id]["paid"] += sign * expense.amount
+    for split in splits:
+        balance_deltas[split.user_id]["owed"] += sign * split.amount
+        if split.user_id != expense.paid_by_id:
+            pair_deltas[(split.user_id, expense.paid_by_id)] += sign * split.amount
+    return balance_deltas, pair_deltas
+
+
+def record_expense(expense, splits=None, sign=1):
+    """
+    Apply an expense to the group ledger. Call with sign=-1 before the expense
+    (or its current splits) is removed or changed.
+    """
+    if splits is None:
+        splits = expense.splits.all()
+    balance_deltas, pair_deltas = expense_deltas(expense, splits, sign)
+    apply_balance_deltas(expense.group_id, balance_deltas)
+    apply_pair_deltas(expense.group_id, pair_deltas)
+    invalidate_checkpoints(expense.group_id, expense.expense_date)
+
+
+def record_transaction(settle_up, sign=1):
+    """
+    Apply a settle-up transaction to the group ledger.
+    """
+    amount = sign * settle_up.amount
+    apply_balance_deltas(
+        settle_up.group_id,
+        {
+            settle_up.from_user_id: {"sent": amount},
+            settle_up.to_user_id: {"received": amount},
+        },
+    )
+    # Paying someone back reduces what the sender owes them
+    apply_pair_deltas(
+        settle_up.group_id, {(settle_up.from_user_id, settle_up.to_user_id): -amount}
+    )
+    invalidate_checkpoints(settle_up.group_id, settle_up.transaction_date)
+
+
+def rebuild_group_balances(group):
+    """
+    Recompute a group's balance and pairwise debt rows from its expenses,
+    splits and transactions.
+    """
+    core = LedgerCore.from_group(group)
+    member_balances = core.member_totals()
+    pair_debts = core.pair_debts()
+    with transaction.atomic():
+        GroupBalance.objects.filter(group=group).delete()
+        GroupBalance.objects.bulk_create(
+            GroupBalance(group=group, user_id=user_id, **totals)
+            for user_id, totals in member_balances.items()
+        )
+        PairwiseDebt.objects.filter(group=group).delete()
+        PairwiseDebt.objects.bulk_create(
+            PairwiseDebt(
+                group=group, debtor_id=debtor_id, creditor_id=creditor_id, amount=amount
+            )
+            for (debtor_id, creditor_id), amount in pair_debts.items()
+            if amount
+        )
+
+
+def get_group_balances(group):
+    """
+    Read the group's ledger rows.
+
+    Returns:
+        dict: Maps user id to a dict with the paid, owed, sent and received totals.
+    """
+    rows = GroupBalance.objects.filter(group=group).values("user", *BALANCE_FIELDS)
+    return {
+        row["user"]: {field: row[field] for field in BALANCE_FIELDS} for row in rows
+    }
+
+
+def net_pair_debts(gross_debts):
+    """
+    Net both directions of every pair of users.
+
+    Args:
+        gross_debts (iterable): (debtor id, creditor id, amount) tuples.
+
+    Returns:
+        list: (debtor id, creditor id, amount) tuples with a positive amount,
+            ordered by debtor and creditor.
+    """
+    # Net each unordered pair, keyed with the lower user id first
+    net_debts = defaultdict(Decimal)
+    for debtor_id, creditor_id, amount in gross_debts:
+        if debtor_id < creditor_id:
+            net_debts[(debtor_id, creditor_id)] += amount
+        else:
+            net_debts[(creditor_id, debtor_id)] -= amount
+
+    debts = []
+    for (low_id, high_id), amount in net_debts.items():
+        if amount > 0:
+            debts.append((low_id, high_id, amount))
+        elif amount < 0:
+            debts.append((high_id, low_id, -amount))
+    return sorted(debts)
+
+
+def get_pairwise_debts(group):
+    """
+    Read the non-zero pairs of the group's debt matrix and net both directions.
+    """
+    return net_pair_debts(
+        PairwiseDebt.objects.filter(group=group)
+        .exclude(amount=0)
+        .values_list("debtor", "creditor", "amount")
+    )
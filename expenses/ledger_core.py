@@ -0,0 +1,203 @@
+"""
+Array-backed ledger core.
+
+Loads a group's expense, split and transaction rows as integer paise, maps
+user ids to dense indexes and aggregates them with NumPy. Amounts only become
+Decimal again at the API boundary (see to_decimal).
+
+NumPy is imported where it is used: this module is reached from the URL conf
+through the ledger and serializers, and most requests never build a core.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+
+from django.db import models
+from django.db.models.functions import Cast, Round
+
+from transactions.models import Transaction
+from .models import Expense, Split
+
+
+def paise(field):
+    """
+    Expression converting a 2-decimal amount column to integer paise in the
+    database. Rounding first keeps SQLite's float arithmetic from truncating
+    values like 10.05 * 100 = 1004.999...
+    """
+    return Cast(Round(models.F(field) * 100), models.BigIntegerField())
+
+
+def to_paise(amount):
+    """
+    Convert a 2-decimal amount to integer paise, rounding half away from
+    zero like paise() does in the database.
+    """
+    return int(Decimal(amount).scaleb(2).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def to_decimal(amount_paise):
+    """
+    Convert integer paise back to a 2-decimal Decimal.
+    """
+    return Decimal(int(amount_paise)).scaleb(-2)
+
+
+def split_evenly(total_paise, count):
+    """
+    Divide an amount into count integer shares that add up exactly.
+
+    The remainder is handed out one paisa at a time to the first shares, so
+    the result is the same every time for the same input order.
+    """
+    base, remainder = divmod(int(total_paise), count)
+    return [base + 1 if index < remainder else base for index in range(count)]
+
+
+def _rows(queryset, width):
+    import numpy as np
+
+    return np.array(list(queryset), dtype=np.int64).reshape(-1, width)
+
+
+def _sum_by(indexes, amounts, size):
+    import numpy as np
+
+    # Summed in int64, so totals stay paise exact however large the group;
+    # bincount would accumulate in float64
+    totals = np.zeros(size, dtype=np.int64)
+    np.add.at(totals, indexes, amounts)
+    return totals
+
+
+class LedgerCore:
+    """
+    Per-member totals and the pairwise debt matrix of one group, in paise.
+
+    Attributes:
+        row_count (int): Number of expense, split and transaction rows loaded.
+        user_ids (ndarray): Sorted user ids; position i is dense index i.
+        paid, owed, sent, received (ndarray): int64 totals per dense index.
+        debts (ndarray): int64 matrix, debts[i, j] is the gross amount user i
+            owes user j (splits minus settle-ups from i to j).
+    """
+
+    def __init__(self, member_ids, expense_rows, split_rows, transaction_rows):
+        """
+        Args:
+            member_ids (iterable): Users to include even without activity.
+            expense_rows (ndarray): (payer id, amount paise) rows.
+            split_rows (ndarray): (user id, payer id, amount paise) rows.
+            transaction_rows (ndarray): (from id, to id, amount paise) rows.
+        """
+        import numpy as np
+
+        id_columns = [
+            np.fromiter(member_ids, dtype=np.int64),
+            expense_rows[:, 0],
+            split_rows[:, :2].ravel(),
+            transaction_rows[:, :2].ravel(),
+        ]
+        self.row_count = len(expense_rows) + len(split_rows) + len(transaction_rows)
+        self.user_ids, inverse = np.unique(
+            np.concatenate(id_columns), return_inverse=True
+        )
+        size = len(self.user_ids)
+
+        # Split the dense indexes back into the columns they came from
+        bounds = np.cumsum([len(column) for column in id_columns])[:-1]
+        _, payer_index, split_index, transaction_index = np.split(inverse, bounds)
+        split_index = split_index.reshape(-1, 2)
+        transaction_index = transaction_index.reshape(-1, 2)
+
+        self.paid = _sum_by(payer_index, expense_rows[:, 1], size)
+        self.owed = _sum_by(split_index[:, 0], split_rows[:, 2], size)
+        self.sent = _sum_by(transaction_index[:, 0], transaction_rows[:, 2], size)
+        self.received = _sum_by(transaction_index[:, 1], transaction_rows[:, 2], size)
+
+        # Pairs are flattened to i * size + j so one sum fills the matrix
+        owes_payer = split_index[:, 0] != split_index[:, 1]
+        pair_keys = np.concatenate(
+            [
+                split_index[owes_payer, 0] * size + split_index[owes_payer, 1],
+                transaction_index[:, 0] * size + transaction_index[:, 1],
+            ]
+        )
+        pair_amounts = np.concatenate(
+            [split_rows[owes_payer, 2], -transaction_rows[:, 2]]
+        )
+        self.debts = _sum_by(pair_keys, pair_amounts, size * size).reshape(size, size)
+
+    @classmethod
+    def from_group(cls, group, after=None, until=None, include_members=True):
+        """
+        Load a group's ledger with one query per source table.
+
+        Args:
+            group (ExpenseGroup): The group to load.
+            after (datetime): Only rows dated strictly after this moment.
+            until (datetime): Only rows dated up to and including this moment.
+            include_members (bool): Also give members without activity a slot.
+        """
+        expenses = Expense.objects.filter(group=group)
+        splits = Split.objects.filter(expense__group=group)
+        transactions = Transaction.objects.filter(group=group)
+        if after is not None:
+            expenses = expenses.filter(expense_date__gt=after)
+            splits = splits.filter(expense__expense_date__gt=after)
+            transactions = transactions.filter(transaction_date__gt=after)
+        if until is not None:
+            expenses = expenses.filter(expense_date__lte=until)
+            splits = splits.filter(expense__expense_date__lte=until)
+            transactions = transactions.filter(transaction_date__lte=until)
+
+        expense_rows = _rows(
+            expenses.order_by().values_list("paid_by", paise("amount")), 2
+        )
+        split_rows = _rows(
+            splits.order_by().values_list("user", "expense__paid_by", paise("amount")),
+            3,
+        )
+        transaction_rows = _rows(
+            transactions.order_by().values_list(
+                "from_user", "to_user", paise("amount")
+            ),
+            3,
+        )
+        member_ids = (
+            group.members.values_list("id", flat=True) if include_members else []
+        )
+        return cls(member_ids, expense_rows, split_rows, transaction_rows)
+
+    @property
+    def net(self):
+        """
+        Net balance per dense index, positive when the group owes the user.
+        """
+        return self.paid - self.owed + self.sent - self.received
+
+    def member_totals(self):
+        """
+        Returns:
+            dict: Maps user id to its paid, owed, sent and received Decimals.
+        """
+        return {
+            int(user_id): {
+                "paid": to_decimal(self.paid[index]),
+                "owed": to_decimal(self.owed[index]),
+                "sent": to_decimal(self.sent[index]),
+                "received": to_decimal(self.received[index]),
+            }
+            for index, user_id in enumerate(self.user_ids)
+        }
+
+    def pair_debts(self):
+        """
+        Returns:
+            dict: Maps (debtor id, creditor id) to the gross Decimal amount, for
+                every non-zero cell of the debt matrix.
+        """
+        debtors, creditors = self.debts.nonzero()
+        return {
+            (int(self.user_ids[i]), int(self.user_ids[j])): to_decimal(self.debts[i, j])
+            for i, j in zip(debtors, creditors)
+        }
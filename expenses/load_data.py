@@ -0,0 +1,140 @@
+"""
+Synthetic groups for load testing.
+
+Rows are written with bulk_create, which skips the model signals, so the
+ledger tables are rebuilt and the summary version bumped once per group.
+"""
+
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.utils import timezone
+
+from auth_app.models import Activity
+from groups.models import ExpenseGroup, GroupMembership
+from groups.utils import bump_summary_version
+from transactions.models import Transaction
+from .feed import rebuild_expense_feed
+from .ledger import rebuild_group_balances
+from .ledger_core import split_evenly, to_decimal, to_paise
+from .models import Expense, Split
+
+TITLES = ["Dinner", "Groceries", "Cab", "Movie", "Rent", "Coffee", "Flight", "Hotel"]
+ACTIVITY_NAMES = ["Expense Added", "Expense Updated", "Settle Up", "Group Updated"]
+BATCH_SIZE = 1000
+
+
+def seed_group(rng, members, expenses, settle_ups=0, activities=0, days=365):
+    """
+    Create a group with random expenses, settle-ups and activities spread
+    over the last `days` days.
+
+    Args:
+        rng (random.Random): Source of randomness, seed it for repeatable data.
+        members (int): Number of new users in the group (at least 2).
+        expenses (int): Number of expenses, each split evenly between 2 to 6
+            members.
+        settle_ups (int): Number of settle-up transactions.
+        activities (int): Number of activity log rows.
+        days (int): How far back the expense and settle-up dates go.
+
+    Returns:
+        ExpenseGroup: The group; its first member is the creator.
+    """
+    token = uuid.uuid4().hex[:8]
+    users = User.objects.bulk_create(
+        [
+            User(username=f"load-{token}-{index}", password="!")
+            for index in range(members)
+        ],
+        batch_size=BATCH_SIZE,
+    )
+    group = ExpenseGroup.objects.create(name=f"Load {token}", created_by=users[0])
+    GroupMembership.objects.bulk_create(
+        [GroupMembership(group=group, user=user) for user in users],
+        batch_size=BATCH_SIZE,
+    )
+
+    now = timezone.now()
+
+    def random_date():
+        return now - timedelta(seconds=rng.randrange(days * 24 * 60 * 60))
+
+    expense_rows = []
+    sharers_by_expense = []
+    for _ in range(expenses):
+        sharers = rng.sample(users, rng.randint(2, min(6, members)))
+        expense_date = random_date()
+        expense_rows.append(
+            Expense(
+                group=group,
+                title=rng.choice(TITLES),
+                amount=to_decimal(rng.randint(100, 500000)),
+                paid_by=rng.choice(sharers),
+                created_at=expense_date,
+                expense_date=expense_date,
+            )
+        )
+        sharers_by_expense.append(sharers)
+    expense_rows = Expense.objects.bulk_create(expense_rows, batch_size=BATCH_SIZE)
+
+    split_rows = []
+    split_between_rows = []
+    for expense, sharers in zip(expense_rows, sharers_by_expense):
+        shares = split_evenly(to_paise(expense.amount), len(sharers))
+        for user, share in zip(sharers, shares):
+            split_rows.append(
+                Split(expense=expense, user=user, amount=to_decimal(share))
+            )
+            split_between_rows.append(
+                Expense.split_between.through(expense=expense, user=user)
+            )
+    Split.objects.bulk_create(split_rows, batch_size=BATCH_SIZE)
+    Expense.split_between.through.objects.bulk_create(
+        split_between_rows, batch_size=BATCH_SIZE
+    )
+
+    transaction_rows = []
+    for _ in range(settle_ups):
+        from_user, to_user = rng.sample(users, 2)
+        transaction_date = random_date()
+        transaction_rows.append(
+            Transaction(
+                group=group,
+                from_user=from_user,
+                to_user=to_user,
+                amount=Decimal(rng.randint(1, 2000)),
+                created_at=transaction_date,
+                transaction_date=transaction_date,
+            )
+        )
+    Transaction.objects.bulk_create(transaction_rows, batch_size=BATCH_SIZE)
+
+    group_type = ContentType.objects.get_for_model(ExpenseGroup)
+    expense_type = ContentType.objects.get_for_model(Expense)
+    activity_rows = []
+    for _ in range(activities):
+        if expense_rows and rng.random() < 0.5:
+            content_type, object_id = expense_type, rng.choice(expense_rows).id
+        else:
+            content_type, object_id = group_type, group.id
+        name = rng.choice(ACTIVITY_NAMES)
+        activity_rows.append(
+            Activity(
+                user=rng.choice(users),
+                name=name,
+                description=f"{name} in '{group.name}'.",
+                content_type=content_type,
+                object_id=object_id,
+                group=group,
+            )
+        )
+    Activity.objects.bulk_create(activity_rows, batch_size=BATCH_SIZE)
+
+    rebuild_expense_feed(Expense.objects.filter(group=group))
+    rebuild_group_balances(group)
+    bump_summary_version(group.id)
+    return group
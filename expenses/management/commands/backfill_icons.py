@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+
+from expenses.models import Expense
+from expenses.utils import DEFAULT_EXPENSE_ICON, classify_icons
+
+
+class Command(BaseCommand):
+    help = "Re-classify expense icons, e.g. after ICON_MAP changed."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+        parser.add_argument(
+            "--group",
+            type=int,
+            nargs="+",
+            dest="group_ids",
+            help="Only these group ids (default: all groups).",
+        )
+        parser.add_argument(
+            "--only-default",
+            action="store_true",
+            help=f"Only expenses still showing the default {DEFAULT_EXPENSE_ICON} icon.",
+        )
+        parser.add_argument(
+            "--no-llm",
+            action="store_true",
+            help="Keyword matching only; unmatched expenses keep their icon.",
+        )
+
+    def handle(self, *args, **options):
+        expenses = Expense.objects.order_by("id").only(
+            "id", "title", "notes", "expense_icon"
+        )
+        if options["group_ids"]:
+            expenses = expenses.filter(group_id__in=options["group_ids"])
+        if options["only_default"]:
+            expenses = expenses.filter(expense_icon=DEFAULT_EXPENSE_ICON)
+
+        self.seen = self.updated = 0
+        chunk = []
+        for expense in expenses.iterator(chunk_size=options["chunk_size"]):
+            chunk.append(expense)
+            if len(chunk) >= options["chunk_size"]:
+                self.backfill(chunk, options)
+                chunk = []
+        self.backfill(chunk, options)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated the icon of {self.updated} of {self.seen} expenses."
+            )
+        )
+
+    def backfill(self, expenses, options):
+        if not expenses:
+            return
+        icons = classify_icons(
+            [expense.title for expense in expenses],
+            [expense.notes for expense in expenses],
+            use_llm=not options["no_llm"],
+        )
+        changed = []
+        for expense, icon in zip(expenses, icons):
+            # Unresolved texts keep whatever icon they were given before
+            if icon != DEFAULT_EXPENSE_ICON and icon != expense.expense_icon:
+                expense.expense_icon = icon
+                changed.append(expense)
+        # bulk_update skips the save signals: icons don't change the summary
+        Expense.objects.bulk_update(changed, ["expense_icon"])
+        self.seen += len(expenses)
+        self.updated += len(changed)
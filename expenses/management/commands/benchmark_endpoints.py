@@ -0,0 +1,176 @@
+import json
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import resolve, reverse
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory, force_authenticate
+
+from expenses.load_data import seed_group
+from expenses.summary_cache import clear_summary_cache, summary_cache_key
+
+
+def last_year():
+    return {"start_date": (timezone.localdate() - timedelta(days=366)).isoformat()}
+
+
+# (label, url name, takes the group id, builds the query params)
+ENDPOINTS = [
+    ("summary", "expense_summary", True, dict),
+    ("expense_list", "list_expenses", True, dict),
+    ("person_expenses", "user_expense_list", False, dict),
+    ("activities", "group_activities", True, dict),
+    ("total_spent", "user_monthly_expense_list", False, last_year),
+]
+
+
+def measure(view, request, kwargs):
+    start = time.perf_counter()
+    response = view(request, **kwargs)
+    response.render()
+    return (time.perf_counter() - start) * 1000, response
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the main read endpoints over growing synthetic groups and write "
+        "wall time, query count and peak memory to a JSON report."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--sizes",
+            type=int,
+            nargs="+",
+            default=[100, 1000, 10000],
+            help="Expenses per seeded group; settle-ups are a tenth of it.",
+        )
+        parser.add_argument("--members", type=int, default=10)
+        parser.add_argument("--repeat", type=int, default=5)
+        parser.add_argument("--seed", type=int, default=0)
+        parser.add_argument("--output", default="benchmark_endpoints.json")
+        parser.add_argument(
+            "--compare", help="An earlier report to print the change against."
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Keep the seeded data instead of rolling it back.",
+        )
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        factory = APIRequestFactory()
+        results = []
+
+        for size in options["sizes"]:
+            with transaction.atomic():
+                group = seed_group(
+                    rng,
+                    members=options["members"],
+                    expenses=size,
+                    settle_ups=size // 10,
+                    activities=size,
+                )
+                group.refresh_from_db()
+                for label, name, by_group, params in ENDPOINTS:
+                    results.append(
+                        self.benchmark(
+                            factory, group, label, name, by_group, params, size, options
+                        )
+                    )
+
+                # Summaries are cached per (group id, version), and the ids are
+                # handed out again once the seed rows are rolled back.
+                cache.delete(summary_cache_key(group.id, group.summary_version, False))
+                clear_summary_cache()
+                if not options["keep"]:
+                    transaction.set_rollback(True)
+
+        report = {
+            "created_at": timezone.now().isoformat(),
+            "database": connection.vendor,
+            "members": options["members"],
+            "repeat": options["repeat"],
+            "seed": options["seed"],
+            "results": results,
+        }
+        with open(options["output"], "w") as report_file:
+            json.dump(report, report_file, indent=2)
+
+        baseline = {}
+        if options["compare"]:
+            with open(options["compare"]) as baseline_file:
+                baseline = {
+                    (row["endpoint"], row["expenses"]): row
+                    for row in json.load(baseline_file)["results"]
+                }
+        self.print_results(results, baseline)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}."))
+
+    def benchmark(self, factory, group, label, name, by_group, params, size, options):
+        """
+        Time one endpoint; the first call is reported apart since it fills the
+        caches the following calls read.
+        """
+        args = [group.id] if by_group else []
+        path = reverse(name, args=args)
+        view, _, kwargs = resolve(path)
+        params = params()
+
+        def make_request():
+            request = factory.get(path, params)
+            force_authenticate(request, user=group.created_by)
+            return request
+
+        clear_summary_cache()
+        with CaptureQueriesContext(connection) as cold_queries:
+            cold_ms, response = measure(view, make_request(), kwargs)
+
+        timings = []
+        for _ in range(options["repeat"]):
+            with CaptureQueriesContext(connection) as warm_queries:
+                elapsed, _ = measure(view, make_request(), kwargs)
+            timings.append(elapsed)
+
+        # tracemalloc slows every allocation down, so it gets its own run
+        tracemalloc.start()
+        measure(view, make_request(), kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+
+        return {
+            "endpoint": label,
+            "expenses": size,
+            "status": response.status_code,
+            "cold_ms": round(cold_ms, 2),
+            "cold_queries": len(cold_queries),
+            "median_ms": round(statistics.median(timings), 2) if timings else None,
+            "max_ms": round(max(timings), 2) if timings else None,
+            "queries": len(warm_queries) if timings else len(cold_queries),
+            "peak_kb": round(peak / 1024, 1),
+            "response_kb": round(len(response.content) / 1024, 1),
+        }
+
+    def print_results(self, results, baseline):
+        self.stdout.write(
+            f"{'endpoint':>16} {'expenses':>9} {'cold ms':>9} {'median ms':>10}"
+            f" {'queries':>8} {'peak kb':>9} {'vs base':>8}"
+        )
+        for row in results:
+            before = baseline.get((row["endpoint"], row["expenses"]))
+            change = ""
+            if before and before.get("median_ms") and row["median_ms"] is not None:
+                change = f"{row['median_ms'] / before['median_ms'] - 1:+.0%}"
+            median = row["median_ms"] if row["median_ms"] is not None else "-"
+            self.stdout.write(
+                f"{row['endpoint']:>16} {row['expenses']:>9} {row['cold_ms']:>9}"
+                f" {median:>10} {row['queries']:>8} {row['peak_kb']:>9} {change:>8}"
+            )
@@ -0,0 +1,54 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from expenses.simplify import SIMPLIFY_ENGINES
+
+
+def random_balances(members, expenses, rng):
+    """
+    Net balances in paise produced by random expenses shared inside small
+    sub-groups, which is what real groups look like.
+    """
+    balances = dict.fromkeys(range(1, members + 1), 0)
+    for _ in range(expenses):
+        sharers = rng.sample(sorted(balances), rng.randint(2, min(4, members)))
+        share = rng.randint(1, 200) * 50
+        payer = rng.choice(sharers)
+        for user_id in sharers:
+            balances[user_id] -= share
+        balances[payer] += share * len(sharers)
+    return balances
+
+
+class Command(BaseCommand):
+    help = "Compare transfer counts and runtime of the debt simplification engines."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", type=int, nargs="+", default=[4, 8, 12, 16, 20])
+        parser.add_argument("--trials", type=int, default=20)
+        parser.add_argument("--expenses", type=int, default=15)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        self.stdout.write(
+            f"{'members':>8} {'engine':>8} {'transfers':>10} {'avg ms':>9} {'max ms':>9}"
+        )
+        for size in options["sizes"]:
+            samples = [
+                random_balances(size, options["expenses"], rng)
+                for _ in range(options["trials"])
+            ]
+            for name, engine in SIMPLIFY_ENGINES.items():
+                transfers = 0
+                timings = []
+                for balances in samples:
+                    start = time.perf_counter()
+                    transfers += len(engine(balances))
+                    timings.append((time.perf_counter() - start) * 1000)
+                self.stdout.write(
+                    f"{size:>8} {name:>8} {transfers / len(samples):>10.2f}"
+                    f" {sum(timings) / len(timings):>9.2f} {max(timings):>9.2f}"
+                )
@@ -0,0 +1,47 @@
+from datetime import datetime, time, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from expenses.checkpoints import create_checkpoint
+from groups.models import ExpenseGroup
+
+
+class Command(BaseCommand):
+    help = "Snapshot group ledgers so historical summaries only replay newer rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            help="Checkpoint at the end of this day, YYYY-MM-DD "
+            "(default: the last day of the previous month).",
+        )
+        parser.add_argument(
+            "--group",
+            type=int,
+            nargs="+",
+            dest="group_ids",
+            help="Only checkpoint these group ids (default: all groups).",
+        )
+
+    def handle(self, *args, **options):
+        if options["date"]:
+            day = parse_date(options["date"])
+            if day is None:
+                raise CommandError("--date must use the YYYY-MM-DD format.")
+        else:
+            day = timezone.localdate().replace(day=1) - timedelta(days=1)
+        as_of = timezone.make_aware(datetime.combine(day, time.max))
+
+        groups = ExpenseGroup.objects.order_by("id")
+        if options["group_ids"]:
+            groups = groups.filter(id__in=options["group_ids"])
+
+        count = 0
+        for group in groups.iterator():
+            create_checkpoint(group, as_of)
+            count += 1
+        self.stdout.write(
+            self.style.SUCCESS(f"Checkpointed {count} groups as of {day.isoformat()}.")
+        )
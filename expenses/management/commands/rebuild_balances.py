@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from expenses.feed import rebuild_expense_feed
+from expenses.ledger import rebuild_group_balances
+from expenses.models import Expense
+from groups.models import ExpenseGroup
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the per-member balance ledger and the per-user expense feed "
+        "from expenses and transactions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--group",
+            type=int,
+            nargs="+",
+            dest="group_ids",
+            help="Only rebuild these group ids (default: all groups).",
+        )
+
+    def handle(self, *args, **options):
+        groups = ExpenseGroup.objects.order_by("id")
+        if options["group_ids"]:
+            groups = groups.filter(id__in=options["group_ids"])
+
+        count = 0
+        for group in groups.iterator():
+            rebuild_group_balances(group)
+            rebuild_expense_feed(Expense.objects.filter(group=group))
+            count += 1
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt balances for {count} groups."))
@@ -0,0 +1,39 @@
+import random
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from expenses.load_data import seed_group
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate synthetic groups, expenses, settle-ups and activities for load tests."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--groups", type=int, default=1)
+        parser.add_argument("--members", type=int, default=10)
+        parser.add_argument("--expenses", type=int, default=1000)
+        parser.add_argument("--settle-ups", type=int, default=100)
+        parser.add_argument("--activities", type=int, default=1000)
+        parser.add_argument("--days", type=int, default=365)
+        parser.add_argument("--seed", type=int, default=0)
+
+    def handle(self, *args, **options):
+        if options["members"] < 2:
+            raise CommandError("--members must be at least 2.")
+
+        rng = random.Random(options["seed"])
+        for _ in range(options["groups"]):
+            with transaction.atomic():
+                group = seed_group(
+                    rng,
+                    members=options["members"],
+                    expenses=options["expenses"],
+                    settle_ups=options["settle_ups"],
+                    activities=options["activities"],
+                    days=options["days"],
+                )
+            self.stdout.write(f"Created group {group.id} ({group.name}).")
+        self.stdout.write(self.style.SUCCESS(f"Seeded {options['groups']} groups."))
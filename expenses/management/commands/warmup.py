@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from utils.keep_db_alive import warm_up
+
+
+class Command(BaseCommand):
+    help = (
+        "Open the database connection and load the caches and SDKs the first "
+        "requests need, printing how long each step took."
+    )
+
+    def handle(self, *args, **options):
+        for step, milliseconds in warm_up().items():
+            self.stdout.write(f"{step:>16} {milliseconds:>10.2f} ms")
@@ -0,0 +1,94 @@
+# Generated by Django 5.2 on 2026-10-18 19:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_group_balances(apps, schema_editor):
+    Expense = apps.get_model("expenses", "Expense")
+    Split = apps.get_model("expenses", "Split")
+    Transaction = apps.get_model("transactions", "Transaction")
+    GroupBalance = apps.get_model("expenses", "GroupBalance")
+
+    balances = {}
+    sources = [
+        (Expense.objects.values("group", "paid_by"), "paid_by", "paid"),
+        (Split.objects.values("expense__group", "user"), "user", "owed"),
+        (Transaction.objects.values("group", "from_user"), "from_user", "sent"),
+        (Transaction.objects.values("group", "to_user"), "to_user", "received"),
+    ]
+    for queryset, user_field, field in sources:
+        rows = queryset.annotate(total=models.Sum("amount")).order_by()
+        for row in rows:
+            group_id = row.get("group", row.get("expense__group"))
+            key = (group_id, row[user_field])
+            balances.setdefault(key, {})[field] = row["total"] or 0
+
+    GroupBalance.objects.bulk_create(
+        GroupBalance(group_id=group_id, user_id=user_id, **totals)
+        for (group_id, user_id), totals in balances.items()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0003_expense_expense_date"),
+        ("groups", "0005_expensegroup_group_icon"),
+        ("transactions", "0003_transaction_description"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="GroupBalance",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "paid",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "owed",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "sent",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "received",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balances",
+                        to="groups.expensegroup",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="group_balances",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("group", "user")},
+            },
+        ),
+        migrations.RunPython(backfill_group_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,100 @@
+# Generated by Django 5.2 on 2026-10-18 19:58
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_pairwise_debts(apps, schema_editor):
+    Split = apps.get_model("expenses", "Split")
+    Transaction = apps.get_model("transactions", "Transaction")
+    PairwiseDebt = apps.get_model("expenses", "PairwiseDebt")
+
+    debts = {}
+    splits = (
+        Split.objects.exclude(user=models.F("expense__paid_by"))
+        .values("expense__group", "user", "expense__paid_by")
+        .annotate(total=models.Sum("amount"))
+        .order_by()
+    )
+    for row in splits:
+        key = (row["expense__group"], row["user"], row["expense__paid_by"])
+        debts[key] = debts.get(key, 0) + row["total"]
+    settle_ups = (
+        Transaction.objects.values("group", "from_user", "to_user")
+        .annotate(total=models.Sum("amount"))
+        .order_by()
+    )
+    for row in settle_ups:
+        key = (row["group"], row["from_user"], row["to_user"])
+        debts[key] = debts.get(key, 0) - row["total"]
+
+    PairwiseDebt.objects.bulk_create(
+        PairwiseDebt(
+            group_id=group_id,
+            debtor_id=debtor_id,
+            creditor_id=creditor_id,
+            amount=amount,
+        )
+        for (group_id, debtor_id, creditor_id), amount in debts.items()
+        if amount
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0004_groupbalance"),
+        ("groups", "0005_expensegroup_group_icon"),
+        ("transactions", "0003_transaction_description"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="PairwiseDebt",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                (
+                    "creditor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="credits",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "debtor",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="debts",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="pairwise_debts",
+                        to="groups.expensegroup",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("group", "debtor", "creditor")},
+            },
+        ),
+        migrations.RunPython(backfill_pairwise_debts, migrations.RunPython.noop),
+    ]
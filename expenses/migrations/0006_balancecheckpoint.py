@@ -0,0 +1,45 @@
+# Generated by Django 5.2 on 2026-10-18 20:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0005_pairwisedebt"),
+        ("groups", "0007_expensegroup_simplify_engine"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="BalanceCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("as_of", models.DateTimeField()),
+                ("total_spend", models.BigIntegerField(default=0)),
+                ("balances", models.JSONField(default=dict)),
+                ("pair_debts", models.JSONField(default=dict)),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="balance_checkpoints",
+                        to="groups.expensegroup",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("group", "as_of")},
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2 on 2026-10-18 20:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0006_balancecheckpoint"),
+        ("groups", "0007_expensegroup_simplify_engine"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="expense",
+            index=models.Index(
+                fields=["group", "-expense_date"], name="expense_group_date_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="split",
+            index=models.Index(
+                fields=["user", "expense"], name="split_user_expense_idx"
+            ),
+        ),
+    ]
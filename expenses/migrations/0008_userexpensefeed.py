@@ -0,0 +1,105 @@
+# Generated by Django 5.2 on 2026-10-18 20:56
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_user_expense_feed(apps, schema_editor):
+    Expense = apps.get_model("expenses", "Expense")
+    Split = apps.get_model("expenses", "Split")
+    UserExpenseFeed = apps.get_model("expenses", "UserExpenseFeed")
+    SplitBetween = Expense.split_between.through
+
+    group_ids = Expense.objects.values_list("group_id", flat=True).distinct()
+    for group_id in group_ids.order_by("group_id"):
+        shares = {
+            (expense_id, user_id): amount
+            for expense_id, user_id, amount in Split.objects.filter(
+                expense__group_id=group_id
+            ).values_list("expense_id", "user_id", "amount")
+        }
+        members = SplitBetween.objects.filter(expense__group_id=group_id).values_list(
+            "expense_id", "user_id", "expense__expense_date"
+        )
+        UserExpenseFeed.objects.bulk_create(
+            (
+                UserExpenseFeed(
+                    user_id=user_id,
+                    expense_id=expense_id,
+                    group_id=group_id,
+                    expense_date=expense_date,
+                    share_amount=shares.get((expense_id, user_id), 0),
+                )
+                for expense_id, user_id, expense_date in members
+            ),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("expenses", "0007_expense_split_indexes"),
+        ("groups", "0007_expensegroup_simplify_engine"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="UserExpenseFeed",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("expense_date", models.DateTimeField()),
+                (
+                    "share_amount",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=10),
+                ),
+                (
+                    "expense",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="feed_entries",
+                        to="expenses.expense",
+                    ),
+                ),
+                (
+                    "group",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="groups.expensegroup",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="expense_feed",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-expense_date"], name="feed_user_date_idx"
+                    ),
+                    models.Index(
+                        fields=["user", "group", "-expense_date"],
+                        name="feed_user_group_date_idx",
+                    ),
+                ],
+                "unique_together": {("user", "expense")},
+            },
+        ),
+        migrations.RunPython(backfill_user_expense_feed, migrations.RunPython.noop),
+    ]
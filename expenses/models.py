@@ -22,9 +22,46 @@ class Expense(models.Model):
         max_length=255, blank=True, null=True, default="💸"
     )  # Optional icon for the expense
 
+    # Fields whose stored values are remembered at load time, see from_db()
+    TRACKED_FIELDS = ("title", "notes")
+
+    class Meta:
+        indexes = [
+            # Expense lists of a group, newest first
+            models.Index(
+                fields=["group", "-expense_date"], name="expense_group_date_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.title} - {self.amount} paid by {self.paid_by.username}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember what was loaded so a save can tell what changed without
+        # fetching the row again.
+        instance._loaded_values = {
+            name: value
+            for name, value in zip(field_names, values)
+            if name in cls.TRACKED_FIELDS
+        }
+        return instance
+
+    def get_loaded_values(self):
+        """
+        Stored values of TRACKED_FIELDS, or None for an unsaved expense. Falls
+        back to a query when the expense was not loaded with all of them.
+        """
+        if self._state.adding:
+            return None
+        loaded = getattr(self, "_loaded_values", {})
+        if len(loaded) < len(self.TRACKED_FIELDS):
+            loaded = (
+                Expense.objects.filter(id=self.id).values(*self.TRACKED_FIELDS).first()
+            )
+        return loaded
+
     def split_amount(self):
         # Split amount evenly among users
         num_users = self.split_between.count()
@@ -41,8 +78,114 @@ class Split(models.Model):
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # A user's share of expenses, e.g. their monthly spend
+            models.Index(fields=["user", "expense"], name="split_user_expense_idx"),
+        ]
+
     def __str__(self):
         return f"{self.user.username} owes {self.amount} for {self.expense.title}"
 
 
+class GroupBalance(models.Model):
+    """
+    Running per-member totals for a group, kept up to date with F() deltas
+    whenever an expense or settle-up is written (see expenses/ledger.py).
+    """
+
+    group = models.ForeignKey(
+        ExpenseGroup, related_name="balances", on_delete=models.CASCADE
+    )
+    user = models.ForeignKey(
+        User, related_name="group_balances", on_delete=models.CASCADE
+    )
+    paid = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    owed = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    sent = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    received = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("group", "user")
+
+    def __str__(self):
+        return f"{self.user.username} in {self.group.name}"
+
+
+class PairwiseDebt(models.Model):
+    """
+    Gross amount one member owes another within a group. Splits add to the
+    (split user, payer) pair and settle-ups subtract from the (sender,
+    receiver) pair; the net debt of two users is the difference of both
+    directions.
+    """
+
+    group = models.ForeignKey(
+        ExpenseGroup, related_name="pairwise_debts", on_delete=models.CASCADE
+    )
+    debtor = models.ForeignKey(User, related_name="debts", on_delete=models.CASCADE)
+    creditor = models.ForeignKey(User, related_name="credits", on_delete=models.CASCADE)
+    amount = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("group", "debtor", "creditor")
+
+    def __str__(self):
+        return f"{self.debtor.username} owes {self.amount} to {self.creditor.username}"
+
+
+class BalanceCheckpoint(models.Model):
+    """
+    Snapshot of a group's ledger covering every expense and settle-up dated
+    up to `as_of`, stored in integer paise. Historical summaries start from the
+    nearest checkpoint and only replay the rows dated after it.
+    """
+
+    group = models.ForeignKey(
+        ExpenseGroup, related_name="balance_checkpoints", on_delete=models.CASCADE
+    )
+    as_of = models.DateTimeField()
+    total_spend = models.BigIntegerField(default=0)
+    balances = models.JSONField(default=dict)  # {user id: net paise}
+    pair_debts = models.JSONField(default=dict)  # {"debtor:creditor": paise}
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        unique_together = ("group", "as_of")
+
+    def __str__(self):
+        return f"{self.group.name} as of {self.as_of}"
+
+
 # Paid by multiple users
+
+
+class UserExpenseFeed(models.Model):
+    """
+    One row per (user, expense) the user shares, with the user's share.
+    Denormalized from Expense.split_between and Split so a user's expense
+    list and monthly spend are range scans of one table (see expenses/feed.py).
+    """
+
+    user = models.ForeignKey(
+        User, related_name="expense_feed", on_delete=models.CASCADE
+    )
+    expense = models.ForeignKey(
+        Expense, related_name="feed_entries", on_delete=models.CASCADE
+    )
+    group = models.ForeignKey(ExpenseGroup, related_name="+", on_delete=models.CASCADE)
+    expense_date = models.DateTimeField()  # Copied from the expense
+    share_amount = models.DecimalField(max_digits=10, decimal_places=2, default=0)
+
+    class Meta:
+        unique_together = ("user", "expense")
+        indexes = [
+            models.Index(fields=["user", "-expense_date"], name="feed_user_date_idx"),
+            models.Index(
+                fields=["user", "group", "-expense_date"],
+                name="feed_user_group_date_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} shares {self.share_amount} of {self.expense_id}"
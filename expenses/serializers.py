@@ -1,16 +1,40 @@
+from datetime import datetime, time, timedelta
+
 from rest_framework import serializers
 
 from auth_app.serializers import UserSerializer
 from auth_app.utils import log_activity
 from expenses.utils import get_expense_icon
-from .models import Expense, Split
+from .feed import write_expense_feed
+from .ledger import record_expense
+from .models import Expense, Split, UserExpenseFeed
 from django.contrib.auth.models import User
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Prefetch, prefetch_related_objects
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from .simplify import SIMPLIFY_ENGINES
+from .summary_cache import get_cached_summary
 from .summray_calculate import ExpenseSummary
 
 
+class UserIdField(serializers.PrimaryKeyRelatedField):
+    """
+    Accepts a user id without loading the user. ExpenseSerializer.validate()
+    resolves every id of a request with one group membership query.
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, bool):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+        try:
+            return int(data)
+        except (TypeError, ValueError):
+            self.fail("incorrect_type", data_type=type(data).__name__)
+
+
 class SplitInputSerializer(serializers.Serializer):
-    user = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
+    user = UserIdField(queryset=User.objects.all())
     amount = serializers.DecimalField(max_digits=10, decimal_places=2)
 
 
@@ -24,13 +48,9 @@ class SplitSerializer(serializers.ModelSerializer):
 
 class ExpenseSerializer(serializers.ModelSerializer):
     paid_by = UserSerializer(read_only=True)
-    paid_by_id = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.all(), write_only=True
-    )
+    paid_by_id = UserIdField(queryset=User.objects.all(), write_only=True)
     # paid_by = serializers.PrimaryKeyRelatedField(queryset=User.objects.all())
-    split_between = serializers.PrimaryKeyRelatedField(
-        queryset=User.objects.all(), many=True
-    )
+    split_between = UserIdField(queryset=User.objects.all(), many=True)
     splits = SplitInputSerializer(many=True, write_only=True, required=False)
     splits_detail = SplitSerializer(source="splits", many=True, read_only=True)
 
@@ -54,30 +74,43 @@ class ExpenseSerializer(serializers.ModelSerializer):
 
     def validate(self, data):
         group = data.get("group")
-        split_users = data.get("split_between")
-        paid_by = data.get("paid_by") or data.get("paid_by_id")
+        split_users = data.get("split_between", [])
+        paid_by = data.get("paid_by_id")
         splits = data.get("splits", [])
 
         if group is None:
             raise serializers.ValidationError("Group is required.")
 
-        group_members = group.members.all()
+        # Resolve every referenced user, and the requesting one, in one query
+        request = self.context.get("request")
+        user_ids = {paid_by, *split_users, *(split["user"] for split in splits)}
+        if request and request.user.is_authenticated:
+            user_ids.add(request.user.id)
+        user_ids.discard(None)
+        members = {user.id: user for user in group.members.filter(id__in=user_ids)}
+        self.group_member_ids = set(members)
 
         # Check if paid_by user is part of the group
-        if not group_members.filter(id=paid_by.id):
+        if paid_by not in members:
+            self.check_users_exist([paid_by], "paid_by_id")
             raise serializers.ValidationError("Payer must be a member of the group.")
 
         # Check if all users in split_between are part of the group
-        invalid_users = [user for user in split_users if user not in group_members]
-        if invalid_users:
-            names = ", ".join([user.username for user in invalid_users])
+        invalid_ids = [
+            user_id
+            for user_id in split_users + [split["user"] for split in splits]
+            if user_id not in members
+        ]
+        if invalid_ids:
+            usernames = self.check_users_exist(invalid_ids, "split_between")
+            names = ", ".join(usernames[user_id] for user_id in invalid_ids)
             raise serializers.ValidationError(
                 f"The following users are not in the group: {names}"
             )
 
         if splits:
-            split_user_ids = {split["user"].id for split in splits}
-            expected_user_ids = {user.id for user in split_users}
+            split_user_ids = {split["user"] for split in splits}
+            expected_user_ids = set(split_users)
             if split_user_ids != expected_user_ids:
                 raise serializers.ValidationError(
                     "Mismatch between split_between users and splits data."
@@ -89,34 +122,73 @@ class ExpenseSerializer(serializers.ModelSerializer):
                     "Split amounts must add up to total expense."
                 )
 
+        data["paid_by_id"] = members[paid_by]
+        data["split_between"] = [
+            members[user_id] for user_id in dict.fromkeys(split_users)
+        ]
+        for split in splits:
+            split["user"] = members[split["user"]]
         return data
 
+    def check_users_exist(self, user_ids, field):
+        """
+        Map the ids to usernames, failing on ids that are not users at all.
+        Only runs on the error path.
+        """
+        usernames = dict(
+            User.objects.filter(id__in=user_ids).values_list("id", "username")
+        )
+        missing = [user_id for user_id in user_ids if user_id not in usernames]
+        if missing:
+            raise serializers.ValidationError(
+                {
+                    field: [
+                        f'Invalid pk "{user_id}" - object does not exist.'
+                        for user_id in missing
+                    ]
+                }
+            )
+        return usernames
+
+    @transaction.atomic
     def create(self, validated_data):
         # Handle the creation of an expense
         split_between_users = validated_data.pop("split_between")
         paid_by_user = validated_data.pop("paid_by_id")
+        validated_data.pop("paid_by", None)
 
-        splits_data = validated_data.pop("splits")
+        splits_data = validated_data.pop("splits", [])
 
-        expense = Expense.objects.create(**validated_data)
-        expense.paid_by = paid_by_user
-        expense.split_between.set(split_between_users)
+        # Everything is set before the first save, so the row is inserted once
+        expense = Expense(**validated_data, paid_by=paid_by_user)
         expense.expense_icon = get_expense_icon(expense.title, expense.notes)
         expense.save()
+        Expense.split_between.through.objects.bulk_create(
+            Expense.split_between.through(expense=expense, user=user)
+            for user in split_between_users
+        )
 
-        for split in splits_data:
-            Split.objects.create(
-                expense=expense, user=split["user"], amount=split["amount"]
-            )
+        splits = Split.objects.bulk_create(
+            Split(expense=expense, user=split["user"], amount=split["amount"])
+            for split in splits_data
+        )
+        record_expense(expense, splits)
+        write_expense_feed(expense, [user.id for user in split_between_users], splits)
+        self.prefetch_representation(expense)
 
         return expense
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         # Handle updates to an existing expense
         split_between_users = validated_data.pop("split_between", None)
         paid_by_user = validated_data.pop("paid_by_id")
 
         splits_data = validated_data.pop("splits", None)
+        # Take the old amounts out of the ledger before anything changes
+        old_splits = list(instance.splits.all())
+        old_feed_key = (instance.group_id, instance.expense_date)
+        record_expense(instance, old_splits, sign=-1)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
         if split_between_users is not None:
@@ -124,16 +196,86 @@ class ExpenseSerializer(serializers.ModelSerializer):
         if paid_by_user is not None:
             instance.paid_by = paid_by_user
         instance.save()
+        splits = old_splits
         if splits_data is not None:
-            # Remove old splits
-            instance.splits.all().delete()
-            # Add new ones
-            for split in splits_data:
-                Split.objects.create(
-                    expense=instance, user=split["user"], amount=split["amount"]
-                )
+            splits = self.replace_splits(instance, old_splits, splits_data)
+        record_expense(instance, splits)
+        self.prefetch_representation(instance)
+        if (
+            split_between_users is not None
+            or splits_data is not None
+            or old_feed_key != (instance.group_id, instance.expense_date)
+        ):
+            write_expense_feed(
+                instance,
+                [user.id for user in instance.split_between.all()],
+                splits,
+                replace=True,
+            )
         return instance
 
+    @staticmethod
+    def representation_prefetches(prefix=""):
+        """
+        Prefetches for the related rows the representation reads: split user
+        ids, and the splits with their users' names.
+
+        Args:
+            prefix (str): Path from the queried model to the expense, e.g.
+                "expense__" when listing UserExpenseFeed rows.
+        """
+        return [
+            Prefetch(f"{prefix}split_between", queryset=User.objects.only("id")),
+            Prefetch(f"{prefix}splits", queryset=Split.objects.select_related("user")),
+        ]
+
+    @classmethod
+    def eager_load(cls, queryset, prefix=""):
+        """
+        Make a queryset load everything the representation reads: the rows
+        with their payers, then one query each for split users and splits,
+        however many rows there are.
+        """
+        return queryset.select_related(f"{prefix}paid_by").prefetch_related(
+            *cls.representation_prefetches(prefix)
+        )
+
+    @classmethod
+    def prefetch_representation(cls, expense):
+        # The response lists split users and split usernames; load them with
+        # two queries instead of one per split.
+        prefetch_related_objects([expense], *cls.representation_prefetches())
+
+    def replace_splits(self, instance, old_splits, splits_data):
+        """
+        Bring the stored splits in line with splits_data, only touching the
+        rows that changed.
+        """
+        new_amounts = {split["user"].id: split["amount"] for split in splits_data}
+        kept = []
+        changed = []
+        removed_ids = []
+        for split in old_splits:
+            if split.user_id not in new_amounts:
+                removed_ids.append(split.id)
+                continue
+            amount = new_amounts.pop(split.user_id)
+            if split.amount != amount:
+                split.amount = amount
+                changed.append(split)
+            kept.append(split)
+
+        if removed_ids:
+            Split.objects.filter(id__in=removed_ids).delete()
+        if changed:
+            Split.objects.bulk_update(changed, ["amount"])
+        users = {split["user"].id: split["user"] for split in splits_data}
+        added = Split.objects.bulk_create(
+            Split(expense=instance, user=users[user_id], amount=amount)
+            for user_id, amount in new_amounts.items()
+        )
+        return kept + added
+
 
 class UserExpenseDetailSerializer(serializers.Serializer):
     user = UserSerializer(read_only=True)
@@ -173,7 +315,33 @@ class ExpenseSummarySerializer(serializers.Serializer):
             # )
             pass
 
-        summary_data = ExpenseSummary(instance).get_summary()
+        engine = (
+            request.query_params.get("engine") if request else None
+        ) or instance.simplify_engine
+        if engine not in SIMPLIFY_ENGINES:
+            raise serializers.ValidationError(
+                {"engine": f"Choose one of: {', '.join(SIMPLIFY_ENGINES)}."}
+            )
+
+        as_of = request.query_params.get("as_of") if request else None
+        if as_of:
+            as_of_date = parse_date(as_of)
+            if as_of_date is None:
+                raise serializers.ValidationError(
+                    {"as_of": "Use the YYYY-MM-DD format."}
+                )
+            # Historical summaries include the whole day and skip the cache,
+            # checkpoints keep them cheap instead.
+            end_of_day = timezone.make_aware(
+                datetime.combine(as_of_date, datetime.max.time())
+            )
+            return ExpenseSummary(instance, engine=engine).get_summary(as_of=end_of_day)
+
+        summary_data = get_cached_summary(
+            instance,
+            lambda: ExpenseSummary(instance, engine=engine).get_summary(),
+            engine=engine,
+        )
         return summary_data
 
 
@@ -195,8 +363,32 @@ class UserExpenseSerializer(serializers.Serializer):
             else end_date.replace(day=1)
         )
         user_id = self.context.get("user_id")
-        splits = Split.objects.filter(
-            user=user_id, expense__expense_date__range=(start_date, end_date)
+        # Whole days as an aware datetime range, end_date included
+        feed = UserExpenseFeed.objects.filter(
+            user=user_id,
+            expense_date__gte=timezone.make_aware(
+                datetime.combine(start_date, time.min)
+            ),
+            expense_date__lt=timezone.make_aware(
+                datetime.combine(end_date + timedelta(days=1), time.min)
+            ),
         )
-        total_spent = splits.aggregate(total=models.Sum("amount"))["total"]
+        if self.context.get("group_id"):
+            feed = feed.filter(group_id=self.context["group_id"])
+        total_spent = feed.aggregate(total=models.Sum("share_amount"))["total"]
         return total_spent or 0
+
+
+class UserExpenseFeedSerializer(serializers.Serializer):
+    """
+    A user's feed row, rendered as its expense plus the user's share of it.
+    """
+
+    share_amount = serializers.DecimalField(max_digits=10, decimal_places=2)
+
+    def to_representation(self, instance):
+        data = ExpenseSerializer(instance.expense, context=self.context).data
+        data["share_amount"] = self.fields["share_amount"].to_representation(
+            instance.share_amount
+        )
+        return data
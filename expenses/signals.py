@@ -1,13 +1,58 @@
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 
-from expenses.utils import get_expense_icon
+from expenses.utils import DEFAULT_EXPENSE_ICON, get_expense_icon
+from groups.utils import bump_summary_version
+from jobs.queue import enqueue_job
 from .models import Expense
 
 
 @receiver(pre_save, sender=Expense)
 def set_default_category(sender, instance, **kwargs):
-    if instance.id:
-        prev_expense = Expense.objects.get(id=instance.id)
-        if instance.title != prev_expense.title or instance.notes != prev_expense.notes:
+    prev_expense = instance.get_loaded_values()
+    if prev_expense is None:
+        # New expense: a matched icon is set now, an unmatched one later
+        if instance.expense_icon == DEFAULT_EXPENSE_ICON:
             instance.expense_icon = get_expense_icon(instance.title, instance.notes)
+        instance._generate_icon = True
+    elif (
+        instance.title != prev_expense["title"]
+        or instance.notes != prev_expense["notes"]
+    ):
+        instance.expense_icon = get_expense_icon(instance.title, instance.notes)
+        instance._generate_icon = True
+    # What is saved now is what the next save compares against
+    instance._loaded_values = {
+        field: getattr(instance, field) for field in Expense.TRACKED_FIELDS
+    }
+
+
+@receiver(post_save, sender=Expense)
+def queue_icon_generation(sender, instance, created, **kwargs):
+    # Keyword matching found nothing: let a worker ask the LLM
+    if (
+        getattr(instance, "_generate_icon", False)
+        and instance.expense_icon == DEFAULT_EXPENSE_ICON
+    ):
+        enqueue_job(
+            "expense_icon",
+            f"expense_icon:{instance.id}",
+            {
+                "expense_id": instance.id,
+                "title": instance.title,
+                "notes": instance.notes,
+            },
+            # A pending job gets the new payload; the job reads the current
+            # title when it runs, so a running one retries if it raced the edit
+            replace=not created,
+        )
+    instance._generate_icon = False
+
+
+@receiver(post_save, sender=Expense)
+@receiver(post_delete, sender=Expense)
+def expense_changed(sender, instance, **kwargs):
+    # Splits are only written along with their expense, which is saved or
+    # deleted in the same transaction: one bump covers the whole write, however
+    # many splits it touches. Bulk loaders and the admin bump themselves.
+    bump_summary_version(instance.group_id)
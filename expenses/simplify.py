@@ -0,0 +1,159 @@
+"""
+Debt simplification engines.
+
+Every engine takes net balances in integer paise ({user_id: paise}, positive
+when the user is owed money) and returns (debtor id, creditor id, paise)
+transfers that settle them.
+"""
+
+import heapq
+import time
+
+from django.conf import settings
+
+from .ledger_core import to_decimal, to_paise
+
+DEFAULT_ENGINE = "greedy"
+EXACT_MAX_BALANCES = getattr(settings, "SIMPLIFY_EXACT_MAX_BALANCES", 20)
+EXACT_TIME_BUDGET = getattr(settings, "SIMPLIFY_EXACT_TIME_BUDGET", 0.5)  # seconds
+
+
+def greedy_simplify(balances):
+    """
+    Repeatedly settle the largest debtor against the largest creditor.
+
+    Runs in O(n log n) and needs at most n - 1 transfers.
+    """
+    # heapq is a min-heap, so amounts are negated; user ids break ties
+    creditors = [(-paise, user_id) for user_id, paise in balances.items() if paise > 0]
+    debtors = [(paise, user_id) for user_id, paise in balances.items() if paise < 0]
+    heapq.heapify(creditors)
+    heapq.heapify(debtors)
+
+    transfers = []
+    while creditors and debtors:
+        credit, creditor_id = heapq.heappop(creditors)
+        debt, debtor_id = heapq.heappop(debtors)
+        amount = min(-credit, -debt)
+        transfers.append((debtor_id, creditor_id, amount))
+
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor_id))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor_id))
+    return transfers
+
+
+def _max_zero_sum_partition(amounts, deadline):
+    """
+    Split amounts (which add up to zero) into the largest number of disjoint
+    zero-sum groups. Returns a list of index lists, or None past the deadline.
+    """
+    size = len(amounts)
+    full = (1 << size) - 1
+    sums = [0] * (full + 1)
+    groups = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        if not mask & 0xFFF and time.perf_counter() > deadline:
+            return None
+        low_bit = mask & -mask
+        sums[mask] = sums[mask ^ low_bit] + amounts[low_bit.bit_length() - 1]
+        best = 0
+        bits = mask
+        while bits:
+            bit = bits & -bits
+            if groups[mask ^ bit] > best:
+                best = groups[mask ^ bit]
+            bits ^= bit
+        groups[mask] = best + (sums[mask] == 0)
+
+    # Walk back from the full set; every zero-sum mask on the way closes a group
+    partition = []
+    current = []
+    mask = full
+    while mask:
+        bits = mask
+        while bits:
+            bit = bits & -bits
+            if groups[mask ^ bit] + (sums[mask] == 0) == groups[mask]:
+                break
+            bits ^= bit
+        if sums[mask] == 0 and current:
+            partition.append(current)
+            current = []
+        current.append(bit.bit_length() - 1)
+        mask ^= bit
+    partition.append(current)
+    return partition
+
+
+def exact_simplify(balances, time_budget=None, max_balances=None):
+    """
+    Minimum number of transfers, found by partitioning the balances into as
+    many zero-sum groups as possible: a group of k users settles in k - 1
+    transfers.
+
+    Exponential in the number of non-zero balances, so it falls back to the
+    greedy engine above max_balances or once the time budget is spent.
+    """
+    time_budget = EXACT_TIME_BUDGET if time_budget is None else time_budget
+    max_balances = EXACT_MAX_BALANCES if max_balances is None else max_balances
+
+    remaining = {user_id: paise for user_id, paise in balances.items() if paise}
+    transfers = []
+
+    # A debtor and creditor with the same amount always settle in one transfer
+    creditors_by_amount = {}
+    for user_id in sorted(remaining):
+        if remaining[user_id] > 0:
+            creditors_by_amount.setdefault(remaining[user_id], []).append(user_id)
+    for user_id in sorted(remaining):
+        paise = remaining.get(user_id, 0)
+        if paise < 0 and creditors_by_amount.get(-paise):
+            creditor_id = creditors_by_amount[-paise].pop(0)
+            transfers.append((user_id, creditor_id, -paise))
+            del remaining[user_id], remaining[creditor_id]
+
+    if len(remaining) > max_balances:
+        return transfers + greedy_simplify(remaining)
+
+    user_ids = sorted(remaining)
+    partition = _max_zero_sum_partition(
+        [remaining[user_id] for user_id in user_ids],
+        time.perf_counter() + time_budget,
+    )
+    if partition is None:
+        return transfers + greedy_simplify(remaining)
+
+    for indexes in partition:
+        transfers += greedy_simplify(
+            {user_ids[index]: remaining[user_ids[index]] for index in indexes}
+        )
+    return transfers
+
+
+SIMPLIFY_ENGINES = {
+    "greedy": greedy_simplify,
+    "exact": exact_simplify,
+}
+
+
+def simplify_balances(balances, engine=DEFAULT_ENGINE):
+    """
+    Settle Decimal balances with the named engine.
+
+    Args:
+        balances (dict): Maps user id to net balance, positive when owed money.
+        engine (str): One of SIMPLIFY_ENGINES.
+
+    Returns:
+        list: (debtor id, creditor id, Decimal amount) tuples ordered by
+            debtor and creditor.
+    """
+    transfers = SIMPLIFY_ENGINES[engine](
+        {user_id: to_paise(balance) for user_id, balance in balances.items()}
+    )
+    return sorted(
+        (debtor_id, creditor_id, to_decimal(paise))
+        for debtor_id, creditor_id, paise in transfers
+    )
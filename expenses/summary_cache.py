@@ -0,0 +1,117 @@
+import os
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import cache
+
+SUMMARY_CACHE_TIMEOUT = getattr(settings, "SUMMARY_CACHE_TIMEOUT", 60 * 60 * 24)
+SUMMARY_LOCAL_CACHE_SIZE = getattr(settings, "SUMMARY_LOCAL_CACHE_SIZE", 256)
+
+
+class LRUCache:
+    """
+    Small thread-safe in-process LRU cache.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self._data:
+                return default
+            self._data.move_to_end(key)
+            return self._data[key]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+_local_cache = LRUCache(SUMMARY_LOCAL_CACHE_SIZE)
+_stats_lock = threading.Lock()
+_stats = {"local_hits": 0, "shared_hits": 0, "misses": 0}
+
+
+def _record(event):
+    with _stats_lock:
+        _stats[event] += 1
+
+
+def summary_cache_key(group_id, version, simplify, engine=""):
+    return f"expense-summary:{group_id}:{version}:{int(bool(simplify))}:{engine}"
+
+
+def get_cached_summary(group, compute, engine=""):
+    """
+    Return the expense summary of a group, computing it at most once per
+    (group, summary version, simplify flag, simplification engine).
+
+    Args:
+        group (ExpenseGroup): The group, loaded with its current summary_version.
+        compute (callable): Builds the summary when neither cache tier has it.
+        engine (str): The simplification engine, only relevant when simplifying.
+    """
+    key = summary_cache_key(
+        group.id,
+        group.summary_version,
+        group.simplify_debt,
+        engine if group.simplify_debt else "",
+    )
+
+    summary = _local_cache.get(key)
+    if summary is not None:
+        _record("local_hits")
+        return summary
+
+    summary = cache.get(key)
+    if summary is not None:
+        _record("shared_hits")
+    else:
+        _record("misses")
+        summary = compute()
+        cache.set(key, summary, SUMMARY_CACHE_TIMEOUT)
+    _local_cache.set(key, summary)
+    return summary
+
+
+def get_summary_cache_stats():
+    """
+    Hit and miss counters of this process, for monitoring.
+    """
+    with _stats_lock:
+        stats = dict(_stats)
+    lookups = sum(stats.values())
+    hits = stats["local_hits"] + stats["shared_hits"]
+    stats.update(
+        {
+            "pid": os.getpid(),
+            "local_entries": len(_local_cache),
+            "hit_ratio": round(hits / lookups, 4) if lookups else None,
+        }
+    )
+    return stats
+
+
+def clear_summary_cache():
+    """
+    Drop the in-process tier and reset the counters (the shared tier expires
+    on its own, since stale versions are never read again).
+    """
+    _local_cache.clear()
+    with _stats_lock:
+        for event in _stats:
+            _stats[event] = 0
@@ -1,60 +1,42 @@
-from collections import defaultdict
 from decimal import Decimal
 
-from django.db import models
-from django.db.models import Count
-
-from auth_app.serializers import UserSerializer
-from .models import Expense, Split
-from django.contrib.auth.models import User
+from auth_app.utils import get_user_payloads
+from .checkpoints import get_ledger_as_of
+from .ledger import get_group_balances, get_pairwise_debts, net_balance, net_pair_debts
+from .ledger_core import to_decimal
+from .simplify import DEFAULT_ENGINE, simplify_balances
 
 
 class ExpenseSummary:
-    def __init__(self, instance=None):
+    def __init__(self, instance=None, engine=None):
         self.instance = instance
+        # Simplification engine: explicit choice, then the group's setting
+        self.engine = engine or getattr(instance, "simplify_engine", DEFAULT_ENGINE)
 
-    def get_summary(self):
+    def get_summary(self, as_of=None):
         """
         Calculate and return the summary of expenses.
+
+        Args:
+            as_of (datetime): Only count expenses and settle-ups dated up to this
+                moment, replayed from the nearest balance checkpoint.
         """
         group = self.instance  # Assuming `instance` is an ExpenseGroup
-        expenses = group.expenses.all()  # Get all expenses for the group
-        transactions = group.transactions.all()  # Get all transactions for the group
-        # Calculate total spend
-        total_spend = expenses.aggregate(total=models.Sum("amount"))["total"] or 0
 
-        # Calculate user expense details
-        balances = {}
-        users = group.members.all()  # Get all members of the group
-        for user in users:
-            # Calculate total paid by the user
-            expenses = expenses.annotate(split_count=Count("splits"))
-            # .exclude(
-            #     split_count=1
-            # )
-            paid = (
-                expenses.filter(paid_by=user).aggregate(total=models.Sum("amount"))[
-                    "total"
-                ]
-                or 0
-            )
-            paid_transactions = (
-                transactions.filter(from_user=user).aggregate(
-                    total=models.Sum("amount")
-                )["total"]
-                or 0
-            )
-            # Calculate total owed by the user
-            owed = (
-                Split.objects.filter(expense__in=expenses, user=user).annotate(
-                    split_count=Count("expense__splits")
-                )
-                # .exclude(split_count=1)
-                .aggregate(total=models.Sum("amount"))["total"]
-                or 0
+        if as_of is not None:
+            state = get_ledger_as_of(group, as_of)
+            total_spend = to_decimal(state.total_spend)
+            balances = state.decimal_balances()
+        else:
+            member_balances = get_group_balances(group)
+            # Calculate total spend
+            total_spend = sum(
+                (totals["paid"] for totals in member_balances.values()), Decimal(0)
             )
-            net_balance = paid - owed + paid_transactions
-            balances[user.id] = net_balance
+            balances = {
+                user_id: net_balance(totals)
+                for user_id, totals in member_balances.items()
+            }
 
         # request = self.context.get("request")
         # simplify_enable = request.query_params.get("simplify", "none").lower()
@@ -83,147 +65,53 @@ class ExpenseSummary:
             simplified_det = self.simplify_debts(balances)
         else:
             # Calculate non-simplified debts
+            pair_debts = (
+                net_pair_debts(state.decimal_pair_debts())
+                if as_of is not None
+                else get_pairwise_debts(group)
+            )
             non_simplified_transactions = self.calculate_non_simplified_debts(
-                expenses, transactions
+                pair_debts
             )
 
         # Return the calculated data
-        return {
+        summary = {
             "total_spend": total_spend,
             "simplified_transactions": simplified_det if simplify else None,
             "non_simplified_transactions": non_simplified_transactions
             if not simplify
             else None,
         }
+        if as_of is not None:
+            summary["as_of"] = as_of
+        return summary
 
-    def calculate_non_simplified_debts(self, expenses, transactions):
+    def build_transfers(self, transfers):
         """
-        Calculate non-simplified debts for each expense, including paid transactions.
+        Render (debtor id, creditor id, amount) tuples, resolving every
+        referenced user with a single batched lookup.
         """
-        consolidated_transactions = []
-        grouped_transactions = defaultdict(lambda: defaultdict(Decimal))
-        paid_transactions_tracker = defaultdict(
-            lambda: defaultdict(Decimal)
-        )  # Track applied paid transactions
-        for expense in expenses:
-            splits = expense.splits.all()
-            for split in splits:
-                if split.user != expense.paid_by:
-                    # Adjust the amount owed by including paid transactions
-                    paid_transactions = (
-                        transactions.filter(
-                            from_user=split.user, to_user=expense.paid_by
-                        ).aggregate(total=models.Sum("amount"))["total"]
-                        or 0
-                    )
-
-                    already_applied = paid_transactions_tracker[split.user.id][
-                        expense.paid_by.id
-                    ]
-                    remaining_paid_transactions = paid_transactions - already_applied
-
-                    adjusted_amount = split.amount - max(
-                        remaining_paid_transactions, Decimal(0)
-                    )
-                    if remaining_paid_transactions > 0:
-                        paid_transactions_tracker[split.user.id][
-                            expense.paid_by.id
-                        ] += min(split.amount, remaining_paid_transactions)
-
-                    if adjusted_amount > 0:
-                        grouped_transactions[split.user.id][
-                            expense.paid_by.id
-                        ] += adjusted_amount
-            # 2️⃣ Consolidate pairwise debts
-            consolidated_transactions = []
-            processed_pairs = set()
-
-            for from_user_id in list(grouped_transactions.keys()):
-                to_user_dict = grouped_transactions[from_user_id]
-                for to_user_id in list(to_user_dict.keys()):
-                    amount = to_user_dict[to_user_id]
-                    if amount <= 0:
-                        continue
-
-                    pair_key = tuple(sorted([from_user_id, to_user_id]))
-                    if pair_key in processed_pairs:
-                        continue
-
-                    reverse_amount = grouped_transactions[to_user_id].get(
-                        from_user_id, Decimal(0)
-                    )
-                    net_amount = amount - reverse_amount
-
-                    if net_amount > 0:
-                        consolidated_transactions.append(
-                            {
-                                "from_user": UserSerializer(
-                                    User.objects.get(id=from_user_id)
-                                ).data,
-                                "to_user": UserSerializer(
-                                    User.objects.get(id=to_user_id)
-                                ).data,
-                                "amount": net_amount,
-                            }
-                        )
-                    elif net_amount < 0:
-                        consolidated_transactions.append(
-                            {
-                                "from_user": UserSerializer(
-                                    User.objects.get(id=to_user_id)
-                                ).data,
-                                "to_user": UserSerializer(
-                                    User.objects.get(id=from_user_id)
-                                ).data,
-                                "amount": abs(net_amount),
-                            }
-                        )
-
-                    processed_pairs.add(pair_key)
-
-        return consolidated_transactions
+        user_ids = set()
+        for debtor_id, creditor_id, _ in transfers:
+            user_ids.update((debtor_id, creditor_id))
+        users = get_user_payloads(user_ids)
+        return [
+            {
+                "from_user": users.get(debtor_id),
+                "to_user": users.get(creditor_id),
+                "amount": amount,
+            }
+            for debtor_id, creditor_id, amount in transfers
+        ]
+
+    def calculate_non_simplified_debts(self, pair_debts):
+        """
+        Build the non-simplified transfers from the group's netted pairwise debts.
+        """
+        return self.build_transfers(pair_debts)
 
     def simplify_debts(self, balances):
         """
         Simplify debts between users to minimize the number of transactions.
         """
-        # Separate users into creditors (positive balance) and debtors (negative balance)
-        creditors = []
-        debtors = []
-        for user_id, balance in balances.items():
-            if balance > 0:
-                creditors.append((user_id, balance))
-            elif balance < 0:
-                debtors.append(
-                    (user_id, -balance)
-                )  # Convert to positive for easier calculations
-
-        # Simplify transactions
-        transactions = []
-        while creditors and debtors:
-            creditor_id, credit_amount = creditors.pop(0)
-            debtor_id, debt_amount = debtors.pop(0)
-
-            # Determine the transaction amount (minimum of credit and debt)
-            transaction_amount = min(credit_amount, debt_amount)
-            debter = UserSerializer(User.objects.get(id=debtor_id)).data
-            creditor = UserSerializer(User.objects.get(id=creditor_id)).data
-            # Record the transaction
-            transactions.append(
-                {
-                    "from_user": debter,
-                    "to_user": creditor,
-                    "amount": transaction_amount,
-                }
-            )
-
-            # Update remaining balances
-            credit_remaining = credit_amount - transaction_amount
-            debt_remaining = debt_amount - transaction_amount
-
-            if credit_remaining > 0:
-                creditors.insert(0, (creditor_id, credit_remaining))
-            if debt_remaining > 0:
-                debtors.insert(0, (debtor_id, debt_remaining))
-        print("sdaas", transactions)
-        return transactions
+        return self.build_transfers(simplify_balances(balances, self.engine))
@@ -0,0 +1,25 @@
+from jobs.queue import job_handler
+from .models import Expense
+from .utils import DEFAULT_EXPENSE_ICON, generate_expense_icon
+
+
+@job_handler("expense_icon")
+def generate_icon(expense_id, title=None, notes=None):
+    """
+    Replace the placeholder icon of an expense with one suggested by the LLM.
+
+    The icon is generated for the current title and notes, not the queued
+    ones, which only show what the job was queued for: a rename while the job
+    runs cannot queue another one. An expense edited mid-run raises, so the
+    job is retried; deleted expenses and ones given another icon are left alone.
+    """
+    pending = Expense.objects.filter(id=expense_id, expense_icon=DEFAULT_EXPENSE_ICON)
+    current = pending.values("title", "notes").first()
+    if current is None:
+        return
+    icon = generate_expense_icon(current["title"], current["notes"])
+    # update() skips the save signals: the icon does not change the summary
+    if not pending.filter(**current).update(expense_icon=icon) and pending.exists():
+        raise RuntimeError(
+            f"Expense {expense_id} was edited while its icon was generated"
+        )
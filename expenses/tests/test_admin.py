@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from expenses.feed import rebuild_expense_feed
+from expenses.ledger import get_group_balances, record_expense, record_transaction
+from expenses.models import Expense, GroupBalance, Split, UserExpenseFeed
+from groups.models import ExpenseGroup
+from transactions.models import Transaction
+from utils.testing import get_member_balances
+
+User = get_user_model()
+
+
+class LedgerAdminTests(TestCase):
+    def setUp(self):
+        """
+        Set up a group with one expense and one settle-up in its ledger, and
+        log in as a superuser.
+        """
+        self.user1 = User.objects.create_user(username="user1", password="password1")
+        self.user2 = User.objects.create_user(username="user2", password="password2")
+        self.group = ExpenseGroup.objects.create(name="Test Group")
+        self.group.members.add(self.user1, self.user2)
+        self.expense = Expense.objects.create(
+            group=self.group, title="Dinner", amount=100, paid_by=self.user1
+        )
+        self.expense.split_between.add(self.user1, self.user2)
+        for user in (self.user1, self.user2):
+            Split.objects.create(expense=self.expense, user=user, amount=50)
+        record_expense(self.expense)
+        rebuild_expense_feed(Expense.objects.filter(id=self.expense.id))
+        self.settle_up = Transaction.objects.create(
+            group=self.group, from_user=self.user2, to_user=self.user1, amount=20
+        )
+        record_transaction(self.settle_up)
+
+        admin = User.objects.create_superuser(username="admin", password="admin")
+        self.client.force_login(admin)
+
+    def assertLedgerMatchesRows(self):
+        self.assertEqual(
+            get_group_balances(self.group), get_member_balances(self.group)
+        )
+
+    def test_ledger_rows_are_read_only(self):
+        response = self.client.get(reverse("admin:expenses_groupbalance_add"))
+        self.assertEqual(response.status_code, 403)
+        balance = GroupBalance.objects.filter(group=self.group).first()
+        response = self.client.post(
+            reverse("admin:expenses_groupbalance_change", args=[balance.id]),
+            {"paid": "1"},
+        )
+        self.assertEqual(response.status_code, 403)
+
+    def test_admin_edit_rebuilds_the_ledger(self):
+        response = self.client.post(
+            reverse("admin:transactions_transaction_change", args=[self.settle_up.id]),
+            {
+                "from_user": self.user2.id,
+                "to_user": self.user1.id,
+                "amount": "35",
+                "group": self.group.id,
+                "created_at_0": "2025-01-10",
+                "created_at_1": "12:00:00",
+                "transaction_date_0": "2025-01-10",
+                "transaction_date_1": "12:00:00",
+                "description": "",
+            },
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            get_group_balances(self.group)[self.user2.id]["sent"], Decimal("35")
+        )
+        self.assertLedgerMatchesRows()
+
+    def test_admin_delete_rebuilds_the_ledger(self):
+        response = self.client.post(
+            reverse("admin:expenses_expense_delete", args=[self.expense.id]),
+            {"post": "yes"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Expense.objects.exists())
+        self.assertLedgerMatchesRows()
+
+    def test_admin_split_edit_rebuilds_the_feed(self):
+        split = Split.objects.get(expense=self.expense, user=self.user1)
+        response = self.client.post(
+            reverse("admin:expenses_split_change", args=[split.id]),
+            {"expense": self.expense.id, "user": self.user1.id, "amount": "70"},
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(
+            UserExpenseFeed.objects.get(user=self.user1).share_amount, Decimal("70")
+        )
+
+        self.client.force_login(self.user1)
+        day = timezone.localdate(self.expense.expense_date).isoformat()
+        response = self.client.get(
+            reverse("user_monthly_expense_list"),
+            {"start_date": day, "end_date": day},
+        )
+        self.assertEqual(response.data["total_spent"], Decimal("70"))
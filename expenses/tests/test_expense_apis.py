@@ -138,8 +138,8 @@ class ExpenseViewTests(APITestCase):
         """
         response = self.client.get(self.list_expenses_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]["title"], "Test Expense")
+        self.assertEqual(len(response.data["results"]), 1)
+        self.assertEqual(response.data["results"][0]["title"], "Test Expense")
 
     def test_list_expenses_not_in_group(self):
         """
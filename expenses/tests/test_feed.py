@@ -0,0 +1,120 @@
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from expenses.models import Expense, UserExpenseFeed
+from groups.models import ExpenseGroup
+
+User = get_user_model()
+
+
+class UserExpenseFeedTests(APITestCase):
+    def setUp(self):
+        """
+        Set up a group with two members and an expense split between them.
+        """
+        self.user1 = User.objects.create_user(username="user1", password="password1")
+        self.user2 = User.objects.create_user(username="user2", password="password2")
+        self.group = ExpenseGroup.objects.create(name="Test Group")
+        self.group.members.add(self.user1, self.user2)
+        self.client.force_authenticate(user=self.user1)
+
+        response = self.client.post(
+            reverse("create_expense"),
+            {
+                "title": "Dinner",
+                "amount": 100,
+                "group": self.group.id,
+                "paid_by_id": self.user1.id,
+                "split_between": [self.user1.id, self.user2.id],
+                "splits": [
+                    {"user": self.user1.id, "amount": 60},
+                    {"user": self.user2.id, "amount": 40},
+                ],
+                "expense_date": "2025-01-10T12:00:00Z",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.expense = Expense.objects.get(id=response.data["id"])
+
+    def feed(self):
+        return dict(
+            UserExpenseFeed.objects.filter(expense=self.expense).values_list(
+                "user_id", "share_amount"
+            )
+        )
+
+    def test_create_and_update_keep_the_feed_in_sync(self):
+        self.assertEqual(
+            self.feed(), {self.user1.id: Decimal("60"), self.user2.id: Decimal("40")}
+        )
+
+        response = self.client.put(
+            reverse("expense_update", args=[self.expense.id]),
+            {
+                "title": "Dinner",
+                "amount": 100,
+                "group": self.group.id,
+                "paid_by_id": self.user1.id,
+                "split_between": [self.user2.id],
+                "splits": [{"user": self.user2.id, "amount": 100}],
+                "expense_date": "2025-02-01T12:00:00Z",
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.feed(), {self.user2.id: Decimal("100")})
+        self.assertEqual(
+            UserExpenseFeed.objects.get(expense=self.expense).expense_date.month, 2
+        )
+
+        self.expense.delete()
+        self.assertFalse(UserExpenseFeed.objects.exists())
+
+    def test_person_expenses_lists_the_users_share(self):
+        url = reverse("user_expense_list")
+        response = self.client.get(
+            url, {"start_date": "2025-01-10", "end_date": "2025-01-10"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        [entry] = response.data["results"]
+        self.assertEqual(entry["title"], "Dinner")
+        self.assertEqual(entry["share_amount"], "60.00")
+
+        response = self.client.get(
+            url, {"start_date": "2025-01-11", "end_date": "2025-01-31"}
+        )
+        self.assertEqual(response.data["results"], [])
+
+    def test_total_spent_sums_the_share(self):
+        url = reverse("user_monthly_expense_list")
+        params = {"start_date": "2025-01-01", "end_date": "2025-01-31"}
+        response = self.client.get(url, params)
+        self.assertEqual(response.data["total_spent"], Decimal("60"))
+
+        other = ExpenseGroup.objects.create(name="Other Group")
+        response = self.client.get(url, {**params, "group_id": other.id})
+        self.assertEqual(response.data["total_spent"], 0)
+
+    def test_total_spent_includes_the_end_date(self):
+        url = reverse("user_monthly_expense_list")
+        response = self.client.get(
+            url, {"start_date": "2025-01-01", "end_date": "2025-01-10"}
+        )
+        self.assertEqual(response.data["total_spent"], Decimal("60"))
+        response = self.client.get(
+            url, {"start_date": "2025-01-11", "end_date": "2025-01-31"}
+        )
+        self.assertEqual(response.data["total_spent"], 0)
+
+    def test_rebuild_restores_the_feed(self):
+        UserExpenseFeed.objects.all().delete()
+        call_command("rebuild_balances", verbosity=0)
+        self.assertEqual(
+            self.feed(), {self.user1.id: Decimal("60"), self.user2.id: Decimal("40")}
+        )
@@ -0,0 +1,101 @@
+from io import StringIO
+from unittest import TestCase
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase as DjangoTestCase
+
+from expenses import utils
+from expenses.models import Expense
+from groups.models import ExpenseGroup
+from expenses.utils import (
+    classify_icons,
+    generate_expense_icon,
+    get_expense_icon,
+    match_expense_icon,
+)
+
+User = get_user_model()
+
+
+class ExpenseIconTests(TestCase):
+    def setUp(self):
+        utils._classify.cache_clear()
+
+    def test_exact_keywords_follow_category_priority(self):
+        """
+        Test the first category in ICON_MAP wins when several are mentioned.
+        """
+        self.assertEqual(match_expense_icon("Uber to airport"), "🚖")
+        self.assertEqual(match_expense_icon("Team lunch", "with coffee"), "🍕")
+        self.assertEqual(match_expense_icon("Cold drink"), "🍺")
+
+    def test_fuzzy_match_and_no_match(self):
+        self.assertEqual(match_expense_icon("Pizzza night"), "🍕")
+        self.assertIsNone(match_expense_icon("xyz"))
+
+    @patch("expenses.utils.generate_content", return_value="🎁")
+    def test_classification_is_memoized(self, mock_generate_content):
+        """
+        Test repeated texts hit the memo, and unmatched ones get the default
+        icon without waiting on the LLM.
+        """
+        for _ in range(3):
+            self.assertEqual(get_expense_icon("Dinner", "Friday"), "🍕")
+        self.assertEqual(utils._classify.cache_info().hits, 2)
+        self.assertEqual(get_expense_icon("xyz"), "💸")
+        mock_generate_content.assert_not_called()
+
+        self.assertEqual(generate_expense_icon("xyz"), "🎁")
+        mock_generate_content.assert_called_once()
+
+    @patch("expenses.utils.generate_content")
+    def test_generated_icon_rejects_text(self, mock_generate_content):
+        """
+        Test a reply that is not an emoji raises, so the icon job is retried.
+        """
+        for reply in ["", "The request timed out. Please try again later."]:
+            mock_generate_content.return_value = reply
+            with self.assertRaises(ValueError):
+                generate_expense_icon("xyz")
+
+    def test_batch_classification_matches_single(self):
+        """
+        Test classify_icons agrees with match_expense_icon, fuzzy ties included.
+        """
+        titles = ["Uber to airport", "Pizzza night", "Cold drink", "Rent", "xyz"]
+        titles += ["Team lunch", "Movei", "Ubr", "Cab", "Groceris"]
+        expected = [match_expense_icon(title) or "💸" for title in titles]
+        self.assertEqual(classify_icons(titles, use_llm=False), expected)
+
+    @patch(
+        "expenses.utils.generate_content", return_value="1. 🎁\n2. not an emoji at all"
+    )
+    def test_batch_classification_asks_llm_once(self, mock_generate_content):
+        icons = classify_icons(["Pizza", "xyz", "abc", "xyz"], [None, None, "d", None])
+        self.assertEqual(icons, ["🍕", "🎁", "💸", "🎁"])
+        mock_generate_content.assert_called_once()
+        self.assertIn("1. xyz \n2. abc d", mock_generate_content.call_args.args[0])
+
+
+class BackfillIconsCommandTests(DjangoTestCase):
+    def setUp(self):
+        user = User.objects.create_user(username="user1", password="password1")
+        group = ExpenseGroup.objects.create(name="Test Group")
+        Expense.objects.bulk_create(
+            Expense(
+                group=group, title=title, amount=10, paid_by=user, expense_icon=icon
+            )
+            for title, icon in [("Pizza", "💸"), ("Uber", "🚖"), ("xyz", "🎁")]
+        )
+
+    @patch("expenses.utils.generate_content", return_value="1. 💸")
+    def test_backfill_updates_changed_icons_only(self, mock_generate_content):
+        with self.assertNumQueries(2):  # one streamed read, one bulk update
+            call_command("backfill_icons", "--chunk-size", "2", stdout=StringIO())
+        self.assertEqual(
+            dict(Expense.objects.values_list("title", "expense_icon")),
+            {"Pizza": "🍕", "Uber": "🚖", "xyz": "🎁"},
+        )
+        mock_generate_content.assert_called_once()
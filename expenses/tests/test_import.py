@@ -0,0 +1,157 @@
+import json
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from expenses.ledger import get_group_balances, get_pairwise_debts
+from expenses.models import Expense
+from groups.models import ExpenseGroup
+from jobs.models import BackgroundJob
+from utils.testing import QueryBudgetMixin, get_member_balances
+
+User = get_user_model()
+
+
+class ExpenseImportTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        """
+        Set up a group with three members and an authenticated client.
+        """
+        self.users = [
+            User.objects.create_user(username=f"user{i}", password="password")
+            for i in range(1, 4)
+        ]
+        self.outsider = User.objects.create_user(username="outsider", password="pw")
+        self.group = ExpenseGroup.objects.create(name="Test Group")
+        self.group.members.add(*self.users)
+        self.client.force_authenticate(user=self.users[0])
+        self.url = reverse("import_expenses", args=[self.group.id])
+
+    def post_ndjson(self, rows, **params):
+        body = "\n".join(json.dumps(row) for row in rows)
+        url = self.url + ("?partial=true" if params.get("partial") else "")
+        return self.client.generic(
+            "POST", url, body, content_type="application/x-ndjson"
+        )
+
+    def test_csv_import(self):
+        """
+        Test a CSV import writes expenses, splits and the ledger.
+        """
+        user1, user2, user3 = self.users
+        body = (
+            "title,amount,paid_by,expense_date,split_between,splits,notes\n"
+            f"Dinner,100,{user1.id},2025-01-10,,,\n"
+            f"Cab,10.00,{user2.id},2025-01-11T08:30:00Z,{user1.id};{user2.id},,\n"
+            f'Rent,90,{user3.id},,,"{user1.id}:30;{user3.id}:60",March\n'
+        )
+        response = self.client.generic("POST", self.url, body, content_type="text/csv")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["imported"], 3)
+        dinner = Expense.objects.get(title="Dinner")
+        self.assertEqual(
+            sorted(dinner.splits.values_list("amount", flat=True)),
+            [Decimal("33.33"), Decimal("33.33"), Decimal("33.34")],
+        )
+        self.assertEqual(dinner.split_between.count(), 3)
+        self.assertEqual(dinner.expense_icon, "🍕")
+        rent = Expense.objects.get(title="Rent")
+        self.assertEqual(rent.notes, "March")
+        self.assertEqual(
+            set(rent.split_between.values_list("id", flat=True)), {user1.id, user3.id}
+        )
+        self.assertEqual(
+            get_group_balances(self.group), get_member_balances(self.group)
+        )
+
+    def test_invalid_rows_roll_back_the_import(self):
+        """
+        Test any invalid row rejects the import and reports its row number.
+        """
+        rows = [
+            {"title": "Dinner", "amount": "30"},
+            {"title": "Lunch", "amount": "-5"},
+            {"title": "Cab", "amount": "10", "split_between": [self.outsider.id]},
+        ]
+        response = self.post_ndjson(rows)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data["imported"], 0)
+        self.assertEqual([error["row"] for error in response.data["errors"]], [2, 3])
+        self.assertFalse(Expense.objects.exists())
+
+        response = self.post_ndjson(rows, partial=True)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["imported"], 1)
+        self.assertEqual(response.data["error_count"], 2)
+        self.assertEqual(Expense.objects.get().title, "Dinner")
+
+    def test_rejects_outsiders_and_unknown_formats(self):
+        response = self.client.post(self.url, {"title": "Dinner"}, format="json")
+        self.assertEqual(response.status_code, status.HTTP_415_UNSUPPORTED_MEDIA_TYPE)
+
+        self.client.force_authenticate(user=self.outsider)
+        response = self.post_ndjson([{"title": "Dinner", "amount": "30"}])
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_query_count_does_not_grow_per_row(self):
+        """
+        Test importing 200 rows stays within the budget that covers 10; only
+        SQLite's bulk insert batching adds queries.
+        """
+        for count in (10, 200):
+            rows = [
+                {"title": f"Dinner {index}", "amount": "30", "notes": "Pizza"}
+                for index in range(count)
+            ]
+            with self.subTest(count), self.assertQueryBudget("import_expenses"):
+                response = self.post_ndjson(rows)
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+    def test_unmatched_icons_are_queued(self):
+        """
+        Test expenses keyword matching found no icon for get an icon job, like
+        the ones saved through the API.
+        """
+        rows = [{"title": "Pizza", "amount": "30"}]
+        rows += [{"title": f"xyz {index}", "amount": "30"} for index in range(20)]
+        with self.assertQueryBudget("import_expenses"):
+            response = self.post_ndjson(rows)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        unmatched = Expense.objects.filter(title__startswith="xyz")
+        self.assertEqual(
+            set(BackgroundJob.objects.values_list("key", flat=True)),
+            {f"expense_icon:{expense.id}" for expense in unmatched},
+        )
+        job = BackgroundJob.objects.get(key=f"expense_icon:{unmatched[0].id}")
+        self.assertEqual(job.kind, "expense_icon")
+        self.assertEqual(job.payload["title"], unmatched[0].title)
+
+    def test_large_group_import(self):
+        """
+        Test a batch touching every pair of a 45-member group updates the
+        ledger in chunks instead of one oversized UPDATE.
+        """
+        users = [
+            User.objects.create_user(username=f"member{i}", password="password")
+            for i in range(42)
+        ]
+        self.group.members.add(*users)
+        payers = self.users + users
+        rows = [
+            {"title": f"Dinner {index}", "amount": "45", "paid_by": payer.id}
+            for index, payer in enumerate(payers)
+        ]
+        response = self.post_ndjson(rows)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["imported"], 45)
+        self.assertEqual(
+            get_group_balances(self.group), get_member_balances(self.group)
+        )
+        self.assertEqual(get_pairwise_debts(self.group), [])
@@ -0,0 +1,63 @@
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.test import TestCase
+
+from auth_app.models import Activity
+from expenses.models import Expense, Split
+from groups.models import ExpenseGroup
+from transactions.models import Transaction
+from utils.testing import QueryPlanMixin
+
+User = get_user_model()
+
+
+class HotQueryIndexTests(QueryPlanMixin, TestCase):
+    """
+    The hot query shapes are answered from their composite indexes.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username="user1", email="user1@example.com", password="password1"
+        )
+        self.group = ExpenseGroup.objects.create(name="Test Group")
+
+    def test_expenses_of_a_group_newest_first(self):
+        self.assertUsesIndex(
+            Expense.objects.filter(group=self.group).order_by("-expense_date"),
+            "expense_group_date_idx",
+        )
+
+    def test_splits_of_a_user(self):
+        self.assertUsesIndex(
+            Split.objects.filter(user=self.user, expense_id__in=[1, 2]),
+            "split_user_expense_idx",
+        )
+
+    def test_settle_ups_between_members(self):
+        self.assertUsesIndex(
+            Transaction.objects.filter(
+                group=self.group, from_user=self.user, to_user=self.user
+            ),
+            "transaction_group_users_idx",
+        )
+
+    def test_activity_feed_newest_first(self):
+        content_type = ContentType.objects.get_for_model(ExpenseGroup)
+        self.assertUsesIndex(
+            Activity.objects.filter(
+                content_type=content_type, object_id=self.group.id
+            ).order_by("-timestamp"),
+            "activity_object_time_idx",
+        )
+
+    def test_group_activity_feed_newest_first(self):
+        self.assertUsesIndex(
+            Activity.objects.filter(group=self.group).order_by("-timestamp", "-id"),
+            "activity_group_time_idx",
+        )
+
+    def test_users_by_email(self):
+        self.assertUsesIndex(
+            User.objects.filter(email="user1@example.com"), "auth_user_email_idx"
+        )
@@ -0,0 +1,47 @@
+from unittest.mock import patch
+
+from django.core.cache import caches
+from django.test import TestCase
+
+from utils import gemini_api_call
+from utils.gemini_api_call import LLMError, generate_content, llm_cache_key
+
+
+@patch.object(gemini_api_call, "_call_llm")
+class LLMCacheTests(TestCase):
+    def setUp(self):
+        caches["llm"].clear()
+
+    def test_repeated_prompts_are_answered_from_the_cache(self, mock_call_llm):
+        mock_call_llm.return_value = "🚖"
+        self.assertEqual(generate_content("Uber"), "🚖")
+        self.assertEqual(generate_content("Uber"), "🚖")
+        mock_call_llm.assert_called_once_with("Uber")
+
+        generate_content("Dinner")
+        self.assertEqual(mock_call_llm.call_count, 2)
+
+    def test_key_covers_model_and_config(self, mock_call_llm):
+        key = llm_cache_key("gemini", "model-a", "Uber", {"temperature": 0.1})
+        self.assertNotEqual(
+            key, llm_cache_key("gemini", "model-b", "Uber", {"temperature": 0.1})
+        )
+        self.assertNotEqual(
+            key, llm_cache_key("gemini", "model-a", "Uber", {"temperature": 0.5})
+        )
+        self.assertEqual(
+            key, llm_cache_key("gemini", "model-a", "Uber", {"temperature": 0.1})
+        )
+
+    def test_failures_are_cached_briefly(self, mock_call_llm):
+        mock_call_llm.side_effect = ConnectionError("refused")
+        for _ in range(2):
+            with self.assertRaisesMessage(LLMError, "ConnectionError: refused"):
+                generate_content("Uber")
+        mock_call_llm.assert_called_once()
+
+    def test_empty_answers_are_not_cached(self, mock_call_llm):
+        mock_call_llm.return_value = ""
+        generate_content("Uber")
+        generate_content("Uber")
+        self.assertEqual(mock_call_llm.call_count, 2)
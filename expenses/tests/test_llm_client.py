@@ -0,0 +1,108 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+from unittest.mock import patch
+
+from utils.llm_client import (
+    CircuitOpenError,
+    LLMError,
+    LLMUnavailable,
+    LocalLLMClient,
+)
+
+
+class StubLLMHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def do_POST(self):
+        server = self.server
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        server.requests.append(body)
+        server.ports.add(self.client_address[1])
+        time.sleep(server.delay)
+        payload = json.dumps({"response": f"echo {body['prompt']}"}).encode()
+        self.send_response(server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+class LocalLLMClientTests(TestCase):
+    """
+    Runs the client against a stub model server on localhost.
+    """
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), StubLLMHandler)
+        self.server.requests = []
+        self.server.ports = set()
+        self.server.delay = 0
+        self.server.status = 200
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.client = self.make_client()
+
+    def make_client(self, **kwargs):
+        host, port = self.server.server_address
+        client = LocalLLMClient(
+            f"http://{host}:{port}/api/generate",
+            "stub",
+            {"num_thread": 1},
+            **{"connect_timeout": 1, "read_timeout": 0.5, **kwargs},
+        )
+        self.addCleanup(client.session.close)
+        return client
+
+    def test_calls_reuse_one_connection(self):
+        self.assertEqual(self.client.generate("Uber"), "echo Uber")
+        self.assertEqual(self.client.generate("Dinner"), "echo Dinner")
+        self.assertEqual(
+            self.server.requests[0],
+            {
+                "model": "stub",
+                "prompt": "Uber",
+                "stream": False,
+                "options": {"num_thread": 1},
+            },
+        )
+        self.assertEqual(len(self.server.ports), 1)
+
+    def test_slow_backend_times_out(self):
+        self.server.delay = 1
+        with self.assertRaisesRegex(LLMError, "ReadTimeout"):
+            self.client.generate("Uber")
+
+    def test_concurrency_is_bounded(self):
+        client = self.make_client(max_concurrency=1, connect_timeout=0.1)
+        self.server.delay = 0.3
+        thread = threading.Thread(target=client.generate, args=("Uber",))
+        thread.start()
+        time.sleep(0.1)
+        with self.assertRaises(LLMUnavailable):
+            client.generate("Dinner")
+        thread.join()
+        self.assertEqual(len(self.server.requests), 1)
+
+    def test_circuit_opens_after_failures_and_recovers(self):
+        client = self.make_client(failure_threshold=2, reset_timeout=30)
+        self.server.status = 500
+        for _ in range(2):
+            with self.assertRaisesRegex(LLMError, "HTTPError"):
+                client.generate("Uber")
+        with self.assertRaises(CircuitOpenError):
+            client.generate("Uber")
+        self.assertEqual(len(self.server.requests), 2)
+
+        # One trial call goes through once the reset timeout has passed
+        self.server.status = 200
+        later = time.monotonic() + 31
+        with patch("utils.llm_client.time.monotonic", return_value=later):
+            self.assertEqual(client.generate("Uber"), "echo Uber")
+        self.assertFalse(client.breaker.is_open)
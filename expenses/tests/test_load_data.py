@@ -0,0 +1,58 @@
+import json
+import os
+import random
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from rest_framework.test import APITestCase
+
+from expenses.ledger import get_group_balances
+from expenses.load_data import seed_group
+from expenses.models import Expense, Split
+from groups.models import ExpenseGroup
+from utils.testing import get_member_balances
+
+
+class SeedLoadDataTests(APITestCase):
+    def test_seeded_group_is_consistent(self):
+        """
+        Test seeded splits add up to their expense and the ledger is rebuilt.
+        """
+        group = seed_group(random.Random(1), members=5, expenses=30, settle_ups=5)
+
+        self.assertEqual(group.members.count(), 5)
+        self.assertEqual(Expense.objects.filter(group=group).count(), 30)
+        for expense in Expense.objects.filter(group=group):
+            shares = Split.objects.filter(expense=expense)
+            self.assertEqual(sum(split.amount for split in shares), expense.amount)
+            self.assertEqual(expense.split_between.count(), shares.count())
+        self.assertEqual(get_group_balances(group), get_member_balances(group))
+
+    def test_benchmark_endpoints_writes_report(self):
+        """
+        Test the benchmark rolls its data back and reports every endpoint.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, "report.json")
+            call_command(
+                "benchmark_endpoints",
+                "--sizes",
+                "10",
+                "--repeat",
+                "1",
+                "--output",
+                output,
+                stdout=StringIO(),
+            )
+            with open(output) as report_file:
+                report = json.load(report_file)
+
+        self.assertFalse(ExpenseGroup.objects.exists())
+        self.assertEqual(
+            [row["endpoint"] for row in report["results"]],
+            ["summary", "expense_list", "person_expenses", "activities", "total_spent"],
+        )
+        for row in report["results"]:
+            self.assertEqual(row["status"], 200)
+            self.assertGreater(row["queries"], 0)
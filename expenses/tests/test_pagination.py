@@ -0,0 +1,79 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from expenses.models import Expense
+from expenses.views import ExpenseCursorPagination
+from groups.models import ExpenseGroup
+
+User = get_user_model()
+
+
+@patch.object(ExpenseCursorPagination, "page_size", 5)
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        """
+        Set up a group with 12 expenses, several sharing an expense_date.
+        """
+        self.user = User.objects.create_user(username="user1", password="password1")
+        self.group = ExpenseGroup.objects.create(name="Test Group")
+        self.group.members.add(self.user)
+        self.client.force_authenticate(user=self.user)
+        Expense.objects.bulk_create(
+            Expense(
+                group=self.group,
+                title=f"Expense {index}",
+                amount=10,
+                paid_by=self.user,
+                expense_date=datetime(2025, 1, 1 + index // 4, tzinfo=timezone.utc),
+            )
+            for index in range(12)
+        )
+        self.expected = list(
+            Expense.objects.order_by("-expense_date", "-id").values_list(
+                "id", flat=True
+            )
+        )
+        self.url = reverse("list_expenses", args=[self.group.id])
+
+    def walk(self, url, link):
+        pages = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            pages.append([expense["id"] for expense in response.data["results"]])
+            url = response.data[link]
+        return pages
+
+    def test_pages_follow_the_ordering_across_ties(self):
+        pages = self.walk(self.url, "next")
+        self.assertEqual([len(page) for page in pages], [5, 5, 2])
+        self.assertEqual(sum(pages, []), self.expected)
+
+        last_page = self.client.get(self.client.get(self.url).data["next"])
+        backwards = self.walk(last_page.data["previous"], "previous")
+        self.assertEqual(backwards, [self.expected[:5]])
+
+    def test_deep_pages_cost_the_same_as_the_first(self):
+        url = self.url
+        counts = []
+        while url:
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            counts.append(len(queries))
+            url = response.data["next"]
+        self.assertEqual(len(set(counts)), 1, counts)
+        self.assertNotIn(
+            "COUNT(", " ".join(query["sql"] for query in queries.captured_queries)
+        )
+
+    def test_invalid_cursor(self):
+        for cursor in ["garbage", "cD1ub3Rqc29u", "cD1bXQ%3D%3D"]:
+            response = self.client.get(self.url, {"cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
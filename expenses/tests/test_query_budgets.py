@@ -0,0 +1,241 @@
+import random
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from expenses.load_data import seed_group
+from expenses.models import Expense, Split, UserExpenseFeed
+from expenses.serializers import ExpenseSerializer, UserExpenseFeedSerializer
+from expenses.views import ExpenseCursorPagination
+from utils.testing import QueryBudgetMixin
+
+# Every seeded group has more expenses than fit on one page
+SEED_EXPENSES = 25
+
+
+@patch("expenses.signals.get_expense_icon", return_value="💸")
+@patch("expenses.serializers.get_expense_icon", return_value="💸")
+class ExpenseQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        """
+        Set up a seeded group and authenticate as one of its members.
+        """
+        self.group = seed_group(
+            random.Random(0),
+            members=5,
+            expenses=SEED_EXPENSES,
+            settle_ups=5,
+            activities=SEED_EXPENSES,
+        )
+        self.user = self.group.created_by
+        self.client.force_authenticate(user=self.user)
+        self.expense = Expense.objects.filter(group=self.group, paid_by=self.user)[0]
+
+    def expense_data(self):
+        member_ids = list(self.group.members.values_list("id", flat=True))
+        share = Decimal("30.00") / len(member_ids)
+        return {
+            "title": "Dinner",
+            "amount": "30.00",
+            "group": self.group.id,
+            "paid_by_id": self.user.id,
+            "split_between": member_ids,
+            "splits": [{"user": user_id, "amount": share} for user_id in member_ids],
+        }
+
+    def test_urls_have_query_budgets(self, *mocks):
+        self.assertUrlsHaveQueryBudgets("expenses.urls")
+
+    def test_read_budgets(self, *mocks):
+        """
+        Test the read endpoints stay within their query budgets.
+        """
+        requests = [
+            ("list_expenses", reverse("list_expenses", args=[self.group.id]), {}),
+            ("expense_summary", reverse("expense_summary", args=[self.group.id]), {}),
+            ("user_expense_list", reverse("user_expense_list"), {}),
+            (
+                "user_monthly_expense_list",
+                reverse("user_monthly_expense_list"),
+                {"start_date": "2000-01-01"},
+            ),
+        ]
+        for url_name, url, params in requests:
+            with self.subTest(url_name), self.assertQueryBudget(url_name):
+                response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_query_count_does_not_grow_with_page_size(self, *mocks):
+        """
+        Test the expense listings run as many queries for 2 rows as for 10.
+        """
+        listings = [reverse("list_expenses", args=[self.group.id])]
+        listings.append(reverse("user_expense_list"))
+        for url in listings:
+            counts = []
+            for page_size in (2, 10):
+                with patch.object(ExpenseCursorPagination, "page_size", page_size):
+                    with CaptureQueriesContext(connection) as queries:
+                        response = self.client.get(url)
+                self.assertEqual(response.status_code, status.HTTP_200_OK)
+                self.assertEqual(len(response.data["results"]), page_size)
+                counts.append(len(queries))
+            with self.subTest(url):
+                self.assertEqual(counts[0], counts[1])
+
+    def test_eager_load_reads_a_page_in_three_queries(self, *mocks):
+        """
+        Test the eager loaded serializer reads rows, split users and splits
+        with one query each.
+        """
+        expenses = ExpenseSerializer.eager_load(
+            Expense.objects.filter(group=self.group)
+        )
+        with self.assertNumQueries(3):
+            data = ExpenseSerializer(expenses, many=True).data
+        self.assertEqual(len(data), SEED_EXPENSES)
+
+        feed = ExpenseSerializer.eager_load(
+            UserExpenseFeed.objects.filter(user=self.user).select_related("expense"),
+            prefix="expense__",
+        )
+        with self.assertNumQueries(3):
+            data = UserExpenseFeedSerializer(feed, many=True).data
+        self.assertTrue(data)
+
+    def test_write_budgets(self, *mocks):
+        """
+        Test creating, updating and deleting an expense stay within budget.
+        """
+        data = self.expense_data()
+        with self.assertQueryBudget("create_expense"):
+            response = self.client.post(reverse("create_expense"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        with self.assertQueryBudget("expense_update"):
+            response = self.client.put(
+                reverse("expense_update", args=[self.expense.id]), data, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.assertQueryBudget("expense_delete"):
+            response = self.client.delete(
+                reverse("expense_delete", args=[self.expense.id])
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_write_query_count_does_not_grow_with_splits(self, *mocks):
+        """
+        Test a create, an update replacing the splits, and a delete run as
+        many queries for 2 splits as for 10.
+        """
+        group = seed_group(random.Random(0), members=11, expenses=0)
+        self.client.force_authenticate(user=group.created_by)
+        member_ids = list(group.members.values_list("id", flat=True))
+
+        def expense_data(sharers, amount):
+            return {
+                "title": "Dinner",
+                "amount": str(amount),
+                "group": group.id,
+                "paid_by_id": group.created_by.id,
+                "split_between": sharers,
+                "splits": [
+                    {"user": user_id, "amount": Decimal(amount) / len(sharers)}
+                    for user_id in sharers
+                ],
+            }
+
+        counts = []
+        for size in (2, 10):
+            with CaptureQueriesContext(connection) as create_queries:
+                response = self.client.post(
+                    reverse("create_expense"),
+                    expense_data(member_ids[:size], 100),
+                    format="json",
+                )
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            expense_id = response.data["id"]
+
+            # One sharer leaves, one joins and the others' amounts change
+            sharers = member_ids[1 : size + 1]
+            with CaptureQueriesContext(connection) as update_queries:
+                response = self.client.put(
+                    reverse("expense_update", args=[expense_id]),
+                    expense_data(sharers, 90),
+                    format="json",
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(
+                set(
+                    Split.objects.filter(expense_id=expense_id).values_list(
+                        "user_id", flat=True
+                    )
+                ),
+                set(sharers),
+            )
+
+            with CaptureQueriesContext(connection) as delete_queries:
+                response = self.client.delete(
+                    reverse("expense_delete", args=[expense_id])
+                )
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            counts.append(
+                (len(create_queries), len(update_queries), len(delete_queries))
+            )
+
+        self.assertEqual(counts[0], counts[1])
+
+    def test_icon_refresh_uses_loaded_values(
+        self, mock_serializer_icon, mock_signal_icon
+    ):
+        """
+        Test saving diffs title and notes against load time state, without
+        fetching the row again.
+        """
+        expense = Expense.objects.get(id=self.expense.id)
+        expense.amount += 1
+        with self.assertNumQueries(2):  # the update and the summary version bump
+            expense.save()
+        mock_signal_icon.assert_not_called()
+
+        expense.title = "Cab home"
+        expense.save()
+        mock_signal_icon.assert_called_once_with("Cab home", expense.notes)
+        expense.save()
+        mock_signal_icon.assert_called_once()
+
+    def test_cache_stats_budget(self, *mocks):
+        self.user.is_staff = True
+        self.user.save()
+        with self.assertQueryBudget("summary_cache_stats"):
+            response = self.client.get(reverse("summary_cache_stats"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+
+class QueryInstrumentationMiddlewareTests(APITestCase):
+    def setUp(self):
+        self.group = seed_group(random.Random(0), members=3, expenses=5)
+        self.client.force_authenticate(user=self.group.created_by)
+        self.url = reverse("list_expenses", args=[self.group.id])
+
+    @override_settings(QUERY_INSTRUMENTATION=True)
+    def test_headers_report_queries(self):
+        """
+        Test the SQL work of a request is reported in the response headers.
+        """
+        response = self.client.get(self.url)
+        self.assertGreater(int(response["X-DB-Queries"]), 0)
+        self.assertGreaterEqual(int(response["X-DB-Duplicate-Queries"]), 0)
+        self.assertIn("db;dur=", response["Server-Timing"])
+
+    def test_headers_are_off_by_default(self):
+        response = self.client.get(self.url)
+        self.assertNotIn("X-DB-Queries", response)
+        self.assertNotIn("Server-Timing", response)
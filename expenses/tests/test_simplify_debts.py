@@ -1,6 +1,15 @@
+from decimal import Decimal
+from unittest.mock import patch
+
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
 from rest_framework.test import APITestCase
+from expenses.simplify import exact_simplify, greedy_simplify, simplify_balances
+from expenses.summary_cache import clear_summary_cache
 from expenses.summray_calculate import ExpenseSummary
+from groups.models import ExpenseGroup
 
 User = get_user_model()
 
@@ -143,3 +152,84 @@ class SimplifyDebtsTests(APITestCase):
         transaction2 = simplified_transactions[1]
 
         self.assertEqual(transaction1["amount"] + transaction2["amount"], 150)
+
+
+class SimplifyEnginesTests(APITestCase):
+    def test_greedy_settles_every_balance(self):
+        """
+        Test the greedy engine settles all balances in at most n - 1 transfers.
+        """
+        balances = {1: -3000, 2: -2000, 3: 1000, 4: 2500, 5: 1500}
+        transfers = greedy_simplify(balances)
+
+        self.assertLessEqual(len(transfers), len(balances) - 1)
+        settled = dict(balances)
+        for debtor_id, creditor_id, amount in transfers:
+            settled[debtor_id] += amount
+            settled[creditor_id] -= amount
+        self.assertEqual(set(settled.values()), {0})
+
+    def test_exact_finds_fewer_transfers_than_greedy(self):
+        """
+        Test the exact engine uses zero-sum sub-groups to save transfers.
+        """
+        # {1, 3, 5} and {2, 4} settle independently: 2 + 1 transfers
+        balances = {1: -500, 2: -700, 3: 300, 4: 700, 5: 200}
+
+        self.assertEqual(len(exact_simplify(balances)), 3)
+        self.assertLessEqual(
+            len(exact_simplify(balances)), len(greedy_simplify(balances))
+        )
+
+    def test_exact_falls_back_to_greedy(self):
+        """
+        Test the exact engine falls back to greedy when over its size limit.
+        """
+        balances = {1: -500, 2: -700, 3: 300, 4: 700, 5: 200}
+
+        self.assertEqual(
+            exact_simplify(balances, max_balances=2), greedy_simplify(balances)
+        )
+        self.assertEqual(
+            exact_simplify(balances, time_budget=0), greedy_simplify(balances)
+        )
+
+    def test_simplify_balances_returns_decimals(self):
+        """
+        Test simplify_balances converts Decimal balances to and from paise.
+        """
+        transfers = simplify_balances(
+            {1: Decimal("-10.05"), 2: Decimal("10.05")}, engine="exact"
+        )
+        self.assertEqual(transfers, [(1, 2, Decimal("10.05"))])
+
+
+class SimplifyEngineSelectionTests(APITestCase):
+    def setUp(self):
+        """
+        Set up a simplified group and an authenticated client.
+        """
+        self.user1 = User.objects.create_user(username="user1", password="password")
+        self.group = ExpenseGroup.objects.create(name="Test Group", simplify_debt=True)
+        self.group.members.add(self.user1)
+        self.client.force_authenticate(user=self.user1)
+        self.summary_url = reverse("expense_summary", args=[self.group.id])
+        cache.clear()
+        clear_summary_cache()
+
+    @patch("expenses.summray_calculate.simplify_balances", return_value=[])
+    def test_engine_query_parameter(self, mock_simplify_balances):
+        """
+        Test the engine query parameter overrides the group setting.
+        """
+        response = self.client.get(self.summary_url, {"engine": "exact"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(mock_simplify_balances.call_args.args[1], "exact")
+
+    def test_unknown_engine(self):
+        """
+        Test an unknown engine is rejected.
+        """
+        response = self.client.get(self.summary_url, {"engine": "magic"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("engine", response.data)
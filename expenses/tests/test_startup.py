@@ -0,0 +1,85 @@
+import runpy
+from io import StringIO
+from unittest.mock import Mock, patch
+
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from expenses.models import Expense
+from groups.models import ExpenseGroup
+from utils.keep_db_alive import keep_db_alive
+from utils.testing import measure_startup_imports
+
+# Loaded on first use (the SDKs through utils.sdk), never at startup
+LAZY_SDKS = (
+    "google.genai",
+    "google.api_core",
+    "firebase_admin",
+    "rapidfuzz",
+    "numpy",
+)
+
+
+class StartupImportTests(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.timings = measure_startup_imports(
+            "import django; django.setup(); import splitfree_backend.urls"
+        )
+
+    def test_heavy_sdks_are_not_imported_at_startup(self):
+        loaded = sorted(
+            module
+            for module in self.timings
+            if any(module == sdk or module.startswith(sdk + ".") for sdk in LAZY_SDKS)
+        )
+        self.assertEqual(loaded, [])
+
+    def test_startup_imports_stay_within_budget(self):
+        total_ms = sum(self.timings.values()) / 1000
+        slowest = sorted(self.timings.items(), key=lambda item: -item[1])[:10]
+        self.assertLessEqual(
+            total_ms,
+            settings.STARTUP_IMPORT_BUDGET_MS,
+            f"Startup imports took {total_ms:.0f} ms, over the budget of "
+            f"{settings.STARTUP_IMPORT_BUDGET_MS} ms. Slowest: {slowest}",
+        )
+
+
+class WarmupTests(TestCase):
+    def test_keep_db_alive_primes_content_types(self):
+        ContentType.objects.clear_cache()
+        timings = keep_db_alive({"source": "aws.events"}, None)
+        self.assertEqual(
+            list(timings),
+            ["database", "content_types", "icon_classifier", "auth_sdk", "total"],
+        )
+        with self.assertNumQueries(0):
+            ContentType.objects.get_for_model(ExpenseGroup)
+            ContentType.objects.get_for_model(Expense)
+
+    def test_warmup_command_reports_timings(self):
+        stdout = StringIO()
+        call_command("warmup", stdout=stdout)
+        self.assertIn("database", stdout.getvalue())
+        self.assertIn("total", stdout.getvalue())
+
+    def test_gunicorn_workers_warm_up_on_boot(self):
+        hooks = runpy.run_path(str(settings.BASE_DIR / "gunicorn.conf.py"))
+        worker = Mock()
+        with patch("utils.keep_db_alive.warm_up") as warm_up:
+            hooks["post_worker_init"](worker)
+            warm_up.assert_called_once_with()
+
+            warm_up.side_effect = RuntimeError("database is down")
+            hooks["post_worker_init"](worker)
+        worker.log.exception.assert_called_once()
+
+    def test_health_check_runs_no_queries(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("health"))
+        self.assertEqual(response.status_code, 200)
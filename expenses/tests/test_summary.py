@@ -0,0 +1,561 @@
+from datetime import datetime, time
+from decimal import Decimal
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from auth_app.utils import get_user_payloads
+from expenses.checkpoints import create_checkpoint, get_ledger_as_of
+from expenses.ledger import (
+    get_group_balances,
+    get_pairwise_debts,
+    net_balance,
+    rebuild_group_balances,
+    record_expense,
+)
+from expenses.ledger_core import LedgerCore, split_evenly, to_decimal
+from expenses.models import (
+    BalanceCheckpoint,
+    Expense,
+    GroupBalance,
+    PairwiseDebt,
+    Split,
+)
+from expenses.summary_cache import clear_summary_cache, get_summary_cache_stats
+from expenses.summray_calculate import ExpenseSummary
+from groups.models import ExpenseGroup
+from transactions.models import Transaction
+from utils.testing import get_member_balances, get_member_pair_debts
+
+User = get_user_model()
+
+
+class MemberBalancesTests(APITestCase):
+    def setUp(self):
+        """
+        Set up a group where user1 paid for everyone and user2 settled up.
+        """
+        self.users = [
+            User.objects.create_user(username=f"user{i}", password="password")
+            for i in range(1, 4)
+        ]
+        self.group = ExpenseGroup.objects.create(name="Test Group")
+        self.group.members.add(*self.users)
+        self.add_expense(self.users[0], 90, self.users)
+        Transaction.objects.create(
+            from_user=self.users[1],
+            to_user=self.users[0],
+            amount=30,
+            group=self.group,
+        )
+
+    def add_expense(self, paid_by, amount, split_between):
+        expense = Expense.objects.create(
+            title="Dinner", amount=amount, group=self.group, paid_by=paid_by
+        )
+        share = Decimal(amount) / len(split_between)
+        for user in split_between:
+            Split.objects.create(expense=expense, user=user, amount=share)
+        return expense
+
+    def test_member_balances(self):
+        """
+        Test paid, owed, sent and received totals for every member.
+        """
+        balances = get_member_balances(self.group)
+        user1, user2, user3 = (balances[user.id] for user in self.users)
+
+        self.assertEqual(user1["paid"], 90)
+        self.assertEqual(user1["owed"], 30)
+        self.assertEqual(user1["received"], 30)
+        self.assertEqual(user2["sent"], 30)
+        self.assertEqual(net_balance(user1), 30)
+        self.assertEqual(net_balance(user2), 0)
+        self.assertEqual(net_balance(user3), -30)
+
+    def test_member_balances_query_count_is_flat(self):
+        """
+        Test the query count does not grow with the number of members.
+        """
+        with self.assertNumQueries(4):
+            get_member_balances(self.group)
+
+        more_users = [
+            User.objects.create_user(username=f"extra{i}", password="password")
+            for i in range(10)
+        ]
+        self.group.members.add(*more_users)
+        self.add_expense(more_users[0], 100, more_users)
+
+        with self.assertNumQueries(4):
+            get_member_balances(self.group)
+
+
+class LedgerCoreTests(APITestCase):
+    def test_from_group_keeps_paise_exact(self):
+        """
+        Test amounts that are not exact in binary floating point stay exact.
+        """
+        user1 = User.objects.create_user(username="user1", password="password")
+        user2 = User.objects.create_user(username="user2", password="password")
+        group = ExpenseGroup.objects.create(name="Test Group")
+        group.members.add(user1, user2)
+        for _ in range(3):
+            expense = Expense.objects.create(
+                title="Tea", amount=Decimal("10.05"), group=group, paid_by=user1
+            )
+            Split.objects.create(expense=expense, user=user2, amount=Decimal("10.05"))
+
+        core = LedgerCore.from_group(group)
+
+        self.assertEqual(core.member_totals()[user1.id]["paid"], Decimal("30.15"))
+        self.assertEqual(core.pair_debts(), {(user2.id, user1.id): Decimal("30.15")})
+
+    def test_totals_are_summed_in_integers(self):
+        """
+        Test totals past float64's 2**53 integer range are not rounded.
+        """
+        import numpy as np
+
+        big = 2**53
+        core = LedgerCore(
+            [],
+            np.array([[1, big], [1, 1]], dtype=np.int64),
+            np.array([[2, 1, big], [2, 1, 1]], dtype=np.int64),
+            np.empty((0, 3), dtype=np.int64),
+        )
+        self.assertEqual(int(core.paid[0]), big + 1)
+        self.assertEqual(int(core.debts[1, 0]), big + 1)
+
+    def test_split_evenly_hands_out_remainder_deterministically(self):
+        """
+        Test even splits add up exactly and give the remainder to the first shares.
+        """
+        self.assertEqual(split_evenly(1000, 3), [334, 333, 333])
+        self.assertEqual(split_evenly(-1000, 3), [-333, -333, -334])
+        self.assertEqual(to_decimal(334), Decimal("3.34"))
+
+
+@patch("expenses.serializers.get_expense_icon", return_value="💸")
+class GroupBalanceLedgerTests(APITestCase):
+    def setUp(self):
+        """
+        Set up a group with three members and an authenticated client.
+        """
+        self.users = [
+            User.objects.create_user(username=f"user{i}", password="password")
+            for i in range(1, 4)
+        ]
+        self.group = ExpenseGroup.objects.create(name="Test Group")
+        self.group.members.add(*self.users)
+        self.client.force_authenticate(user=self.users[0])
+        cache.clear()
+        clear_summary_cache()
+
+    def create_expense(self, amount, paid_by, split_between):
+        share = Decimal(amount) / len(split_between)
+        data = {
+            "title": "Dinner",
+            "amount": amount,
+            "group": self.group.id,
+            "paid_by_id": paid_by.id,
+            "split_between": [user.id for user in split_between],
+            "splits": [{"user": user.id, "amount": share} for user in split_between],
+        }
+        response = self.client.post(reverse("create_expense"), data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["id"]
+
+    def assertLedgerMatchesHistory(self):
+        ledger = get_group_balances(self.group)
+        history = get_member_balances(self.group)
+        for user_id, totals in history.items():
+            self.assertEqual(ledger.get(user_id, totals), totals)
+
+        pairs = {
+            (row.debtor_id, row.creditor_id): row.amount
+            for row in PairwiseDebt.objects.filter(group=self.group)
+        }
+        for pair, amount in get_member_pair_debts(self.group).items():
+            self.assertEqual(pairs.get(pair, 0), amount)
+
+    def test_ledger_tracks_writes(self, mock_get_expense_icon):
+        """
+        Test the ledger follows expense creates, updates, deletes and settle-ups.
+        """
+        user1, user2, user3 = self.users
+        self.create_expense(90, user1, self.users)
+        expense_id = self.create_expense(40, user2, [user1, user2])
+        self.assertLedgerMatchesHistory()
+
+        response = self.client.put(
+            reverse("expense_update", args=[expense_id]),
+            {
+                "title": "Taxi",
+                "amount": 60,
+                "group": self.group.id,
+                "paid_by_id": user3.id,
+                "split_between": [user1.id, user2.id],
+                "splits": [
+                    {"user": user1.id, "amount": 30},
+                    {"user": user2.id, "amount": 30},
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLedgerMatchesHistory()
+
+        response = self.client.post(
+            reverse("create_transaction"),
+            {
+                "amount": 30,
+                "transaction_date": "2025-05-01T10:00:00Z",
+                "from_user": user2.id,
+                "to_user": user1.id,
+                "group": self.group.id,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertLedgerMatchesHistory()
+
+        response = self.client.delete(reverse("expense_delete", args=[expense_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertLedgerMatchesHistory()
+        self.assertEqual(net_balance(get_group_balances(self.group)[user1.id]), 30)
+
+    def test_non_simplified_summary_nets_pairs(self, mock_get_expense_icon):
+        """
+        Test the non-simplified summary nets both directions of each pair.
+        """
+        user1, user2, user3 = self.users
+        self.create_expense(90, user1, self.users)
+        self.create_expense(40, user2, [user1, user2])
+        Transaction.objects.create(
+            from_user=user3, to_user=user1, amount=10, group=self.group
+        )
+        rebuild_group_balances(self.group)
+
+        self.assertEqual(
+            get_pairwise_debts(self.group),
+            [(user2.id, user1.id, Decimal(10)), (user3.id, user1.id, Decimal(20))],
+        )
+        response = self.client.get(reverse("expense_summary", args=[self.group.id]))
+        transfers = response.data["non_simplified_transactions"]
+        self.assertEqual(
+            [(t["from_user"]["id"], t["to_user"]["id"]) for t in transfers],
+            [(user2.id, user1.id), (user3.id, user1.id)],
+        )
+
+    def test_rebuild_balances_command(self, mock_get_expense_icon):
+        """
+        Test rebuild_balances repairs a ledger that drifted from the raw rows.
+        """
+        self.create_expense(90, self.users[0], self.users)
+        GroupBalance.objects.filter(group=self.group).update(paid=0, owed=0)
+
+        call_command(
+            "rebuild_balances", "--group", str(self.group.id), stdout=StringIO()
+        )
+
+        self.assertLedgerMatchesHistory()
+
+
+class SummaryCacheTests(APITestCase):
+    def setUp(self):
+        """
+        Set up a group with two members and a clean summary cache.
+        """
+        self.user1 = User.objects.create_user(username="user1", password="password")
+        self.user2 = User.objects.create_user(username="user2", password="password")
+        self.group = ExpenseGroup.objects.create(name="Test Group")
+        self.group.members.add(self.user1, self.user2)
+        self.client.force_authenticate(user=self.user1)
+        self.summary_url = reverse("expense_summary", args=[self.group.id])
+        cache.clear()
+        clear_summary_cache()
+
+    def get_summary(self):
+        response = self.client.get(self.summary_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    @patch.object(ExpenseSummary, "get_summary", autospec=True)
+    def test_unchanged_group_is_not_recomputed(self, mock_get_summary):
+        """
+        Test repeated reads of an unchanged group are served from cache.
+        """
+        mock_get_summary.return_value = {"total_spend": 0}
+        for _ in range(3):
+            self.get_summary()
+
+        self.assertEqual(mock_get_summary.call_count, 1)
+        stats = get_summary_cache_stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["local_hits"], 2)
+
+    @patch.object(ExpenseSummary, "get_summary", autospec=True)
+    def test_writes_invalidate_cached_summary(self, mock_get_summary):
+        """
+        Test expense, settle-up and membership changes bump the summary version.
+        """
+        mock_get_summary.return_value = {"total_spend": 0}
+        self.get_summary()
+
+        Expense.objects.create(
+            title="Dinner", amount=10, group=self.group, paid_by=self.user1
+        )
+        self.get_summary()
+        Transaction.objects.create(
+            from_user=self.user2, to_user=self.user1, amount=5, group=self.group
+        )
+        self.get_summary()
+        self.group.members.remove(self.user2)
+        self.get_summary()
+
+        self.assertEqual(mock_get_summary.call_count, 4)
+
+    def test_expense_delete_bumps_the_version_once(self):
+        """
+        Test the splits deleted along with an expense do not each bump the
+        summary version.
+        """
+        expense = Expense.objects.create(
+            title="Dinner", amount=10, group=self.group, paid_by=self.user1
+        )
+        Split.objects.bulk_create(
+            Split(expense=expense, user=user, amount=5)
+            for user in (self.user1, self.user2)
+        )
+        self.group.refresh_from_db()
+        version = self.group.summary_version
+
+        expense.delete()
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.summary_version, version + 1)
+
+    def test_cache_stats_requires_admin(self):
+        """
+        Test the cache stats endpoint is only available to staff users.
+        """
+        url = reverse("summary_cache_stats")
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_403_FORBIDDEN)
+
+        self.user1.is_staff = True
+        self.user1.save()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("misses", response.data)
+
+
+class SummaryUserHydrationTests(APITestCase):
+    def setUp(self):
+        """
+        Set up a simplified group and a clean cache.
+        """
+        self.payer = User.objects.create_user(username="payer", password="password")
+        self.group = ExpenseGroup.objects.create(name="Test Group", simplify_debt=True)
+        self.group.members.add(self.payer)
+        cache.clear()
+
+    def add_debtors(self, count):
+        start = User.objects.count()
+        users = [
+            User.objects.create_user(username=f"debtor{i}", password="password")
+            for i in range(start, start + count)
+        ]
+        self.group.members.add(*users)
+        expense = Expense.objects.create(
+            title="Trip", amount=10 * count, group=self.group, paid_by=self.payer
+        )
+        for user in users:
+            Split.objects.create(expense=expense, user=user, amount=10)
+        rebuild_group_balances(self.group)
+
+    def count_summary_queries(self):
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            summary = ExpenseSummary(self.group).get_summary()
+        return len(queries), summary
+
+    def test_summary_query_count_does_not_grow_with_transfers(self):
+        """
+        Test users of all suggested transfers are resolved in one query.
+        """
+        self.add_debtors(2)
+        small_count, small_summary = self.count_summary_queries()
+        self.add_debtors(8)
+        large_count, large_summary = self.count_summary_queries()
+
+        self.assertEqual(len(small_summary["simplified_transactions"]), 2)
+        self.assertEqual(len(large_summary["simplified_transactions"]), 10)
+        self.assertEqual(small_count, large_count)
+
+    def test_user_payloads_without_shared_cache(self):
+        """
+        Test payloads are loaded every time when no shared cache is set up,
+        so a rename in another process is never served stale.
+        """
+        for first_name in ["", "Pat"]:
+            User.objects.filter(id=self.payer.id).update(first_name=first_name)
+            with self.assertNumQueries(1):
+                payloads = get_user_payloads([self.payer.id])
+            self.assertEqual(payloads[self.payer.id]["first_name"], first_name)
+
+    @override_settings(USER_PAYLOAD_CACHE="default")
+    def test_user_payloads_are_cached_until_saved(self):
+        """
+        Test cached user payloads are reused and dropped when the user changes.
+        """
+        with self.assertNumQueries(1):
+            get_user_payloads([self.payer.id])
+        with self.assertNumQueries(0):
+            payloads = get_user_payloads([self.payer.id])
+        self.assertEqual(payloads[self.payer.id]["username"], "payer")
+
+        self.payer.first_name = "Pat"
+        self.payer.save()
+
+        self.assertEqual(
+            get_user_payloads([self.payer.id])[self.payer.id]["first_name"], "Pat"
+        )
+
+
+class BalanceCheckpointTests(APITestCase):
+    def setUp(self):
+        """
+        Set up a group with one expense in January and one in March.
+        """
+        self.user1 = User.objects.create_user(username="user1", password="password")
+        self.user2 = User.objects.create_user(username="user2", password="password")
+        self.group = ExpenseGroup.objects.create(name="Test Group")
+        self.group.members.add(self.user1, self.user2)
+        self.client.force_authenticate(user=self.user1)
+        self.summary_url = reverse("expense_summary", args=[self.group.id])
+        self.add_expense(100, "2025-01-10")
+        self.add_expense(40, "2025-03-10")
+
+    def add_expense(self, amount, day):
+        expense = Expense.objects.create(
+            title="Dinner",
+            amount=amount,
+            group=self.group,
+            paid_by=self.user1,
+            expense_date=self.end_of(day),
+        )
+        for user in (self.user1, self.user2):
+            Split.objects.create(expense=expense, user=user, amount=amount / 2)
+        record_expense(expense)
+        return expense
+
+    def end_of(self, day):
+        return timezone.make_aware(datetime.combine(parse_date(day), time.max))
+
+    def test_as_of_summary_excludes_later_rows(self):
+        """
+        Test a historical summary only counts expenses dated up to that day.
+        """
+        response = self.client.get(self.summary_url, {"as_of": "2025-02-01"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["total_spend"], Decimal("100.00"))
+        (transfer,) = response.data["non_simplified_transactions"]
+        self.assertEqual(transfer["from_user"]["id"], self.user2.id)
+        self.assertEqual(transfer["amount"], Decimal("50.00"))
+
+        response = self.client.get(self.summary_url, {"as_of": "not-a-date"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_replay_starts_from_nearest_checkpoint(self):
+        """
+        Test a checkpoint is reused and only newer rows are replayed.
+        """
+        call_command(
+            "create_balance_checkpoints", "--date", "2025-01-31", stdout=StringIO()
+        )
+        checkpoint = BalanceCheckpoint.objects.get(group=self.group)
+        self.assertEqual(checkpoint.total_spend, 10000)
+
+        with patch.object(
+            LedgerCore, "from_group", wraps=LedgerCore.from_group
+        ) as from_group:
+            state = get_ledger_as_of(self.group, self.end_of("2025-04-01"))
+        self.assertEqual(from_group.call_args.kwargs["after"], checkpoint.as_of)
+        self.assertEqual(state.total_spend, 14000)
+        self.assertEqual(state.balances, {self.user1.id: 7000, self.user2.id: -7000})
+        self.assertEqual(state.pair_debts, {(self.user2.id, self.user1.id): 7000})
+
+    @patch("expenses.checkpoints.CHECKPOINT_REPLAY_LIMIT", 0)
+    def test_concurrent_checkpoint_save_is_ignored(self):
+        """
+        Test a checkpoint saved by another request during the replay does not
+        fail this one.
+        """
+        as_of = self.end_of("2025-01-31")
+
+        def from_group(*args, **kwargs):
+            BalanceCheckpoint.objects.create(
+                group=self.group, as_of=as_of, balances={}, pair_debts={}
+            )
+            return replay(*args, **kwargs)
+
+        replay = LedgerCore.from_group
+        with patch.object(LedgerCore, "from_group", side_effect=from_group):
+            state = get_ledger_as_of(self.group, as_of)
+        self.assertEqual(state.total_spend, 10000)
+        self.assertEqual(BalanceCheckpoint.objects.filter(group=self.group).count(), 1)
+
+    @patch("expenses.checkpoints.CHECKPOINT_REPLAY_LIMIT", 0)
+    def test_checkpoint_raced_by_a_write_is_not_saved(self):
+        """
+        Test a replay is only saved as a checkpoint when no write changed the
+        group while it ran.
+        """
+        as_of = self.end_of("2025-01-31")
+
+        def from_group(*args, **kwargs):
+            core = replay(*args, **kwargs)
+            self.add_expense(20, "2025-01-15")
+            return core
+
+        replay = LedgerCore.from_group
+        self.group.refresh_from_db()
+        with patch.object(LedgerCore, "from_group", side_effect=from_group):
+            get_ledger_as_of(self.group, as_of)
+        self.assertFalse(BalanceCheckpoint.objects.exists())
+
+        self.group.refresh_from_db()
+        state = get_ledger_as_of(self.group, as_of)
+        self.assertEqual(state.total_spend, 12000)
+        self.assertEqual(BalanceCheckpoint.objects.get().total_spend, 12000)
+
+    def test_backdated_write_invalidates_later_checkpoints(self):
+        """
+        Test a write dated before a checkpoint drops it, and later ones are kept.
+        """
+        create_checkpoint(self.group, self.end_of("2025-01-31"))
+        create_checkpoint(self.group, self.end_of("2025-03-31"))
+
+        self.add_expense(20, "2025-02-15")
+
+        self.assertEqual(
+            list(
+                BalanceCheckpoint.objects.filter(group=self.group).values_list(
+                    "as_of", flat=True
+                )
+            ),
+            [self.end_of("2025-01-31")],
+        )
+        state = get_ledger_as_of(self.group, self.end_of("2025-03-31"))
+        self.assertEqual(state.total_spend, 16000)
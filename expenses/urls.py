@@ -13,6 +13,16 @@ urlpatterns = [
         views.ExpenseSummaryView.as_view(),
         name="expense_summary",
     ),
+    path(
+        "expenses/<int:group_id>/import/",
+        views.ExpenseImportView.as_view(),
+        name="import_expenses",
+    ),
+    path(
+        "summary-cache-stats/",
+        views.SummaryCacheStatsView.as_view(),
+        name="summary_cache_stats",
+    ),
     path(
         "expense/delete/<int:expense_id>/",
         views.ExpenseDeleteView.as_view(),
@@ -1,5 +1,9 @@
-from rapidfuzz import fuzz
+import re
+from functools import lru_cache
+
 from utils.gemini_api_call import generate_content
+from utils.llm_client import LLMError
+from utils.sdk import rapidfuzz
 
 ICON_MAP = {
     "transport": ["uber", "taxi", "cab", "ola", "ride"],
@@ -138,27 +142,182 @@ ICON_EMOJIS = {
 }
 
 
+def _build_keyword_index(icon_map):
+    """
+    Flatten ICON_MAP into keywords ordered by category priority, each mapped
+    to the first category that lists it.
+    """
+    keyword_categories = {}
+    for category, keywords in icon_map.items():
+        for keyword in keywords:
+            keyword_categories.setdefault(keyword, category)
+    return list(keyword_categories), keyword_categories
+
+
+KEYWORDS, KEYWORD_CATEGORIES = _build_keyword_index(ICON_MAP)
+CATEGORY_PRIORITY = {category: index for index, category in enumerate(ICON_MAP)}
+# A lookahead finds the keywords starting at every position, overlapping ones
+# included, in one scan. Alternatives are tried in category priority order.
+KEYWORD_PATTERN = re.compile(
+    "(?=(" + "|".join(re.escape(keyword) for keyword in KEYWORDS) + "))"
+)
+FUZZY_MIN_SCORE = 80  # a fuzzy match has to score above this
+DEFAULT_EXPENSE_ICON = ICON_EMOJIS["default"]
+# Emoji with skin tones or ZWJ sequences take several code points
+MAX_GENERATED_ICON_LENGTH = 16
+LLM_ICON_BATCH_SIZE = 50  # texts per batched icon prompt
+
+
+def normalize_icon_text(title, description=None):
+    # Same text the keyword scores have always been computed on
+    return f"{title or ''} {description or ''}".lower()
+
+
+def _exact_category(text):
+    # Exact keyword: the highest priority category mentioned anywhere wins
+    matched = {KEYWORD_CATEGORIES[keyword] for keyword in KEYWORD_PATTERN.findall(text)}
+    if matched:
+        return min(matched, key=CATEGORY_PRIORITY.__getitem__)
+    return None
+
+
+@lru_cache(maxsize=4096)
+def _classify(text):
+    category = _exact_category(text)
+    if category:
+        return category
+
+    # Otherwise the closest keyword, the first one listed on a tie
+    fuzz, process = rapidfuzz()
+    best = process.extractOne(
+        text, KEYWORDS, scorer=fuzz.partial_ratio, score_cutoff=FUZZY_MIN_SCORE
+    )
+    if best and best[1] > FUZZY_MIN_SCORE:
+        return KEYWORD_CATEGORIES[best[0]]
+    return None
+
+
+def match_expense_icon(title, description=None):
+    """
+    Icon of the category whose keywords match the text, without asking the
+    LLM. Returns None when nothing matches closely enough.
+    """
+    category = _classify(normalize_icon_text(title, description))
+    return ICON_EMOJIS[category] if category else None
+
+
 def get_expense_icon(title, description=None):
-    text_priority = (title or "") + " " + (description or "")
-    text_priority = text_priority.lower()
-    best_score = 0
-    best_match = None
-    for category, keywords in ICON_MAP.items():
-        if any(word in text_priority for word in keywords):
-            return ICON_EMOJIS[category]
-        else:
-            for keyword in keywords:
-                score = fuzz.partial_ratio(keyword, text_priority)
-                if score > best_score:
-                    best_score = score
-                    best_match = category
-    if best_score > 80:
-        return ICON_EMOJIS[best_match]
-
-    generated_icon = generate_content(
-        f"Suggest one emoji based on this text, suggest only single emoji no text: {text_priority}"
+    """
+    Icon for a new or edited expense, without waiting on the LLM. Text that
+    matches no keyword gets DEFAULT_EXPENSE_ICON, which a background job
+    replaces with generate_expense_icon() later.
+    """
+    return match_expense_icon(title, description) or DEFAULT_EXPENSE_ICON
+
+
+def generate_expense_icon(title, description=None):
+    """
+    Ask the LLM for an emoji describing the text.
+
+    Raises:
+        ValueError: The reply is empty or not a single emoji, so that the job
+            calling this is retried.
+    """
+    text_priority = ((title or "") + " " + (description or "")).lower()
+    generated_icon = (
+        generate_content(
+            f"Suggest one emoji based on this text, suggest only single emoji no text: {text_priority}"
+        )
+        or ""
     ).strip()
+    if not generated_icon or len(generated_icon) > MAX_GENERATED_ICON_LENGTH:
+        raise ValueError(f"Unusable icon suggestion: {generated_icon[:50]!r}")
+    return generated_icon
+
+
+def _fuzzy_categories(texts):
+    """
+    Closest keyword category of each text, scored against every keyword in
+    one vectorized cdist call. Same result as the extractOne in _classify.
+    """
+    if not texts:
+        return []
+    fuzz, process = rapidfuzz()
+    scores = process.cdist(
+        texts,
+        KEYWORDS,
+        scorer=fuzz.partial_ratio,
+        score_cutoff=FUZZY_MIN_SCORE,
+        workers=-1,
+    )
+    # argmax picks the first keyword listed on a tie, like extractOne
+    best = scores.argmax(axis=1)
+    best_scores = scores.max(axis=1)
+    return [
+        KEYWORD_CATEGORIES[KEYWORDS[index]] if score > FUZZY_MIN_SCORE else None
+        for index, score in zip(best, best_scores)
+    ]
+
+
+def generate_expense_icons(texts):
+    """
+    Ask the LLM for an emoji per text, LLM_ICON_BATCH_SIZE texts per prompt.
+
+    Returns:
+        list: An emoji, or None when the LLM gave no usable one, per text.
+    """
+    icons = []
+    for start in range(0, len(texts), LLM_ICON_BATCH_SIZE):
+        batch = texts[start : start + LLM_ICON_BATCH_SIZE]
+        lines = "\n".join(f"{number}. {text}" for number, text in enumerate(batch, 1))
+        try:
+            reply = generate_content(
+                "Suggest one emoji for each numbered text below. Answer with one "
+                "line per text, formatted as <number>. <emoji>, no other text:\n"
+                + lines
+            )
+        except LLMError:
+            reply = ""
+        suggested = {}
+        for line in (reply or "").splitlines():
+            number, separator, icon = line.strip().partition(".")
+            icon = icon.strip()
+            if separator and number.isdigit() and icon:
+                if len(icon) <= MAX_GENERATED_ICON_LENGTH:
+                    suggested[int(number)] = icon
+        icons += [suggested.get(number) for number in range(1, len(batch) + 1)]
+    return icons
+
+
+def classify_icons(titles, descriptions=None, use_llm=True):
+    """
+    Icons for many texts at once: exact keywords first, then one fuzzy cdist
+    over the rest, then one batched LLM prompt per LLM_ICON_BATCH_SIZE texts
+    still unresolved.
+
+    Args:
+        titles (list): Expense titles.
+        descriptions (list): Notes matching the titles, or None.
+        use_llm (bool): Ask the LLM about texts no keyword matches.
+
+    Returns:
+        list: One icon per title, DEFAULT_EXPENSE_ICON when nothing matched.
+    """
+    descriptions = descriptions or [None] * len(titles)
+    texts = [
+        normalize_icon_text(title, description)
+        for title, description in zip(titles, descriptions)
+    ]
+    unique_texts = list(dict.fromkeys(texts))
+    categories = {text: _exact_category(text) for text in unique_texts}
+    unmatched = [text for text in unique_texts if categories[text] is None]
+    categories.update(zip(unmatched, _fuzzy_categories(unmatched)))
 
-    if generated_icon:
-        return generated_icon
-    return "💸"
+    icons = {
+        text: ICON_EMOJIS[category] if category else None
+        for text, category in categories.items()
+    }
+    unresolved = [text for text, icon in icons.items() if icon is None]
+    if use_llm and unresolved:
+        icons.update(zip(unresolved, generate_expense_icons(unresolved)))
+    return [icons[text] or DEFAULT_EXPENSE_ICON for text in texts]
@@ -1,27 +1,35 @@
-from datetime import datetime
+import codecs
+from datetime import datetime, time, timedelta
+from django.db import transaction
 from django.shortcuts import get_object_or_404
 from rest_framework import generics
-from rest_framework.pagination import CursorPagination
 from django.core.exceptions import PermissionDenied
+from rest_framework.permissions import IsAdminUser
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
 from auth_app.utils import log_activity
 
-from .models import Expense
+from .importer import ROW_READERS, ExpenseImporter
+from .ledger import record_expense
+from .models import Expense, UserExpenseFeed
+from .summary_cache import get_summary_cache_stats
 from groups.models import ExpenseGroup
+from utils.pagination import KeysetPagination
 from .serializers import (
     ExpenseSerializer,
     ExpenseSummarySerializer,
+    UserExpenseFeedSerializer,
     UserExpenseSerializer,
 )
 
+from django.utils import timezone
 from django.utils.dateparse import parse_date
 
 
-class ExpenseCursorPagination(CursorPagination):
+class ExpenseCursorPagination(KeysetPagination):
     page_size = 10
-    ordering = "-expense_date"
+    ordering = ("-expense_date", "-id")
 
 
 class ExpenseCreateView(generics.CreateAPIView):
@@ -29,12 +37,10 @@ class ExpenseCreateView(generics.CreateAPIView):
     serializer_class = ExpenseSerializer
 
     def perform_create(self, serializer):
-        group_id = self.request.data.get("group")
+        group = serializer.validated_data["group"]
 
-        group = ExpenseGroup.objects.get(id=group_id)
-
-        # Check if the user is part of the group
-        if not group.members.filter(id=self.request.user.id).exists():
+        # Check if the user is part of the group (looked up during validation)
+        if self.request.user.id not in serializer.group_member_ids:
             raise PermissionDenied("You are not a member of this group.")
         # Save the expense if the user is a part of the group
         serializer.save(paid_by=self.request.user)
@@ -73,7 +79,9 @@ class ExpenseDeleteView(generics.DestroyAPIView):
         )
 
         # Delete the expense
-        expense.delete()
+        with transaction.atomic():
+            record_expense(expense, sign=-1)
+            expense.delete()
         return Response({"message": "Expense deleted successfully."}, status=200)
 
 
@@ -82,30 +90,40 @@ class ExpenseUpdateView(generics.UpdateAPIView):
     API view to update an expense.
     """
 
-    queryset = Expense.objects.all()
+    queryset = Expense.objects.select_related("group", "paid_by")
     serializer_class = ExpenseSerializer
 
     def update(self, request, *args, **kwargs):
-        expense_id = self.kwargs.get("pk")
-        expense = get_object_or_404(Expense, id=expense_id)
+        expense = self.get_object()
+        group = expense.group
 
         # Check if the user is part of the group associated with the expense
-        if not expense.group.members.filter(id=request.user.id).exists():
+        if not group.members.filter(id=request.user.id).exists():
             raise PermissionDenied(
                 "You are not a member of the group associated with this expense."
             )
-
-        # Perform the update
-        response = super().update(request, *args, **kwargs)
+        # The update changes the instance in place, keep the old values
+        old_amount = expense.amount
+        old_title = expense.title
+        old_payer = expense.paid_by.username
+
+        # Perform the update. Unlike UpdateAPIView.update this keeps the
+        # prefetched splits the serializer loaded for the response.
+        serializer = self.get_serializer(
+            expense, data=request.data, partial=kwargs.pop("partial", False)
+        )
+        serializer.is_valid(raise_exception=True)
+        self.perform_update(serializer)
+        response = Response(serializer.data)
 
         # Log the activity
         log_activity(
             user=request.user,
             name="Expense Updated",
-            description=f"""An expense of {expense.amount} of {expense.title} was updated in group
-              '{expense.group.name} paid_by {expense.paid_by.username}'.
+            description=f"""An expense of {old_amount} of {old_title} was updated in group
+              '{group.name} paid_by {old_payer}'.
               New Changes: {response.data.get('amount')} of {response.data.get('title')} paid_by {response.data.get('paid_by',{}).get('username')}""",
-            related_object=expense.group,
+            related_object=group,
         )
 
         return response
@@ -113,13 +131,16 @@ class ExpenseUpdateView(generics.UpdateAPIView):
 
 class ExpenseListView(generics.ListAPIView):
     serializer_class = ExpenseSerializer
+    pagination_class = ExpenseCursorPagination
 
     def get_queryset(self):
         group_id = self.kwargs["group_id"]
         group = ExpenseGroup.objects.get(id=group_id)
         if not group.members.filter(id=self.request.user.id).exists():
             raise PermissionDenied("You are not a member of this group.")
-        return Expense.objects.filter(group_id=group_id)
+        return ExpenseSerializer.eager_load(
+            Expense.objects.filter(group_id=group_id).order_by("-expense_date", "-id")
+        )
 
 
 class ExpenseSummaryView(APIView):
@@ -141,12 +162,79 @@ class ExpenseSummaryView(APIView):
         return Response(serializer.data)
 
 
+class ExpenseImportView(APIView):
+    """
+    API view to import many expenses into a group from a CSV or NDJSON body.
+
+    Rows are streamed from the request and written in chunks inside one
+    transaction. Unless ?partial=true is passed, any invalid row rolls the
+    whole import back.
+    """
+
+    def post(self, request, group_id):
+        group = get_object_or_404(ExpenseGroup, id=group_id)
+        if not group.members.filter(id=request.user.id).exists():
+            return Response(
+                {"error": "You are not a member of this group."}, status=403
+            )
+
+        read_rows = ROW_READERS.get(request.content_type.split(";")[0].strip())
+        if read_rows is None:
+            return Response(
+                {"error": f"Send one of: {', '.join(ROW_READERS)}."}, status=415
+            )
+        if request.stream is None:
+            return Response({"error": "The request body is empty."}, status=400)
+        partial = request.query_params.get("partial", "false").lower() == "true"
+
+        importer = ExpenseImporter(group, request.user)
+        try:
+            with transaction.atomic():
+                importer.run(read_rows(codecs.iterdecode(request.stream, "utf-8")))
+                if importer.error_count and not partial:
+                    transaction.set_rollback(True)
+        except UnicodeDecodeError:
+            return Response({"error": "The body must be UTF-8 encoded."}, status=400)
+
+        result = {
+            "imported": importer.imported,
+            "error_count": importer.error_count,
+            "errors": importer.errors,
+        }
+        if importer.error_count and not partial:
+            result["imported"] = 0
+            return Response(result, status=400)
+
+        if importer.imported:
+            log_activity(
+                user=request.user,
+                name="Expenses Imported",
+                description=f"{importer.imported} expenses were imported into group '{group.name}'.",
+                related_object=group,
+            )
+        return Response(result, status=201)
+
+
+class SummaryCacheStatsView(APIView):
+    """
+    API view exposing the summary cache hit and miss counters for monitoring.
+    """
+
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(get_summary_cache_stats())
+
+
 class UserExpenseListView(generics.ListAPIView):
     """
     API view to get the list of expenses for a user in a group.
+
+    Reads the user's UserExpenseFeed rows: one index range scan ordered by
+    expense_date, each row carrying the user's share.
     """
 
-    serializer_class = ExpenseSerializer
+    serializer_class = UserExpenseFeedSerializer
     pagination_class = ExpenseCursorPagination
 
     def get_queryset(self):
@@ -158,25 +246,27 @@ class UserExpenseListView(generics.ListAPIView):
         start_date = parse_date(start_date_str) if start_date_str else None
         end_date = parse_date(end_date_str) if end_date_str else datetime.now().date()
 
-        expenses = Expense.objects.filter(split_between__id=user_id)
+        feed = UserExpenseFeed.objects.filter(user_id=user_id)
 
         if group_id:
             expense_group = get_object_or_404(ExpenseGroup, id=group_id)
             if not expense_group.members.filter(id=self.request.user.id).exists():
                 raise PermissionDenied("You are not a member of this group.")
-            expenses = expenses.filter(group_id=group_id)
+            feed = feed.filter(group_id=group_id)
         if start_date:
-            expenses = expenses.filter(
-                created_at__date__gte=start_date,
-                created_at__date__lte=end_date,
-                split_between__id__contains=user_id,
-            ).order_by("-expense_date")
-
-        else:
-            expenses = expenses.filter(split_between__id__contains=user_id).order_by(
-                "-expense_date"
+            # Whole days as a datetime range, so the index is used
+            feed = feed.filter(
+                expense_date__gte=timezone.make_aware(
+                    datetime.combine(start_date, time.min)
+                ),
+                expense_date__lt=timezone.make_aware(
+                    datetime.combine(end_date + timedelta(days=1), time.min)
+                ),
             )
-        return expenses
+        return ExpenseSerializer.eager_load(
+            feed.select_related("expense").order_by("-expense_date"),
+            prefix="expense__",
+        )
 
 
 class UserTotalSpentView(APIView):
@@ -189,18 +279,11 @@ class UserTotalSpentView(APIView):
         start_date = parse_date(start_date) if start_date else None
         end_date = parse_date(end_date) if end_date else datetime.now().date()
 
-        # Optional group filter
-        expenses = Expense.objects.filter(split_between__id=user.id)
-        if group_id:
-            expenses = expenses.filter(group_id=group_id)
-
-        if start_date:
-            expenses = expenses.filter(expense_date__range=(start_date, end_date))
-
         total_current_month_expenses = UserExpenseSerializer(
-            expenses,
+            {},
             context={
                 "user_id": user.id,
+                "group_id": group_id,  # Optional group filter
                 "start_date": start_date,
                 "end_date": end_date,
             },
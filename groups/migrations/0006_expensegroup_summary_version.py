@@ -0,0 +1,18 @@
+# Generated by Django 5.2 on 2026-10-18 19:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0005_expensegroup_group_icon"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="expensegroup",
+            name="summary_version",
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2 on 2026-10-18 20:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0006_expensegroup_summary_version"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="expensegroup",
+            name="simplify_engine",
+            field=models.CharField(
+                choices=[
+                    ("greedy", "Greedy (largest creditor and debtor first)"),
+                    ("exact", "Exact (fewest transfers)"),
+                ],
+                default="greedy",
+                max_length=20,
+            ),
+        ),
+    ]
@@ -15,6 +15,14 @@ class ExpenseGroup(models.Model):
     simplify_debt = models.BooleanField(
         default=False
     )  # Flag to indicate if the group should simplify debts
+    simplify_engine = models.CharField(
+        max_length=20,
+        choices=[
+            ("greedy", "Greedy (largest creditor and debtor first)"),
+            ("exact", "Exact (fewest transfers)"),
+        ],
+        default="greedy",
+    )  # Algorithm used when simplifying debts
     created_by = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -25,10 +33,24 @@ class ExpenseGroup(models.Model):
     group_icon = models.CharField(
         max_length=255, blank=True, null=True, default="👥"
     )  # Optional icon for the group
+    summary_version = models.PositiveIntegerField(
+        default=0
+    )  # Bumped on every change that affects the expense summary
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        # summary_version only moves through F() updates (groups/utils.py), so a
+        # full save from an older copy of the group must not write it back.
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key and field.name != "summary_version"
+            ]
+        super().save(*args, **kwargs)
+
     def total_balance(self):
         # Calculate the total balance (e.g., sum of expenses divided by number of members)
         return self.expenses.aggregate(total=models.Sum("amount"))["total"] or 0
@@ -0,0 +1,90 @@
+"""
+AI overview of a group, served stale-while-revalidate.
+
+The overview is generated by a background job, run by `manage.py run_workers`
+or, on Zappa, by the jobs.scheduled.run_jobs event every minute. It is kept in
+the "llm" cache, a database table every process and Lambda shares, per group
+and tagged with the summary version and month it describes.
+Reads never wait on the LLM: they get the last overview, and queue a new one
+when the group changed or the month rolled over since.
+"""
+
+from django.core.cache import caches
+from django.utils import timezone
+
+from expenses.serializers import ExpenseSummarySerializer
+from jobs.queue import enqueue_job
+from utils.gemini_api_call import TIMEOUT_MESSAGE, generate_content
+from utils.llm_client import LLMError
+from .models import ExpenseGroup
+
+OVERVIEW_PENDING = "The overview is being prepared. Please check back in a minute."
+OVERVIEW_TIMEOUT = 60 * 60 * 24 * 31  # a month: stale overviews are still served
+
+
+def overview_cache_key(group_id):
+    return f"group_overview:{group_id}"
+
+
+def overview_month():
+    return timezone.localdate().strftime("%Y-%m")
+
+
+def get_group_overview(group):
+    """
+    The last generated overview of a group, queueing a new one if it is out
+    of date.
+
+    Returns:
+        dict: text, generated_at and stale, or None when there is no overview
+        yet.
+    """
+    overview = caches["llm"].get(overview_cache_key(group.id))
+    stale = overview is None or (
+        overview["summary_version"] != group.summary_version
+        or overview["month"] != overview_month()
+    )
+    if stale:
+        enqueue_job(
+            "group_overview", f"group_overview:{group.id}", {"group_id": group.id}
+        )
+    if overview is None:
+        return None
+    return {
+        "text": overview["text"],
+        "generated_at": overview["generated_at"],
+        "stale": stale,
+    }
+
+
+def generate_group_overview(group_id):
+    """
+    Ask the LLM for a fresh overview of the group and cache it.
+
+    Raises:
+        LLMError: The LLM failed or answered nothing.
+    """
+    group = ExpenseGroup.objects.filter(id=group_id).first()
+    if group is None:
+        return
+    # Read before the summary, so writes made meanwhile queue another run
+    summary_version, month = group.summary_version, overview_month()
+    expense = ExpenseSummarySerializer(group)
+    ai_overview = generate_content(
+        f"""Generate a one liner random summary for current
+                                        month  using following json response also add one
+                                       random money savings tip:  json:{expense.data} make sure curreny is rupees"""
+    ).replace("\n", "")
+    if not ai_overview or ai_overview == TIMEOUT_MESSAGE:
+        # Raise so the job is retried and readers keep the last overview
+        raise LLMError("No overview was generated.")
+    caches["llm"].set(
+        overview_cache_key(group_id),
+        {
+            "text": ai_overview,
+            "summary_version": summary_version,
+            "month": month,
+            "generated_at": timezone.now().isoformat(),
+        },
+        OVERVIEW_TIMEOUT,
+    )
@@ -4,10 +4,11 @@ from django.contrib.contenttypes.models import ContentType
 
 from auth_app.utils import log_activity
 from auth_app.models import Activity
-from expenses.serializers import ExpenseSummarySerializer, UserSerializer
-from expenses.utils import get_expense_icon
-from utils.gemini_api_call import generate_content
+from expenses.serializers import UserSerializer
+from expenses.utils import DEFAULT_EXPENSE_ICON, get_expense_icon
+from jobs.queue import enqueue_job
 from .models import ExpenseGroup, GroupMembership
+from .overview import OVERVIEW_PENDING, get_group_overview
 
 
 def get_group_activities(group_id):
@@ -78,6 +79,16 @@ class CreateGroupSerializer(serializers.ModelSerializer):
         group.members.add(request_user)
         group.created_by = request_user  # Set the creator of the group
         group.save()
+        if user_selected_icon and group.group_icon == DEFAULT_EXPENSE_ICON:
+            enqueue_job(
+                "group_icon",
+                f"group_icon:{group.id}",
+                {
+                    "group_id": group.id,
+                    "name": group.name,
+                    "description": group.description,
+                },
+            )
         log_activity(
             user=request_user,
             name="Group Created",
@@ -144,18 +155,20 @@ class GroupActivitySerializer(serializers.ModelSerializer):
 
 class GroupOverviewSerializer(serializers.Serializer):
     """
-    Serializer for retrieving group overview.
+    Serializer for retrieving group overview. The overview comes from the
+    cache and is regenerated in the background once it is stale.
     """
 
-    ai_overview = serializers.SerializerMethodField()
-
-    def get_ai_overview(self, obj):
-        expense = ExpenseSummarySerializer(
-            obj, context={"request": self.context["request"]}
-        )
-        ai_overview = generate_content(
-            f"""Generate a one liner random summary for current
-                                        month  using following json response also add one
-                                       random money savings tip:  json:{expense.data} make sure curreny is rupees"""
-        ).replace("\n", "")
-        return ai_overview
+    def to_representation(self, instance):
+        overview = get_group_overview(instance)
+        if overview is None:
+            return {
+                "ai_overview": OVERVIEW_PENDING,
+                "generated_at": None,
+                "stale": True,
+            }
+        return {
+            "ai_overview": overview["text"],
+            "generated_at": overview["generated_at"],
+            "stale": overview["stale"],
+        }
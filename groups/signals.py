@@ -1,18 +1,26 @@
-from django.db.models.signals import pre_save
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
 
-from expenses.utils import get_expense_icon
-from .models import ExpenseGroup
+from .models import ExpenseGroup, GroupMembership
+from .utils import bump_summary_version
 
 
-@receiver(pre_save, sender=ExpenseGroup)
-def set_default_category(sender, instance, **kwargs):
-    if instance.id:
-        prev_expense = ExpenseGroup.objects.get(id=instance.id)
-        if (
-            instance.name != prev_expense.name
-            or instance.description != prev_expense.description
-        ):
-            instance.expense_icon = get_expense_icon(
-                instance.name, instance.description
-            )
+@receiver(post_save, sender=GroupMembership)
+@receiver(post_delete, sender=GroupMembership)
+def membership_changed(sender, instance, **kwargs):
+    bump_summary_version(instance.group_id)
+
+
+@receiver(m2m_changed, sender=ExpenseGroup.members.through)
+def members_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    # group.members.add() and friends bypass the GroupMembership save signals
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        bump_summary_version(instance.id)
+    elif action == "pre_clear":
+        for group_id in instance.expense_groups.values_list("id", flat=True):
+            bump_summary_version(group_id)
+    else:
+        for group_id in pk_set:
+            bump_summary_version(group_id)
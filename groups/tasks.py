@@ -0,0 +1,24 @@
+from expenses.utils import DEFAULT_EXPENSE_ICON, generate_expense_icon
+from jobs.queue import job_handler
+from .models import ExpenseGroup
+from .overview import generate_group_overview
+
+
+@job_handler("group_icon")
+def generate_icon(group_id, name=None, description=None):
+    """
+    Replace the placeholder icon of a group with one suggested by the LLM,
+    generated for its current name and description like the expense icons.
+    """
+    pending = ExpenseGroup.objects.filter(id=group_id, group_icon=DEFAULT_EXPENSE_ICON)
+    current = pending.values("name", "description").first()
+    if current is None:
+        return
+    icon = generate_expense_icon(current["name"], current["description"])
+    if not pending.filter(**current).update(group_icon=icon) and pending.exists():
+        raise RuntimeError(f"Group {group_id} was edited while its icon was generated")
+
+
+@job_handler("group_overview")
+def generate_overview(group_id):
+    generate_group_overview(group_id)
@@ -1,9 +1,24 @@
+import random
+
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from rest_framework.test import APITestCase, APIClient
 from rest_framework import status
+from auth_app.models import Activity
+from auth_app.utils import log_activity
+from expenses.models import Expense
 from groups.models import ExpenseGroup, GroupMembership
+from transactions.models import Transaction
+from groups.overview import OVERVIEW_PENDING
+from groups.utils import bump_summary_version
+from groups.views import get_group_activities
 from unittest.mock import patch
+from expenses.load_data import seed_group
+from jobs.models import BackgroundJob
+from jobs.queue import run_pending_jobs
+from jobs.scheduled import run_jobs
+from utils.llm_client import LLMError
+from utils.testing import QueryBudgetMixin
 
 User = get_user_model()
 
@@ -46,9 +61,12 @@ class GroupAPITests(APITestCase):
         """
         response = self.client.get(self.group_members_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(list(response.data), ["count", "next", "previous", "results"])
+        self.assertEqual(response.data["count"], 1)
+        self.assertIsNone(response.data["next"])
         self.assertEqual(
-            response.data[0]["members"][0]["username"], self.user1.username
+            response.data["results"][0]["members"][0]["username"],
+            self.user1.username,
         )
 
     def test_list_group_members_not_in_group(self):
@@ -105,7 +123,26 @@ class GroupAPITests(APITestCase):
         response = self.client.get(self.group_activity_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
-    @patch("groups.serializers.generate_content")
+    def test_group_activity_lists_activities_of_the_group(self):
+        """
+        Test activities about the group, its expenses and its settle-ups are
+        filed under the group, and other groups' are not.
+        """
+        other = ExpenseGroup.objects.create(name="Other Group")
+        expense = Expense.objects.create(
+            group=self.group, title="Cab", amount=10, paid_by=self.user1
+        )
+        settle_up = Transaction.objects.create(
+            group=self.group, from_user=self.user1, to_user=self.user1, amount=5
+        )
+        for related_object in [self.group, expense, settle_up, other]:
+            log_activity(self.user1, "Activity", "", related_object)
+
+        response = self.client.get(self.group_activity_url)
+        self.assertEqual(len(response.data["results"]), 3)
+        self.assertEqual(Activity.objects.filter(group=other).count(), 1)
+
+    @patch("groups.overview.generate_content")
     def test_group_overview_success(self, mock_generate_content):
         """
         Test retrieving the overview of a group successfully.
@@ -115,6 +152,59 @@ class GroupAPITests(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertIn("ai_overview", response.data)
 
+    @patch("groups.overview.generate_content", return_value="This month: ₹10.")
+    def test_group_overview_is_served_stale_while_revalidating(
+        self, mock_generate_content
+    ):
+        """
+        Test the overview never waits on the LLM: it is generated by a job and
+        served, marked stale, until the next one is ready.
+        """
+        response = self.client.get(self.group_overview_url)
+        self.assertEqual(response.data["ai_overview"], OVERVIEW_PENDING)
+        mock_generate_content.assert_not_called()
+
+        run_pending_jobs()
+        response = self.client.get(self.group_overview_url)
+        self.assertEqual(response.data["ai_overview"], "This month: ₹10.")
+        self.assertFalse(response.data["stale"])
+        self.assertIsNotNone(response.data["generated_at"])
+
+        bump_summary_version(self.group.id)
+        mock_generate_content.return_value = "Updated."
+        response = self.client.get(self.group_overview_url)
+        self.assertEqual(response.data["ai_overview"], "This month: ₹10.")
+        self.assertTrue(response.data["stale"])
+        run_pending_jobs()
+        response = self.client.get(self.group_overview_url)
+        self.assertEqual(response.data["ai_overview"], "Updated.")
+
+    @patch("groups.overview.generate_content", return_value="This month: ₹10.")
+    def test_group_overview_is_generated_by_the_scheduled_runner(
+        self, mock_generate_content
+    ):
+        """
+        Test the overview queued by a read is generated without a worker
+        process, by the scheduled Zappa handler.
+        """
+        self.client.get(self.group_overview_url)
+        run_jobs({}, None)
+        response = self.client.get(self.group_overview_url)
+        self.assertEqual(response.data["ai_overview"], "This month: ₹10.")
+
+    @patch("groups.overview.generate_content", side_effect=LLMError("down"))
+    def test_group_overview_llm_unavailable(self, mock_generate_content):
+        """
+        Test a failed generation is retried later and the endpoint still answers.
+        """
+        self.client.get(self.group_overview_url)
+        run_pending_jobs()
+        job = BackgroundJob.objects.get(key=f"group_overview:{self.group.id}")
+        self.assertEqual(job.status, BackgroundJob.PENDING)
+        response = self.client.get(self.group_overview_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["ai_overview"], OVERVIEW_PENDING)
+
     def test_group_overview_not_in_group(self):
         """
         Test retrieving the overview of a group when the user is not a member.
@@ -122,3 +212,71 @@ class GroupAPITests(APITestCase):
         self.group.members.remove(self.user1)  # Remove user1 from the group
         response = self.client.get(self.group_overview_url)
         self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+
+class GroupQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        """
+        Set up a seeded group, with more activities than fit on a page.
+        """
+        self.group = seed_group(
+            random.Random(0), members=5, expenses=25, settle_ups=5, activities=25
+        )
+        self.user = self.group.created_by
+        self.client.force_authenticate(user=self.user)
+
+    def test_urls_have_query_budgets(self):
+        self.assertUrlsHaveQueryBudgets("groups.urls")
+
+    def test_read_budgets(self):
+        """
+        Test the group read endpoints stay within their query budgets.
+        """
+        requests = [
+            ("list_groups", reverse("list_groups")),
+            ("list_group_members", reverse("list_group_members", args=[self.group.id])),
+            (
+                "list_group_members_by_uuid",
+                reverse("list_group_members_by_uuid", args=[self.group.uuid]),
+            ),
+            ("group_activities", reverse("group_activities", args=[self.group.id])),
+            ("group_overview", reverse("group_overview", args=[self.group.id])),
+        ]
+        for url_name, url in requests:
+            with self.subTest(url_name), self.assertQueryBudget(url_name):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_activity_pages_cover_the_feed_once(self):
+        """
+        Test following the next links returns every activity of the group
+        once, newest first.
+        """
+        url = reverse("group_activities", args=[self.group.id])
+        timestamps = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            timestamps += [row["timestamp"] for row in response.data["results"]]
+            url = response.data["next"]
+        self.assertEqual(len(timestamps), get_group_activities(self.group.id).count())
+        self.assertEqual(timestamps, sorted(timestamps, reverse=True))
+
+    @patch("groups.serializers.get_expense_icon", return_value="👥")
+    def test_write_budgets(self, mock_get_expense_icon):
+        """
+        Test creating and joining a group stay within their query budgets.
+        """
+        with self.assertQueryBudget("create_group"):
+            response = self.client.post(
+                reverse("create_group"), {"name": "Trip"}, format="json"
+            )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+
+        newcomer = User.objects.create_user(username="newcomer", password="password")
+        self.client.force_authenticate(user=newcomer)
+        with self.assertQueryBudget("add-user-to-group"):
+            response = self.client.post(
+                reverse("add-user-to-group", args=[self.group.uuid])
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
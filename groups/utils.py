@@ -0,0 +1,16 @@
+from django.db import models
+
+from .models import ExpenseGroup
+
+
+def bump_summary_version(group_id):
+    """
+    Mark the cached expense summary of a group as stale.
+
+    Args:
+        group_id (int): The group whose expenses, settle-ups or members changed,
+            or a subquery selecting its id.
+    """
+    ExpenseGroup.objects.filter(id=group_id).update(
+        summary_version=models.F("summary_version") + 1
+    )
@@ -0,0 +1,16 @@
+"""
+Gunicorn settings, read from the working directory by
+`gunicorn splitfree_backend.wsgi` (Dockerfile, Procfile).
+"""
+
+
+def post_worker_init(worker):
+    # Each worker warms its own connection, caches and lazily imported SDKs
+    # after loading the app, so its first request does not pay for them
+    from utils.keep_db_alive import warm_up
+
+    try:
+        warm_up()
+    except Exception:
+        # A cold worker still serves requests; one that fails to boot doesn't
+        worker.log.exception("Warm-up failed")
@@ -0,0 +1,65 @@
+import threading
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connection
+
+from jobs.queue import claim_jobs, run_job, run_pending_jobs
+
+
+class Command(BaseCommand):
+    help = "Run background jobs (icon generation, ...) in worker threads."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=2)
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=1.0,
+            help="Seconds an idle worker waits before looking for jobs again.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Run the jobs that are due and exit.",
+        )
+
+    def handle(self, *args, **options):
+        if options["once"]:
+            count = run_pending_jobs()
+            self.stdout.write(self.style.SUCCESS(f"Ran {count} jobs."))
+            return
+
+        stop = threading.Event()
+        workers = [
+            threading.Thread(
+                target=self.work,
+                args=(stop, options["poll_interval"]),
+                name=f"job-worker-{number}",
+                daemon=True,
+            )
+            for number in range(options["threads"])
+        ]
+        for worker in workers:
+            worker.start()
+        self.stdout.write(f"Started {len(workers)} job workers.")
+        try:
+            while any(worker.is_alive() for worker in workers):
+                for worker in workers:
+                    worker.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stdout.write("Stopping job workers...")
+            stop.set()
+            for worker in workers:
+                worker.join()
+
+    def work(self, stop, poll_interval):
+        try:
+            while not stop.is_set():
+                close_old_connections()
+                jobs = claim_jobs(limit=1)
+                for job in jobs:
+                    run_job(job)
+                if not jobs:
+                    stop.wait(poll_interval)
+        finally:
+            connection.close()
@@ -0,0 +1,47 @@
+from django.db import models
+from django.utils import timezone
+
+
+class BackgroundJob(models.Model):
+    """
+    A unit of deferred work, picked up by `manage.py run_workers`.
+
+    Jobs sharing a key are deduplicated while one of them is pending or
+    running, so enqueueing the same work twice only runs it once.
+    """
+
+    PENDING = "pending"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    STATUS_CHOICES = [
+        (PENDING, "Pending"),
+        (RUNNING, "Running"),
+        (DONE, "Done"),
+        (FAILED, "Failed"),
+    ]
+    ACTIVE_STATUSES = (PENDING, RUNNING)
+
+    kind = models.CharField(max_length=100)  # Name of the registered handler
+    key = models.CharField(max_length=255)  # Deduplication key
+    payload = models.JSONField(default=dict)  # Keyword arguments of the handler
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    run_after = models.DateTimeField(default=timezone.now)  # Retry backoff
+    locked_at = models.DateTimeField(null=True, blank=True)  # When a worker took it
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["key"],
+                condition=models.Q(status__in=["pending", "running"]),
+                name="unique_active_job_key",
+            )
+        ]
+        indexes = [models.Index(fields=["status", "run_after"])]
+
+    def __str__(self):
+        return f"{self.kind} ({self.key}) {self.status}"
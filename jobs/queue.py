@@ -0,0 +1,168 @@
+"""
+Database-backed background job queue.
+
+Handlers are registered with @job_handler in an app's tasks.py and jobs are
+added with enqueue_job(), or enqueue_jobs() for many at once. `manage.py run_workers` (or, on Zappa, the
+scheduled jobs.scheduled.run_jobs handler) claims due jobs, runs them and
+retries failures with exponential backoff.
+"""
+
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+from .models import BackgroundJob
+
+JOB_MAX_ATTEMPTS = getattr(settings, "JOB_MAX_ATTEMPTS", 5)
+JOB_RETRY_DELAY = getattr(
+    settings, "JOB_RETRY_DELAY", 30
+)  # seconds, doubled per attempt
+JOB_LOCK_TIMEOUT = getattr(settings, "JOB_LOCK_TIMEOUT", 600)  # seconds
+
+HANDLERS = {}
+
+
+def job_handler(kind):
+    """
+    Register the decorated function as the handler of a job kind. It is
+    called with the job payload as keyword arguments.
+    """
+
+    def register(function):
+        HANDLERS[kind] = function
+        return function
+
+    return register
+
+
+def enqueue_job(kind, key, payload=None, delay=0, replace=False):
+    """
+    Add a job, unless one with the same key is already pending or running.
+
+    Args:
+        kind (str): A registered handler name.
+        key (str): Deduplication key, e.g. "expense_icon:42".
+        payload (dict): Keyword arguments for the handler, JSON serializable.
+        delay (int): Seconds to wait before the job becomes due.
+        replace (bool): Give a pending job with the same key this payload
+            instead of keeping its own. A running job is left alone, so its
+            handler must read the current state rather than rely on the
+            payload.
+    """
+    payload = payload or {}
+    run_after = timezone.now() + timedelta(seconds=delay)
+    if replace and BackgroundJob.objects.filter(
+        key=key, status=BackgroundJob.PENDING
+    ).update(payload=payload, run_after=run_after, updated_at=timezone.now()):
+        return
+    enqueue_jobs(kind, {key: payload}, delay)
+
+
+def enqueue_jobs(kind, payloads, delay=0):
+    """
+    Add jobs of one kind with a single INSERT, skipping the keys that already
+    have a pending or running job.
+
+    Args:
+        kind (str): A registered handler name.
+        payloads (dict): Maps each deduplication key to its payload.
+        delay (int): Seconds to wait before the jobs become due.
+    """
+    run_after = timezone.now() + timedelta(seconds=delay)
+    BackgroundJob.objects.bulk_create(
+        [
+            BackgroundJob(
+                kind=kind, key=key, payload=payload or {}, run_after=run_after
+            )
+            for key, payload in payloads.items()
+        ],
+        ignore_conflicts=True,
+    )
+
+
+def claim_jobs(limit=10):
+    """
+    Mark up to `limit` due jobs as running and return them. Running jobs whose
+    worker went silent for JOB_LOCK_TIMEOUT are taken over.
+
+    Each job is claimed with a conditional UPDATE, so concurrent workers never
+    run the same job twice.
+    """
+    now = timezone.now()
+    candidates = (
+        BackgroundJob.objects.filter(
+            models.Q(status=BackgroundJob.PENDING, run_after__lte=now)
+            | models.Q(
+                status=BackgroundJob.RUNNING,
+                locked_at__lt=now - timedelta(seconds=JOB_LOCK_TIMEOUT),
+            )
+        )
+        .order_by("run_after", "id")
+        .values_list("id", "status", "locked_at")[:limit]
+    )
+    claimed_ids = [
+        job_id
+        for job_id, status, locked_at in candidates
+        if BackgroundJob.objects.filter(
+            id=job_id, status=status, locked_at=locked_at
+        ).update(
+            status=BackgroundJob.RUNNING,
+            locked_at=now,
+            attempts=models.F("attempts") + 1,
+        )
+    ]
+    return list(BackgroundJob.objects.filter(id__in=claimed_ids).order_by("id"))
+
+
+def run_job(job):
+    """
+    Run a claimed job and record the outcome.
+    """
+    try:
+        handler = HANDLERS.get(job.kind)
+        if handler is None:
+            raise LookupError(f"No handler registered for {job.kind!r}.")
+        handler(**job.payload)
+    except Exception as error:
+        job.last_error = f"{type(error).__name__}: {error}"
+        if job.attempts >= JOB_MAX_ATTEMPTS:
+            job.status = BackgroundJob.FAILED
+        else:
+            job.status = BackgroundJob.PENDING
+            job.run_after = timezone.now() + timedelta(
+                seconds=JOB_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+    else:
+        job.status = BackgroundJob.DONE
+    job.locked_at = None
+    job.save(
+        update_fields=["status", "run_after", "locked_at", "last_error", "updated_at"]
+    )
+    return job.status
+
+
+def run_pending_jobs(batch_size=10, time_limit=None):
+    """
+    Run due jobs until none are left.
+
+    Args:
+        batch_size (int): Jobs claimed at a time.
+        time_limit (float): Seconds after which no more jobs are claimed; the
+            jobs already claimed still run. None runs until the queue is empty.
+
+    Returns:
+        int: Number of jobs run.
+    """
+    deadline = None if time_limit is None else time.monotonic() + time_limit
+    count = 0
+    while deadline is None or time.monotonic() < deadline:
+        jobs = claim_jobs(batch_size)
+        if not jobs:
+            break
+        for job in jobs:
+            run_job(job)
+        count += len(jobs)
+    return count
@@ -0,0 +1,32 @@
+"""
+Job runner for deployments without a `run_workers` process. Zappa invokes
+run_jobs every minute (see zappa_settings.json).
+"""
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def run_jobs(event=None, context=None):
+    """
+    Zappa scheduled event handler: run the due background jobs, one at a
+    time, while the invocation has time left.
+
+    Returns:
+        int: Number of jobs run.
+    """
+    import django
+
+    django.setup()  # a no-op once the app is loaded
+    from django.conf import settings
+
+    from .queue import run_pending_jobs
+
+    time_limit = None
+    if context is not None:
+        margin = getattr(settings, "JOB_SCHEDULED_TIME_MARGIN", 15)
+        time_limit = context.get_remaining_time_in_millis() / 1000 - margin
+    count = run_pending_jobs(batch_size=1, time_limit=time_limit)
+    logger.info("Ran %s background jobs.", count)
+    return count
@@ -0,0 +1,165 @@
+from datetime import timedelta
+from unittest.mock import Mock, patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from expenses.models import Expense
+from groups.models import ExpenseGroup
+from .models import BackgroundJob
+from .queue import HANDLERS, claim_jobs, enqueue_job, run_pending_jobs
+from .scheduled import run_jobs
+
+User = get_user_model()
+
+
+class BackgroundJobQueueTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        HANDLERS["test_job"] = lambda **payload: self.calls.append(payload)
+        self.addCleanup(HANDLERS.pop, "test_job")
+
+    def test_enqueue_deduplicates_active_jobs(self):
+        """
+        Test a key is queued once while pending, and again after it ran.
+        """
+        enqueue_job("test_job", "test:1", {"value": 1})
+        enqueue_job("test_job", "test:1", {"value": 2})
+        self.assertEqual(BackgroundJob.objects.count(), 1)
+
+        self.assertEqual(run_pending_jobs(), 1)
+        self.assertEqual(self.calls, [{"value": 1}])
+
+        enqueue_job("test_job", "test:1", {"value": 3})
+        self.assertEqual(BackgroundJob.objects.filter(key="test:1").count(), 2)
+
+    def test_claim_skips_running_and_future_jobs(self):
+        enqueue_job("test_job", "test:1")
+        enqueue_job("test_job", "test:2", delay=60)
+        self.assertEqual([job.key for job in claim_jobs()], ["test:1"])
+        self.assertEqual(claim_jobs(), [])
+
+        # A worker that died mid-job loses its lock after JOB_LOCK_TIMEOUT
+        BackgroundJob.objects.filter(key="test:1").update(
+            locked_at=timezone.now() - timedelta(hours=1)
+        )
+        self.assertEqual([job.key for job in claim_jobs()], ["test:1"])
+
+    def test_failed_jobs_are_retried_with_backoff(self):
+        HANDLERS["test_job"] = lambda: 1 / 0
+        enqueue_job("test_job", "test:1")
+
+        self.assertEqual(run_pending_jobs(), 1)
+        job = BackgroundJob.objects.get()
+        self.assertEqual(job.status, BackgroundJob.PENDING)
+        self.assertEqual(job.attempts, 1)
+        self.assertIn("ZeroDivisionError", job.last_error)
+        self.assertGreater(job.run_after, timezone.now())
+
+        with patch("jobs.queue.JOB_MAX_ATTEMPTS", 2):
+            BackgroundJob.objects.update(run_after=timezone.now())
+            call_command("run_workers", "--once", stdout=open("/dev/null", "w"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, BackgroundJob.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_time_limit_stops_claiming_jobs(self):
+        for index in range(3):
+            enqueue_job("test_job", f"test:{index}", {"value": index})
+
+        self.assertEqual(run_pending_jobs(batch_size=1, time_limit=0), 0)
+        self.assertEqual(run_pending_jobs(batch_size=1, time_limit=60), 3)
+        self.assertEqual(len(self.calls), 3)
+
+    def test_scheduled_handler_runs_jobs_within_the_invocation(self):
+        """
+        Test the Zappa handler runs the queue, and leaves jobs for the next
+        invocation when the Lambda is about to time out.
+        """
+        enqueue_job("test_job", "test:1")
+        context = Mock(get_remaining_time_in_millis=Mock(return_value=5000))
+        self.assertEqual(run_jobs({}, context), 0)
+        self.assertEqual(self.calls, [])
+
+        context.get_remaining_time_in_millis.return_value = 30000
+        self.assertEqual(run_jobs({}, context), 1)
+        self.assertEqual(len(self.calls), 1)
+
+        enqueue_job("test_job", "test:2")
+        self.assertEqual(run_jobs(), 1)
+
+
+@patch("expenses.utils.generate_content", return_value="🎁")
+class IconJobTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="user1", password="password1")
+        self.group = ExpenseGroup.objects.create(name="Test Group")
+
+    def create_expense(self, title):
+        return Expense.objects.create(
+            group=self.group, title=title, amount=10, paid_by=self.user
+        )
+
+    def test_unmatched_expense_icon_is_generated_later(self, mock_generate_content):
+        expense = self.create_expense("xyz")
+        self.assertEqual(expense.expense_icon, "💸")
+        mock_generate_content.assert_not_called()
+
+        run_pending_jobs()
+        expense.refresh_from_db()
+        self.assertEqual(expense.expense_icon, "🎁")
+
+    def test_matched_icons_queue_no_job(self, mock_generate_content):
+        self.create_expense("Pizza")
+        self.assertFalse(BackgroundJob.objects.exists())
+
+    def test_edited_expense_keeps_its_icon(self, mock_generate_content):
+        """
+        Test a job queued before an edit does not overwrite the newer icon.
+        """
+        expense = self.create_expense("xyz")
+        Expense.objects.filter(id=expense.id).update(title="abc", expense_icon="🍕")
+
+        run_pending_jobs()
+        expense.refresh_from_db()
+        self.assertEqual(expense.expense_icon, "🍕")
+        mock_generate_content.assert_not_called()
+
+    def test_expense_renamed_while_its_job_runs(self, mock_generate_content):
+        """
+        Test a rename that could not replace the running job is picked up by
+        the job's retry.
+        """
+        expense = self.create_expense("xyz")
+        prompts = []
+
+        def rename_once(prompt):
+            prompts.append(prompt)
+            if len(prompts) == 1:
+                expense.title = "abc"
+                expense.save()
+            return "🎁"
+
+        mock_generate_content.side_effect = rename_once
+        run_pending_jobs()
+        job = BackgroundJob.objects.get()
+        self.assertEqual(job.status, BackgroundJob.PENDING)
+        self.assertEqual(job.attempts, 1)
+
+        BackgroundJob.objects.update(run_after=timezone.now())
+        run_pending_jobs()
+        expense.refresh_from_db()
+        self.assertEqual(expense.expense_icon, "🎁")
+        self.assertIn("abc", prompts[-1])
+
+    def test_renamed_expense_requeues_its_icon(self, mock_generate_content):
+        expense = self.create_expense("xyz")
+        expense.title = "abc"
+        expense.save()
+        self.assertEqual(BackgroundJob.objects.get().payload["title"], "abc")
+
+        run_pending_jobs()
+        expense.refresh_from_db()
+        self.assertEqual(expense.expense_icon, "🎁")
@@ -0,0 +1,87 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger(__name__)
+
+
+class QueryRecorder:
+    """
+    Database execute wrapper collecting the statements run during a request.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # seconds
+        self.slowest = (0.0, None)  # (seconds, sql)
+        self.statements = Counter()
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.duration += elapsed
+            self.statements[(sql, repr(params))] += 1
+            if elapsed >= self.slowest[0]:
+                self.slowest = (elapsed, sql)
+
+    @property
+    def duplicates(self):
+        """
+        Statements that ran more than once with the same parameters, beyond
+        their first run.
+        """
+        return sum(count - 1 for count in self.statements.values() if count > 1)
+
+
+class QueryInstrumentationMiddleware:
+    """
+    Report the SQL work of every request in the Server-Timing, X-DB-Queries
+    and X-DB-Duplicate-Queries response headers, and log the slowest
+    statement. Enabled by the QUERY_INSTRUMENTATION setting.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not getattr(settings, "QUERY_INSTRUMENTATION", False):
+            return self.get_response(request)
+
+        recorder = QueryRecorder()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - start
+
+        slowest_duration, slowest_sql = recorder.slowest
+        response["Server-Timing"] = ", ".join(
+            [
+                f'db;dur={recorder.duration * 1000:.2f};desc="{recorder.count} queries"',
+                f"db-slowest;dur={slowest_duration * 1000:.2f}",
+                f"total;dur={total * 1000:.2f}",
+            ]
+        )
+        response["X-DB-Queries"] = str(recorder.count)
+        response["X-DB-Duplicate-Queries"] = str(recorder.duplicates)
+        if slowest_sql:
+            logger.info(
+                "%s %s: %d queries (%d duplicates) in %.2f ms, slowest %.2f ms: %s",
+                request.method,
+                request.path,
+                recorder.count,
+                recorder.duplicates,
+                recorder.duration * 1000,
+                slowest_duration * 1000,
+                slowest_sql,
+            )
+        return response
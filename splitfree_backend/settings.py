@@ -37,6 +37,7 @@ INSTALLED_APPS = [
     "expenses",
     "transactions",
     "auth_app",
+    "jobs",
     "django.contrib.admin",
     "rest_framework.authtoken",
     "django.contrib.auth",
@@ -52,6 +53,7 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",  # Add CORS middleware at the top
     "django.middleware.security.SecurityMiddleware",
+    "splitfree_backend.middleware.QueryInstrumentationMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
@@ -60,6 +62,13 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Most milliseconds `django.setup()` plus loading the URLconf may spend on
+# imports (measured with -X importtime by the startup tests)
+STARTUP_IMPORT_BUDGET_MS = int(os.getenv("STARTUP_IMPORT_BUDGET_MS", "1000"))
+
+# Add per-request SQL counts and timings to the response headers
+QUERY_INSTRUMENTATION = os.getenv("QUERY_INSTRUMENTATION", "false").lower() == "true"
+
 # CORS settings
 CORS_ALLOW_ALL_ORIGINS = True  # Allow all origins in development
 CORS_ALLOW_CREDENTIALS = True  # Allow credentials
@@ -99,6 +108,68 @@ else:
     DATABASES = {"default": dj_database_url.config(conn_max_age=600, ssl_require=True)}
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Set REDIS_URL to share cached expense summaries between workers.
+
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+    }
+    # User payloads are only cached when every worker sees the invalidation
+    USER_PAYLOAD_CACHE = "default"
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
+    USER_PAYLOAD_CACHE = None
+
+# LLM answers are shared by all workers through a database table (created by
+# the jobs migrations). Entries expire after a week, and a quarter of them is
+# culled whenever MAX_ENTRIES is reached.
+CACHES["llm"] = {
+    "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+    "LOCATION": "llm_cache",
+    "TIMEOUT": 60 * 60 * 24 * 7,
+    "OPTIONS": {"MAX_ENTRIES": 10000, "CULL_FREQUENCY": 4},
+}
+LLM_FAILURE_CACHE_TIMEOUT = 300  # Seconds a failed LLM call is not retried
+
+# Local LLM client (USE_LOCAL_LLM): timeouts in seconds, calls in flight per
+# process, and the circuit breaker opening after that many failures in a row
+# for LLM_CIRCUIT_RESET_TIMEOUT seconds.
+LOCAL_LLM_CONNECT_TIMEOUT = 3
+LOCAL_LLM_READ_TIMEOUT = 30
+LOCAL_LLM_MAX_CONCURRENCY = 4
+LLM_CIRCUIT_FAILURE_THRESHOLD = 5
+LLM_CIRCUIT_RESET_TIMEOUT = 30
+
+SUMMARY_CACHE_TIMEOUT = 60 * 60 * 24  # Seconds a summary version stays cached
+SUMMARY_LOCAL_CACHE_SIZE = 256  # Summaries kept in each process's LRU tier
+
+# Exact debt simplification falls back to the greedy engine beyond these limits
+SIMPLIFY_EXACT_MAX_BALANCES = 20
+SIMPLIFY_EXACT_TIME_BUDGET = 0.5  # seconds
+
+# Historical summaries replaying more rows than this save a balance checkpoint
+BALANCE_CHECKPOINT_REPLAY_LIMIT = 500
+
+# Background jobs (manage.py run_workers): failed jobs are retried after
+# JOB_RETRY_DELAY seconds, doubled on every attempt, up to JOB_MAX_ATTEMPTS
+# runs. Jobs running longer than JOB_LOCK_TIMEOUT seconds are taken over.
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 30
+JOB_LOCK_TIMEOUT = 600
+# On Zappa the scheduled jobs.scheduled.run_jobs stops claiming jobs once less
+# than this many seconds of the invocation are left, so a job is not cut off
+JOB_SCHEDULED_TIME_MARGIN = 15
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -15,6 +15,7 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 from django.contrib import admin
+from django.http import HttpResponse
 from django.urls import path, include
 from rest_framework.authtoken.views import obtain_auth_token
 from drf_spectacular.views import (
@@ -23,7 +24,14 @@ from drf_spectacular.views import (
     SpectacularSwaggerView,
 )
 
+
+def health(request):
+    # Container health check: answers without touching the database
+    return HttpResponse("ok", content_type="text/plain")
+
+
 urlpatterns = [
+    path("health/", health, name="health"),
     path("admin/", admin.site.urls),
     path("api/auth/login/", obtain_auth_token, name="api_token_auth"),
     path("api/v1/expenses/", include("expenses.urls")),
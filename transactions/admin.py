@@ -1,6 +1,8 @@
 from django.contrib import admin
+
+from expenses.admin import LedgerRebuildAdmin
 from .models import Transaction
 
 # Register your models here.
 
-admin.site.register(Transaction)
+admin.site.register(Transaction, LedgerRebuildAdmin)
@@ -0,0 +1,23 @@
+# Generated by Django 5.2 on 2026-10-18 20:53
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("groups", "0007_expensegroup_simplify_engine"),
+        ("transactions", "0003_transaction_description"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(
+                fields=["group", "from_user", "to_user"],
+                name="transaction_group_users_idx",
+            ),
+        ),
+    ]
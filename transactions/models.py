@@ -20,5 +20,14 @@ class Transaction(models.Model):
     transaction_date = models.DateTimeField(default=timezone.now)
     description = models.TextField(blank=True, null=True)
 
+    class Meta:
+        indexes = [
+            # Settle-ups between two members of a group
+            models.Index(
+                fields=["group", "from_user", "to_user"],
+                name="transaction_group_users_idx",
+            ),
+        ]
+
     def __str__(self):
         return f"Transaction from {self.from_user.username} to {self.to_user.username} for {self.amount}"
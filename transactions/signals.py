@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from groups.utils import bump_summary_version
+from .models import Transaction
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def transaction_changed(sender, instance, **kwargs):
+    bump_summary_version(instance.group_id)
@@ -5,6 +5,7 @@ from rest_framework import status
 from unittest.mock import patch
 from groups.models import ExpenseGroup
 from transactions.models import Transaction
+from utils.testing import QueryBudgetMixin
 
 User = get_user_model()
 
@@ -86,3 +87,28 @@ class TransactionCreateViewTests(APITestCase):
         self.assertIn("to_user", response.data)
         self.assertEqual(response.data["from_user"][0], "This field is required.")
         self.assertEqual(response.data["to_user"][0], "This field is required.")
+
+
+class TransactionQueryBudgetTests(QueryBudgetMixin, APITestCase):
+    def setUp(self):
+        self.user1 = User.objects.create_user(username="user1", password="password1")
+        self.user2 = User.objects.create_user(username="user2", password="password2")
+        self.group = ExpenseGroup.objects.create(name="Test Group")
+        self.group.members.add(self.user1, self.user2)
+        self.client.force_authenticate(user=self.user1)
+
+    def test_urls_have_query_budgets(self):
+        self.assertUrlsHaveQueryBudgets("transactions.urls")
+
+    def test_create_transaction_budget(self):
+        data = {
+            "amount": 500,
+            "description": "Settling up",
+            "transaction_date": "2025-05-01T10:00:00Z",
+            "from_user": self.user1.id,
+            "to_user": self.user2.id,
+            "group": self.group.id,
+        }
+        with self.assertQueryBudget("create_transaction"):
+            response = self.client.post(reverse("create_transaction"), data)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
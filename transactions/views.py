@@ -1,8 +1,10 @@
+from django.db import transaction
 from django.shortcuts import render
 from rest_framework import generics, status
 from rest_framework.response import Response
 
 from auth_app.utils import log_activity
+from expenses.ledger import record_transaction
 from transactions.models import Transaction
 from transactions.serializers import TransactionSerializer
 
@@ -18,7 +20,9 @@ class TransactionCreateView(generics.CreateAPIView):
     serializer_class = TransactionSerializer
 
     def perform_create(self, serializer):
-        serializer.save()
+        with transaction.atomic():
+            serializer.save()
+            record_transaction(serializer.instance)
         log_activity(
             user=self.request.user,
             name="Settle Up Posted!!",
@@ -1,42 +1,105 @@
+import hashlib
+import json
 import os
-import requests
-from google import genai
-from google.genai import types
-from google.api_core.exceptions import DeadlineExceeded  # type: ignore
+from django.conf import settings
+from django.core.cache import caches
+from functools import lru_cache
+from .llm_client import LLMError, LLMTimeout, LLMUnavailable, LocalLLMClient
+from .sdk import genai_client, genai_types
 
-client = genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
 use_local_llm = os.getenv("USE_LOCAL_LLM")
 llm_url = os.getenv("LOCAL_LLM_URL")
 llm_model = os.getenv("LLM_MODEL")
 
+GEMINI_MODEL = "gemini-1.5-flash-8b"
+GEMINI_CONFIG = {
+    "max_output_tokens": 500,
+    "temperature": 0.1,
+    "system_instruction": "You are an expense manager. Your name is splitfree.",
+}
+LOCAL_LLM_OPTIONS = {
+    "max_new_tokens": 300,
+    "num_thread": 1,
+}
+TIMEOUT_MESSAGE = "The request timed out. Please try again later."
+
+# Failed calls are remembered for a short while, so a broken or rate limited
+# backend is not hit again by every request in the meantime.
+LLM_FAILURE_CACHE_TIMEOUT = getattr(settings, "LLM_FAILURE_CACHE_TIMEOUT", 300)
+
+
+@lru_cache(maxsize=None)
+def local_llm_client():
+    return LocalLLMClient(
+        llm_url,
+        llm_model,
+        LOCAL_LLM_OPTIONS,
+        connect_timeout=getattr(settings, "LOCAL_LLM_CONNECT_TIMEOUT", 3),
+        read_timeout=getattr(settings, "LOCAL_LLM_READ_TIMEOUT", 30),
+        max_concurrency=getattr(settings, "LOCAL_LLM_MAX_CONCURRENCY", 4),
+        failure_threshold=getattr(settings, "LLM_CIRCUIT_FAILURE_THRESHOLD", 5),
+        reset_timeout=getattr(settings, "LLM_CIRCUIT_RESET_TIMEOUT", 30),
+    )
+
+
+def llm_cache_key(backend, model, prompt, config):
+    """
+    Content address of a request: the same prompt sent with the same model and
+    generation settings gets the same key, whichever worker sends it.
+    """
+    request = json.dumps([backend, model, prompt, config], sort_keys=True)
+    return "llm:" + hashlib.sha256(request.encode()).hexdigest()
+
+
+def _call_llm(requested_content):
+    if use_local_llm:
+        return local_llm_client().generate(f"{requested_content}")
+    else:
+        from google.api_core.exceptions import DeadlineExceeded  # type: ignore
+
+        try:
+            response = genai_client().models.generate_content(
+                model=GEMINI_MODEL,
+                contents=f"{requested_content}",
+                config=genai_types().GenerateContentConfig(**GEMINI_CONFIG),
+            )
+        except DeadlineExceeded as error:
+            raise LLMTimeout(str(error)) from error
+        return response.text
+
 
 def generate_content(requested_content):
-    # Generate content using the Gemini model
+    # Generate content using the Gemini model, or reuse an earlier answer
+    if use_local_llm:
+        key = llm_cache_key("local", llm_model, requested_content, LOCAL_LLM_OPTIONS)
+    else:
+        key = llm_cache_key("gemini", GEMINI_MODEL, requested_content, GEMINI_CONFIG)
+    cache = caches["llm"]
+    cached = cache.get(key)
+    if cached is not None:
+        if "error" in cached:
+            if cached["error"] == TIMEOUT_MESSAGE:
+                return TIMEOUT_MESSAGE
+            raise LLMError(cached["error"])
+        return cached["text"]
+
     try:
-        if use_local_llm:
-            response = requests.post(
-                llm_url,
-                json={
-                    "model": llm_model,
-                    "prompt": f"{requested_content}",
-                    "stream": False,
-                    "options": {
-                        "max_new_tokens": 300,
-                        "num_thread": 1,
-                    },
-                },
-            )
-            return response.json().get("response", "")
+        text = _call_llm(requested_content)
+    except LLMUnavailable:
+        # Nothing was sent, so there is no answer to this prompt to cache
+        raise
+    except LLMTimeout:
+        cache.set(key, {"error": TIMEOUT_MESSAGE}, LLM_FAILURE_CACHE_TIMEOUT)
+        return TIMEOUT_MESSAGE
+    except Exception as error:
+        if isinstance(error, LLMError):
+            message = str(error)
         else:
-            response = client.models.generate_content(
-                model="gemini-1.5-flash-8b",
-                contents=f"{requested_content}",
-                config=types.GenerateContentConfig(
-                    max_output_tokens=500,
-                    temperature=0.1,
-                    system_instruction="You are an expense manager. Your name is splitfree.",
-                ),
-            )
-            return response.text
-    except DeadlineExceeded:
-        return "The request timed out. Please try again later."
+            message = f"{type(error).__name__}: {error}"
+        cache.set(key, {"error": message}, LLM_FAILURE_CACHE_TIMEOUT)
+        raise LLMError(message) from error
+
+    # An empty answer is not worth keeping: the next call may do better
+    if text:
+        cache.set(key, {"text": text})
+    return text
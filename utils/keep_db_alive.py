@@ -0,0 +1,83 @@
+"""
+Warm-up handler, scheduled by zappa_settings.json every 5 minutes and run
+by every gunicorn worker once it has loaded the app (gunicorn.conf.py).
+`manage.py warmup` prints the timings.
+"""
+
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _timed(timings, step, function):
+    start = time.perf_counter()
+    function()
+    timings[step] = round((time.perf_counter() - start) * 1000, 2)
+
+
+def _check_database():
+    from django.db import connection
+
+    connection.ensure_connection()
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1")
+        cursor.fetchone()
+
+
+def _prime_content_types():
+    # Activities of groups, expenses and settle-ups look these up
+    from django.contrib.contenttypes.models import ContentType
+
+    from expenses.models import Expense
+    from groups.models import ExpenseGroup
+    from transactions.models import Transaction
+
+    ContentType.objects.get_for_models(ExpenseGroup, Expense, Transaction)
+
+
+def _load_icon_classifier():
+    from expenses.utils import classify_icons
+
+    classify_icons(["warm up"], use_llm=False)
+
+
+def _load_auth_sdk():
+    from utils.sdk import firebase_auth
+
+    firebase_auth()
+
+
+WARMUP_STEPS = [
+    ("database", _check_database),
+    ("content_types", _prime_content_types),
+    ("icon_classifier", _load_icon_classifier),
+    ("auth_sdk", _load_auth_sdk),
+]
+
+
+def warm_up():
+    """
+    Open and check the database connection, and load the caches and SDKs the
+    first requests would otherwise pay for.
+
+    Returns:
+        dict: Milliseconds taken by each step, and in total.
+    """
+    timings = {}
+    start = time.perf_counter()
+    for step, function in WARMUP_STEPS:
+        _timed(timings, step, function)
+    timings["total"] = round((time.perf_counter() - start) * 1000, 2)
+    logger.info("Warm-up timings (ms): %s", timings)
+    return timings
+
+
+def keep_db_alive(event=None, context=None):
+    """
+    Zappa scheduled event handler.
+    """
+    import django
+
+    django.setup()  # a no-op once the app is loaded
+    return warm_up()
@@ -0,0 +1,148 @@
+"""
+HTTP client for the local LLM backend (USE_LOCAL_LLM).
+
+One keep-alive session is shared by the process, every call has connect and
+read timeouts, at most `max_concurrency` calls are in flight at once, and a
+circuit breaker stops calling a backend that keeps failing for a while.
+"""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class LLMError(Exception):
+    pass
+
+
+class LLMTimeout(LLMError):
+    pass
+
+
+class LLMUnavailable(LLMError):
+    """
+    The call was not sent: the circuit is open or every slot is taken.
+    """
+
+
+class CircuitOpenError(LLMUnavailable):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures. Once `reset_timeout`
+    seconds have passed, one trial call is let through: success closes the
+    circuit, failure keeps it open for another `reset_timeout`.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        with self._lock:
+            if self.opened_at is None:
+                return True
+            if (
+                self._trial_running
+                or time.monotonic() - self.opened_at < self.reset_timeout
+            ):
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+
+class LocalLLMClient:
+    """
+    Args:
+        url (str): The generate endpoint, e.g. http://localhost:11434/api/generate.
+        model (str): Model name sent with every prompt.
+        options (dict): Generation options sent with every prompt.
+        connect_timeout (float): Seconds to wait for a connection.
+        read_timeout (float): Seconds to wait for the answer.
+        max_concurrency (int): Calls in flight at once; more wait up to
+            connect_timeout for a slot.
+    """
+
+    def __init__(
+        self,
+        url,
+        model,
+        options=None,
+        connect_timeout=3,
+        read_timeout=30,
+        max_concurrency=4,
+        failure_threshold=5,
+        reset_timeout=30,
+    ):
+        self.url = url
+        self.model = model
+        self.options = options or {}
+        self.timeout = (connect_timeout, read_timeout)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.slots = threading.BoundedSemaphore(max_concurrency)
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+
+    def generate(self, prompt):
+        """
+        Returns:
+            str: The model's answer.
+
+        Raises:
+            CircuitOpenError: The backend failed recently; nothing was sent.
+            LLMUnavailable: No slot freed up within connect_timeout.
+            LLMError: The call failed or timed out.
+        """
+        # While the circuit is open nothing is in flight, so this is instant
+        if not self.slots.acquire(timeout=self.timeout[0]):
+            raise LLMUnavailable("Too many local LLM calls in flight.")
+        try:
+            if not self.breaker.allow():
+                raise CircuitOpenError("The local LLM is unavailable.")
+            try:
+                response = self.session.post(
+                    self.url,
+                    json={
+                        "model": self.model,
+                        "prompt": prompt,
+                        "stream": False,
+                        "options": self.options,
+                    },
+                    timeout=self.timeout,
+                )
+                response.raise_for_status()
+                text = response.json().get("response", "")
+            except (requests.RequestException, ValueError) as error:
+                self.breaker.record_failure()
+                raise LLMError(f"{type(error).__name__}: {error}") from error
+        finally:
+            self.slots.release()
+        self.breaker.record_success()
+        return text
@@ -0,0 +1,104 @@
+import json
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import Cursor, CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor pagination on a unique ordering, e.g. ("-expense_date", "-id").
+
+    The opaque cursor holds the ordering values of the row a page ended on,
+    and the next page is read with a keyset filter on them. There is no
+    COUNT and no OFFSET, so a deep page costs the same as the first one.
+    Views using it return querysets of plain model fields to order on; the
+    last ordering field has to be unique.
+    """
+
+    ordering = ("-id",)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.fields = [
+            queryset.model._meta.get_field(name.lstrip("-")) for name in self.ordering
+        ]
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+
+        # A previous page is read backwards from its cursor, then flipped
+        ordering = [
+            name[1:] if name.startswith("-") else f"-{name}" for name in self.ordering
+        ]
+        queryset = queryset.order_by(*(ordering if reverse else self.ordering))
+        if self.cursor is not None:
+            queryset = queryset.filter(
+                self.keyset_filter(ordering if reverse else self.ordering)
+            )
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        self.page = rows[: self.page_size]
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.has_previous = True, has_more
+        else:
+            self.has_next, self.has_previous = has_more, self.cursor is not None
+        return self.page
+
+    def keyset_filter(self, ordering):
+        """
+        Rows after the cursor position in `ordering`: for (-a, -b) that is
+        a < x OR (a = x AND b < y).
+        """
+        conditions = []
+        for index, name in enumerate(ordering):
+            field = name.lstrip("-")
+            lookup = "lt" if name.startswith("-") else "gt"
+            equal = {
+                other.lstrip("-"): value
+                for other, value in zip(ordering[:index], self.cursor.position)
+            }
+            conditions.append(
+                Q(**equal, **{f"{field}__{lookup}": self.cursor.position[index]})
+            )
+        return reduce(or_, conditions)
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None:
+            return None
+        try:
+            values = json.loads(cursor.position)
+            if not isinstance(values, list) or len(values) != len(self.fields):
+                raise ValueError(values)
+            position = [
+                field.to_python(value) for field, value in zip(self.fields, values)
+            ]
+        except (TypeError, ValueError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=cursor.reverse, position=position)
+
+    def encode_position(self, instance):
+        return json.dumps([field.value_to_string(instance) for field in self.fields])
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        position = self.encode_position(self.page[-1])
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        position = self.encode_position(self.page[0])
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
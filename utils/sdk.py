@@ -0,0 +1,66 @@
+"""
+Heavy third-party SDKs, imported and set up on first use.
+
+Importing google.genai, firebase_admin or rapidfuzz at module level made
+every cold start (Lambda via Zappa, gunicorn boot, manage.py) pay for them,
+even for requests that never touch them.
+"""
+
+import base64
+import json
+import os
+import threading
+from functools import lru_cache
+
+_firebase_lock = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def genai_client():
+    """
+    The Gemini client, built on first use.
+    """
+    from google import genai
+
+    return genai.Client(api_key=os.getenv("GEMINI_API_KEY"))
+
+
+def genai_types():
+    from google.genai import types
+
+    return types
+
+
+def firebase_auth():
+    """
+    The firebase_admin.auth module, with the default app initialised from
+    FIREBASE_CREDENTIALS_B64 or FIREBASE_CREDENTIALS when either is set.
+    """
+    import firebase_admin
+    from firebase_admin import auth, credentials
+
+    with _firebase_lock:
+        if not firebase_admin._apps:
+            firebase_cred = os.getenv("FIREBASE_CREDENTIALS")
+            firebase_b64 = os.getenv("FIREBASE_CREDENTIALS_B64")
+            if firebase_b64 or firebase_cred:
+                if firebase_b64:
+                    decoded = base64.b64decode(firebase_b64)
+                    firebase_credentials = json.loads(decoded)
+                else:
+                    firebase_credentials = firebase_cred
+
+                cred = credentials.Certificate(firebase_credentials)
+                firebase_admin.initialize_app(cred)
+    return auth
+
+
+@lru_cache(maxsize=None)
+def rapidfuzz():
+    """
+    Returns:
+        tuple: The rapidfuzz fuzz and process modules.
+    """
+    from rapidfuzz import fuzz, process
+
+    return fuzz, process
@@ -0,0 +1,156 @@
+import os
+import subprocess
+import sys
+from contextlib import contextmanager
+from importlib import import_module
+
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern
+
+from expenses.ledger_core import LedgerCore
+
+# Most SQL queries a single request to each named URL may run. The tests
+# drive every URL with more rows than fit on a page, so a new query per row
+# (N+1) blows the budget instead of reaching production. Lower a budget
+# whenever a view gets cheaper; never raise one to make a test pass.
+QUERY_BUDGETS = {
+    # expenses/urls.py
+    "create_expense": 19,
+    "list_expenses": 5,
+    "expense_summary": 5,
+    "import_expenses": 25,
+    "summary_cache_stats": 0,
+    "expense_delete": 18,
+    "expense_update": 30,
+    "user_expense_list": 3,
+    "user_monthly_expense_list": 1,
+    # groups/urls.py
+    "list_group_members": 4,
+    "list_group_members_by_uuid": 3,
+    "list_groups": 3,
+    "create_group": 8,
+    "add-user-to-group": 5,
+    "group_activities": 2,
+    "group_overview": 4,
+    # transactions/urls.py
+    "create_transaction": 14,
+}
+
+
+def get_member_balances(group):
+    """
+    The paid, owed, sent and received totals of every user in a group,
+    computed from the raw rows, to check the ledger against.
+
+    Returns:
+        dict: Maps user id to a dict with the four totals as Decimals.
+    """
+    return LedgerCore.from_group(group).member_totals()
+
+
+def get_member_pair_debts(group):
+    """
+    Gross (debtor, creditor) amounts computed from the raw splits and
+    transactions.
+    """
+    return LedgerCore.from_group(group).pair_debts()
+
+
+def url_names(urlconf):
+    """
+    Names of the URL patterns declared in a urls module, e.g. "expenses.urls".
+    """
+    return [
+        pattern.name
+        for pattern in import_module(urlconf).urlpatterns
+        if isinstance(pattern, URLPattern) and pattern.name
+    ]
+
+
+def measure_startup_imports(code="import django; django.setup()"):
+    """
+    Run `code` in a fresh interpreter under -X importtime.
+
+    Returns:
+        dict: Microseconds spent importing each module itself (children
+        excluded), by module name.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+        check=True,
+    )
+    timings = {}
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        if not line.startswith("import time:") or line.endswith("imported package"):
+            continue
+        self_us, _, module = line[len("import time:") :].split("|")
+        timings[module.strip()] = int(self_us)
+    return timings
+
+
+def explain(queryset):
+    """
+    The query plan of a queryset. On PostgreSQL sequential scans are turned
+    off for the EXPLAIN, since test tables are too small for the planner to
+    prefer an index otherwise.
+    """
+    if connection.vendor == "postgresql":
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            return queryset.explain()
+    return queryset.explain()
+
+
+class QueryPlanMixin:
+    """
+    TestCase mixin checking which indexes the hot queries use.
+    """
+
+    def assertUsesIndex(self, queryset, index_name):
+        """
+        Fail unless the plan scans `index_name`: "SEARCH ... USING INDEX" on
+        SQLite, an (Index Only|Bitmap Index) Scan on PostgreSQL.
+        """
+        plan = explain(queryset)
+        self.assertIn(
+            index_name, plan, f"{index_name} is not used by:\n{queryset.query}\n{plan}"
+        )
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin checking requests against QUERY_BUDGETS.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, url_name):
+        """
+        Fail when the block runs more queries than the URL's budget.
+
+        Usage:
+            with self.assertQueryBudget("list_expenses"):
+                self.client.get(reverse("list_expenses", args=[group.id]))
+        """
+        self.assertIn(url_name, QUERY_BUDGETS, f"No query budget for {url_name!r}.")
+        budget = QUERY_BUDGETS[url_name]
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        statements = "\n".join(
+            f"{index}. {query['sql']}"
+            for index, query in enumerate(context.captured_queries, start=1)
+        )
+        self.assertLessEqual(
+            len(context),
+            budget,
+            f"{url_name} ran {len(context)} queries, over its budget of "
+            f"{budget}:\n{statements}",
+        )
+
+    def assertUrlsHaveQueryBudgets(self, urlconf):
+        missing = [name for name in url_names(urlconf) if name not in QUERY_BUDGETS]
+        self.assertEqual(missing, [], f"Add query budgets for {urlconf}: {missing}")